@@ -9,7 +9,6 @@ from flask_cors import CORS
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-import threading
 
 # Load environment variables
 from config import PROJECT_ROOT, ENV_FILE, FRONTEND_DIR
@@ -19,10 +18,19 @@ else:
     load_dotenv()
 
 from database import (
-    init_db_pool, test_connection, execute_update
+    init_db_pool, test_connection, execute_update, apply_primary_pin
+)
+from utils.setup import (
+    setup_admin_user, add_image_title_column_if_missing, add_image_storage_columns_if_missing,
+    add_normalized_email_columns_if_missing
 )
-from utils.setup import setup_admin_user, add_image_title_column_if_missing
 from utils.helpers import get_client_ip
+from utils.app_metrics import record_request_metric, UNMATCHED_ENDPOINT
+from utils.metrics_rollup import create_rollup_tables
+from utils.content_versions import create_content_versions_table
+from utils.email_outbox import create_email_outbox_table, start_outbox_worker
+from utils.schema_info import refresh_schema_info
+from utils.property_index import property_index
 
 print("App imported")
 
@@ -40,7 +48,7 @@ SECRET_KEY = os.getenv("SECRET_KEY", os.urandom(32).hex())
 app.config['SECRET_KEY'] = SECRET_KEY
 
 # Session lifetime (31 days for visitor tracking)
-from datetime import timedelta
+from datetime import datetime, timedelta
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=31)
 
 # Session cookie configuration for cross-origin support (cPanel production)
@@ -134,21 +142,49 @@ def startup_tasks():
             except Exception as e:
                 print(f"Warning: Could not create application_metrics table: {str(e)}")
             
+            # Per-minute/per-hour rollups read by the admin metrics dashboard
+            try:
+                create_rollup_tables()
+                print("Application metrics rollup tables ready")
+            except Exception as e:
+                print(f"Warning: Could not create application metrics rollup tables: {str(e)}")
+            
+            # Content version counters behind ETags and cross-worker cache invalidation
+            try:
+                create_content_versions_table()
+                print("Content versions table ready")
+            except Exception as e:
+                print(f"Warning: Could not create content_versions table: {str(e)}")
+            
+            # Queue behind notification emails (sent by utils/email_outbox.py)
+            try:
+                create_email_outbox_table()
+                print("Email outbox table ready")
+            except Exception as e:
+                print(f"Warning: Could not create email_outbox table: {str(e)}")
+            # Deliver rows left pending (backoff, digest window) by earlier processes
+            start_outbox_worker()
+            
             # Create images table if it doesn't exist
             try:
                 create_images_table = """
                     CREATE TABLE IF NOT EXISTS images (
                         id INT AUTO_INCREMENT PRIMARY KEY,
-                        data LONGBLOB NOT NULL COMMENT 'Binary image data',
+                        data LONGBLOB NULL COMMENT 'Binary image data (storage = db only)',
                         content_type VARCHAR(100) NOT NULL COMMENT 'MIME type (e.g., image/jpeg, image/png)',
+                        storage VARCHAR(20) NOT NULL DEFAULT 'db' COMMENT 'db = bytes in data column, otherwise blob store backend',
+                        sha256 CHAR(64) NULL COMMENT 'SHA-256 of the image bytes',
+                        size_bytes BIGINT NULL,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        INDEX idx_created_at (created_at)
+                        INDEX idx_created_at (created_at),
+                        INDEX idx_sha256 (sha256)
                     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
                 """
                 execute_update(create_images_table)
                 print("Images table ready")
             except Exception as e:
                 print(f"Warning: Could not create images table: {str(e)}")
+            add_image_storage_columns_if_missing()
             # Create commercial_property_images table if it doesn't exist (requires commercial_properties to exist)
             try:
                 create_commercial_images_table = """
@@ -235,6 +271,13 @@ def startup_tasks():
                 print("User sessions table ready")
             except Exception as e:
                 print(f"Warning: Could not create user_sessions table: {str(e)}")
+            add_normalized_email_columns_if_missing()
+            # Read information_schema after the migrations above so routes see the final schema
+            if refresh_schema_info():
+                print("Schema info loaded")
+            # Optional in-memory property index (PROPERTY_INDEX_ENABLED); workers inherit it after fork
+            if property_index.enabled:
+                property_index.load()
         else:
             print("Warning: Database connection test failed")
     else:
@@ -242,6 +285,11 @@ def startup_tasks():
     
     app_started = True
 
+# Read-your-writes: after a write, this client's next reads go to the primary (any worker)
+@app.after_request
+def carry_primary_pin(response):
+    return apply_primary_pin(response)
+
 # Application metrics tracking middleware
 @app.before_request
 def track_request_start():
@@ -267,33 +315,16 @@ def track_request_metrics(response):
         else:
             response_time_ms = 0
         
-        # Get request details
-        endpoint = path
+        # Get request details (keyed by route rule so /api/images/1, /api/images/2, ... share one rollup row)
+        endpoint = request.url_rule.rule if request.url_rule is not None else UNMATCHED_ENDPOINT
+        requested_at = datetime.utcfromtimestamp(request.start_time) if hasattr(request, 'start_time') else None
         method = request.method
         status_code = response.status_code
-        is_error = status_code >= 400
         ip_address = get_client_ip()
         user_agent = request.headers.get('User-Agent', '')[:500]
         
-        # Store metrics in database (async in background)
-        def store_metrics():
-            try:
-                query = """
-                    INSERT INTO application_metrics 
-                    (endpoint, method, response_time_ms, status_code, is_error, ip_address, user_agent)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """
-                execute_update(query, (
-                    endpoint, method, response_time_ms, status_code, 
-                    is_error, ip_address, user_agent
-                ))
-            except Exception:
-                pass
-        
-        # Store in background thread
-        thread = threading.Thread(target=store_metrics)
-        thread.daemon = True
-        thread.start()
+        # Buffered: a background flusher writes queued rows in multi-row INSERTs
+        record_request_metric(endpoint, method, response_time_ms, status_code, ip_address, user_agent, requested_at)
         
     except Exception:
         pass
@@ -349,10 +380,11 @@ def handle_exception(error):
 # Import route modules - they will register routes on the app instance
 try:
     # Import route modules - they register routes via register functions
-    from routes import auth, health, properties, partners, testimonials, stats, metrics, cities, categories, amenities, unit_types, logs, blogs, inquiries, visitor_info
+    from routes import auth, health, properties, search, partners, testimonials, stats, metrics, cities, categories, amenities, unit_types, logs, blogs, inquiries, visitor_info
     auth.register_auth_routes(app)
     health.register_health_routes(app)
     properties.register_properties_routes(app)
+    search.register_search_routes(app)
     partners.register_partners_routes(app)
     testimonials.register_testimonials_routes(app)
     stats.register_stats_routes(app)
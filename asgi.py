@@ -0,0 +1,132 @@
+"""
+Optional async (ASGI) serving mode.
+
+    uvicorn asgi:application --workers 2
+
+The hot public read endpoints (GET /api/properties, /api/properties/<id>,
+/api/stats/properties and /api/localities) run as coroutines on the async MySQL
+engine (routes/async_public.py, utils/async_db.py), so one process keeps many
+slow clients in flight instead of blocking a worker per request. Every other
+route is the regular Flask app, run on a thread pool by asgiref's WSGI adapter.
+
+Needs `pip install uvicorn asgiref aiomysql`. Without aiomysql every request goes
+to the Flask app. Passenger keeps using passenger_wsgi.py and is unaffected.
+"""
+import asyncio
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import app
+from utils.async_db import ASYNC_DB_AVAILABLE, dispose_async_engines
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:
+    raise ImportError("The ASGI entry point needs the asgiref package (pip install asgiref)")
+
+if ASYNC_DB_AVAILABLE:
+    from routes.async_public import match_async_route
+else:
+    print("Warning: aiomysql is not installed; asgi.py serves every route through the Flask app")
+
+    def match_async_route(method, path):
+        return None, None
+
+
+flask_application = WsgiToAsgi(app)
+
+
+def route_path(scope: dict) -> str:
+    """Request path below the mount point (root_path)"""
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    return path
+
+
+def wsgi_environ(scope: dict) -> dict:
+    """WSGI environ for an ASGI http scope (GET requests: no body)"""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": route_path(scope).encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1] or 80),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(b""),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1")
+        value = value.decode("latin-1")
+        if name == "content-type":
+            key = "CONTENT_TYPE"
+        elif name == "content-length":
+            key = "CONTENT_LENGTH"
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def dispatch_async_view(view, kwargs: dict, scope: dict):
+    """Flask's full_dispatch_request around an awaited view: before/after_request
+    hooks (startup tasks, metrics, CORS) and error handlers behave as in WSGI mode"""
+    with app.request_context(wsgi_environ(scope)):
+        try:
+            try:
+                # Hooks are synchronous and the first request runs the startup tasks
+                rv = await asyncio.to_thread(app.preprocess_request)
+                if rv is None:
+                    rv = await view(**kwargs)
+            except Exception as e:
+                rv = app.handle_user_exception(e)
+            return app.finalize_request(rv)
+        except Exception as e:
+            return app.handle_exception(e)
+
+
+async def send_response(response, scope: dict, send):
+    body = b"" if scope["method"] == "HEAD" else response.get_data()
+    await send({
+        "type": "http.response.start",
+        "status": response.status_code,
+        "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in response.headers.items()],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if ASYNC_DB_AVAILABLE:
+                await dispose_async_engines()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] == "http":
+        view, kwargs = match_async_route(scope["method"], route_path(scope))
+        if view is not None:
+            response = await dispatch_async_view(view, kwargs, scope)
+            return await send_response(response, scope, send)
+    return await flask_application(scope, receive, send)
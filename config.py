@@ -45,6 +45,13 @@ else:
     # Create it if it doesn't exist
     IMAGES_DIR.mkdir(parents=True, exist_ok=True)
 
+# On-disk, content-addressed cache of image blobs served by /api/images/<id>
+# (kept out of the frontend tree so it is never served directly as static files)
+IMAGE_CACHE_DIR = Path(os.getenv("IMAGE_CACHE_DIR", str(BACKEND_DIR / "cache" / "images")))
+
+# Content-addressed store for uploaded image bytes (local filesystem backend)
+BLOB_STORE_DIR = Path(os.getenv("BLOB_STORE_DIR", str(BACKEND_DIR / "storage" / "blobs")))
+
 # Get environment file path
 ENV_FILE = PROJECT_ROOT / ".env"
 
@@ -54,5 +61,7 @@ __all__ = [
     'BACKEND_DIR',
     'FRONTEND_DIR',
     'IMAGES_DIR',
+    'IMAGE_CACHE_DIR',
+    'BLOB_STORE_DIR',
     'ENV_FILE'
 ]
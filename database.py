@@ -1,11 +1,15 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from contextlib import contextmanager
+import math
 import os
+import threading
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 import pymysql.cursors
 from urllib.parse import quote_plus
+from flask import g, has_request_context, request
 
 # Load environment variables from .env file (for local development)
 # In production (cPanel), environment variables are set in cPanel settings
@@ -32,6 +36,16 @@ MYSQL_HOST = os.getenv('DB_HOST', 'localhost')
 MYSQL_PORT = int(os.getenv('DB_PORT', '3306'))
 MYSQL_DB = os.getenv('DB_NAME')
 
+# Optional read replicas: comma-separated host[:port] list using the primary's
+# user, password and database. execute_query reads from a replica unless told
+# otherwise; writes always go to the primary.
+DB_REPLICA_HOSTS = [h.strip() for h in os.getenv('DB_REPLICA_HOSTS', '').split(',') if h.strip()]
+# After a write, reads from the same request and client stay on the primary this long (read-your-writes,
+# carried between requests in a cookie)
+REPLICA_PIN_SECONDS = float(os.getenv('DB_REPLICA_PIN_SECONDS', '5'))
+# A replica that refused a connection is skipped this long before it is tried again
+REPLICA_RETRY_SECONDS = float(os.getenv('DB_REPLICA_RETRY_SECONDS', '30'))
+
 # Validate that required credentials are set
 # We'll validate when actually connecting, but set defaults to None for now
 # This allows the app to start even if env vars aren't set (for better error messages)
@@ -73,29 +87,55 @@ if MYSQL_USER and MYSQL_PASSWORD and MYSQL_HOST and MYSQL_DB:
 else:
     DATABASE_URL = None
 
+def init_connection_session(dbapi_connection):
+    """
+    Configure a new physical MySQL connection.
+    READ COMMITTED so pooled connections always see the latest committed data.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED")
+    finally:
+        cursor.close()
+
+
+def build_engine(url: str):
+    """SQLAlchemy engine with the pool settings shared by the primary and the replicas"""
+    new_engine = create_engine(
+        url,
+        pool_pre_ping=True,       # Avoids stale connections
+        pool_recycle=3600,        # Recycles connections every hour
+        pool_size=10,             # Number of connections to maintain
+        max_overflow=20,          # Maximum overflow connections
+        pool_timeout=30,          # Timeout for getting connection from pool
+        echo=False,               # Set True for SQL debug logs
+        connect_args={
+            "charset": "utf8mb4",
+            "connect_timeout": 10,  # Connection timeout in seconds
+            "read_timeout": 30,     # Read timeout in seconds
+            "write_timeout": 30     # Write timeout in seconds
+        },
+        execution_options={
+            "isolation_level": "READ COMMITTED"  # Use READ COMMITTED for better consistency with connection pooling
+        }
+    )
+
+    # Per-connection session setup: runs once when the pool opens a physical connection,
+    # so queries no longer pay a SET SESSION round trip on every checkout
+    @event.listens_for(new_engine, "connect")
+    def _init_session(dbapi_connection, connection_record):
+        init_connection_session(dbapi_connection)
+
+    return new_engine
+
+
 # Create SQLAlchemy engine (only if DATABASE_URL is set)
 # Validate credentials before creating engine
 if DATABASE_URL:
     try:
         validate_db_credentials()
-        engine = create_engine(
-            DATABASE_URL,
-            pool_pre_ping=True,       # Avoids stale connections
-            pool_recycle=3600,        # Recycles connections every hour
-            pool_size=10,             # Number of connections to maintain
-            max_overflow=20,          # Maximum overflow connections
-            pool_timeout=30,          # Timeout for getting connection from pool
-            echo=False,               # Set True for SQL debug logs
-            connect_args={
-                "charset": "utf8mb4",
-                "connect_timeout": 10,  # Connection timeout in seconds
-                "read_timeout": 30,     # Read timeout in seconds
-                "write_timeout": 30     # Write timeout in seconds
-            },
-            execution_options={
-                "isolation_level": "READ COMMITTED"  # Use READ COMMITTED for better consistency with connection pooling
-            }
-        )
+        engine = build_engine(DATABASE_URL)
+
         # Test the connection immediately to catch errors early
         try:
             with engine.connect() as test_conn:
@@ -134,6 +174,22 @@ if DATABASE_URL:
 else:
     engine = None
 
+# Replica engines connect lazily; a replica that is down only costs a failover to the primary
+replica_engines = []  # (host:port label, engine)
+if engine is not None:
+    for replica_host in DB_REPLICA_HOSTS:
+        host, _, port = replica_host.partition(':')
+        replica_port = int(port) if port else MYSQL_PORT
+        try:
+            replica_engines.append((
+                f"{host}:{replica_port}",
+                build_engine(f"mysql+pymysql://{encoded_user}:{encoded_password}@{host}:{replica_port}/{encoded_db}")
+            ))
+        except Exception as e:
+            print(f"Warning: Could not configure read replica {replica_host}: {e}")
+    if replica_engines:
+        print(f"Read replicas configured: {', '.join(label for label, _ in replica_engines)}")
+
 # Session factory (only if engine is available)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine) if engine else None
 
@@ -173,6 +229,8 @@ def close_db_pool():
     """Close database connections (for compatibility)"""
     try:
         engine.dispose()
+        for _, replica_engine in replica_engines:
+            replica_engine.dispose()
         print("Database connection pool closed")
     except Exception as e:
         print(f"Error closing database pool: {e}")
@@ -228,6 +286,125 @@ def test_connection() -> dict:
     return result
 
 
+# ============================================
+# READ REPLICA ROUTING
+# ============================================
+
+_replica_lock = threading.Lock()
+_replica_down_until = {}  # replica index -> monotonic time it may be tried again
+_thread_pins = threading.local()  # pin for writes made outside a request (scripts, background threads)
+
+# The pin travels with the client so the next request reads from the primary whichever
+# worker or server handles it: wall-clock expiry (epoch seconds) set on write responses
+PRIMARY_PIN_COOKIE = 'db_primary_until'
+
+
+def pin_to_primary(seconds: float = None):
+    """
+    Send the rest of this request's reads to the primary; with seconds, also
+    this client's reads in later requests for that long (see apply_primary_pin).
+    """
+    if has_request_context():
+        g.db_read_primary = True
+        if seconds and replica_engines:
+            g.db_pin_until = max(g.get("db_pin_until") or 0, time.time() + seconds)
+    elif seconds and replica_engines:
+        _thread_pins.until = time.time() + seconds
+
+
+def _note_write():
+    """Called after every committed write on the primary"""
+    if replica_engines:
+        pin_to_primary(REPLICA_PIN_SECONDS)
+
+
+def _pin_cookie_until() -> float:
+    try:
+        return float(request.cookies.get(PRIMARY_PIN_COOKIE, 0))
+    except ValueError:
+        return 0
+
+
+def _reads_pinned() -> bool:
+    if not has_request_context():
+        return getattr(_thread_pins, "until", 0) > time.time()
+    return bool(g.get("db_read_primary")) or _pin_cookie_until() > time.time()
+
+
+def apply_primary_pin(response):
+    """Hand a pin set during this request to the client (after_request hook)"""
+    until = g.get("db_pin_until")
+    if until:
+        response.set_cookie(PRIMARY_PIN_COOKIE, f"{until:.3f}", max_age=max(1, math.ceil(until - time.time())),
+                            httponly=True, samesite='Lax', secure=request.is_secure)
+    return response
+
+
+def _replica_index():
+    """
+    The replica this worker reads from. Each process sticks to one replica (spread
+    across workers by pid), so the content versions that key the response caches
+    and the rows behind them come from the same replication stream.
+    """
+    now = time.monotonic()
+    for offset in range(len(replica_engines)):
+        index = (os.getpid() + offset) % len(replica_engines)
+        if _replica_down_until.get(index, 0) <= now:
+            return index
+    return None
+
+
+def _mark_replica_down(index: int, error):
+    label = replica_engines[index][0]
+    print(f"Warning: Read replica {label} unavailable, reading from the primary for "
+          f"{REPLICA_RETRY_SECONDS:.0f}s: {error}")
+    with _replica_lock:
+        _replica_down_until[index] = time.monotonic() + REPLICA_RETRY_SECONDS
+
+
+def _read_connection(primary: bool = False):
+    """Raw connection for a read: a replica when configured and not pinned, else the primary"""
+    if primary or not replica_engines or _reads_pinned():
+        return engine.raw_connection()
+    index = _replica_index()
+    if index is None:
+        return engine.raw_connection()
+    try:
+        return replica_engines[index][1].raw_connection()
+    except Exception as e:
+        _mark_replica_down(index, e)
+        return engine.raw_connection()
+
+
+def read_engine_url(primary: bool = False):
+    """URL of the server execute_query would read from right now (used by utils/async_db.py)"""
+    if primary or not replica_engines or _reads_pinned():
+        return engine.url
+    index = _replica_index()
+    return engine.url if index is None else replica_engines[index][1].url
+
+
+def report_replica_failure(url, error):
+    """Take the replica behind url out of rotation after a failed connection"""
+    for index, (_, replica_engine) in enumerate(replica_engines):
+        if str(replica_engine.url) == str(url):
+            _mark_replica_down(index, error)
+
+
+def get_replica_status() -> list:
+    """Configured replicas and whether reads are currently routed to them"""
+    now = time.monotonic()
+    current = _replica_index() if replica_engines else None
+    return [
+        {
+            "host": label,
+            "available": _replica_down_until.get(index, 0) <= now,
+            "used_by_this_worker": index == current,
+        }
+        for index, (label, _) in enumerate(replica_engines)
+    ]
+
+
 @contextmanager
 def get_db_cursor(commit=True):
     """Context manager for database cursors (for compatibility)"""
@@ -243,6 +420,7 @@ def get_db_cursor(commit=True):
             yield cursor
             if commit:
                 raw_conn.commit()
+                _note_write()
             else:
                 raw_conn.rollback()
         except Exception as e:
@@ -264,26 +442,25 @@ def get_db_cursor(commit=True):
             raw_conn.close()
 
 
-def execute_query(query: str, params: tuple = None) -> list:
-    """Execute a SELECT query and return results as list of dicts"""
+def execute_query(query: str, params: tuple = None, primary: bool = False) -> list:
+    """
+    Execute a SELECT query and return results as list of dicts.
+    Reads go to a read replica when DB_REPLICA_HOSTS is set, except right after a
+    write by the same request/client; pass primary=True for reads that must see
+    the latest committed state (auth and session checks).
+    """
     if engine is None:
         validate_db_credentials()  # This will raise a helpful error
         raise RuntimeError("Database engine not initialized. Check environment variables.")
     
-    # Use raw connection for MySQL-style %s placeholders
+    # Use raw connection for MySQL-style %s placeholders.
+    # Isolation level is set once per physical connection (see init_connection_session),
+    # so this path is a single round trip for the query itself.
     raw_conn = None
     try:
-        raw_conn = engine.raw_connection()
-        # Set isolation level to READ COMMITTED to see latest committed data immediately
-        # This is critical for connection pooling to work correctly with fresh data
-        try:
-            temp_cursor = raw_conn.cursor()
-            temp_cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED")
-            temp_cursor.close()
-            raw_conn.commit()
-        except:
-            pass  # Ignore if setting fails, connection will use default
+        raw_conn = _read_connection(primary)
         # Ensure autocommit is enabled for read queries to see latest data
+        # (PyMySQL skips the round trip when the connection is already in autocommit mode)
         raw_conn.autocommit(True)
         # Use DictCursor to automatically return results as dictionaries
         cursor = raw_conn.cursor(pymysql.cursors.DictCursor)
@@ -310,11 +487,7 @@ def execute_query(query: str, params: tuple = None) -> list:
         raise
     finally:
         if raw_conn:
-            # Reset connection state before returning to pool
-            try:
-                raw_conn.rollback()  # Clear any transaction state
-            except:
-                pass
+            # Returning to the pool resets transaction state (pool reset-on-return)
             raw_conn.close()
 
 
@@ -356,6 +529,7 @@ def execute_update(query: str, params: tuple = None) -> int:
                 cursor.execute(query)
             # Explicitly commit the transaction
             raw_conn.commit()
+            _note_write()
             affected_rows = cursor.rowcount
             return affected_rows
         except Exception as e:
@@ -427,6 +601,7 @@ def execute_insert(query: str, params: tuple = None) -> int:
                 cursor.execute(query)
             # Explicitly commit the transaction
             raw_conn.commit()
+            _note_write()
             return cursor.lastrowid
         except Exception as e:
             if raw_conn:
@@ -7,12 +7,14 @@ import re
 import traceback
 from database import execute_query
 from utils.helpers import abort_with_message
+from utils.response_cache import cached_response, mark_uncacheable
 
 
 def register_amenities_routes(app):
     """Register amenities routes"""
     
     @app.route("/api/amenities", methods=["GET"])
+    @cached_response("properties")
     def get_amenities():
         """Get all available amenities/features (master list + any from properties)"""
         try:
@@ -60,6 +62,7 @@ def register_amenities_routes(app):
                 # If query fails, just use master list
                 print(f"Warning: Could not fetch amenities from database: {str(db_error)}")
                 db_amenity_names = []
+                mark_uncacheable()
             
             # Combine master list with any additional amenities from database, remove duplicates
             all_amenities = list(set(master_amenities + db_amenity_names))
@@ -86,6 +89,7 @@ def register_amenities_routes(app):
         except Exception as e:
             print(f"Error fetching amenities: {str(e)}")
             traceback.print_exc()
+            mark_uncacheable()
             # Support JSONP even for errors
             callback = request.args.get('callback')
             if callback:
@@ -0,0 +1,176 @@
+"""
+Coroutine versions of the hot public read endpoints, served by asgi.py.
+Request parsing, caching and response bodies are the same helpers the Flask
+views use; only the MySQL round trips are awaited (utils/async_queries.py).
+They run inside a regular Flask request context, so request, g, jsonify and
+error_response work as in the sync views.
+"""
+import asyncio
+import re
+import traceback
+
+from flask import request, jsonify
+
+from data.city_localities import get_localities_for_city
+from schemas import PropertyStatsSchema
+from utils.async_db import async_execute_query
+from utils.async_queries import (
+    async_count_listing, async_fetch_listing_page, async_hydrate_listing_rows,
+    async_fetch_primary_images, async_fetch_property_detail
+)
+from utils.helpers import get_pagination_params, error_response
+from utils.property_detail import build_property_detail_response
+from utils.property_index import property_index, keys_for_hydration
+from utils.property_queries import build_listing_filters, next_page_cursor
+from utils.response_cache import async_cached_response, mark_uncacheable
+from utils.schema_info import has_table
+from routes.properties import listing_request_args, listing_index_args, listing_response, detail_request_category
+from routes.stats import (
+    PROPERTY_STATS_QUERY, PROPERTY_TYPE_STATS_QUERIES, build_property_stats, property_stats_response
+)
+from routes.cities import (
+    LOCALITIES_QUERY, LOCALITIES_FALLBACK_QUERY, localities_response, localities_error_response
+)
+
+
+@async_cached_response("properties")
+async def get_properties():
+    """GET /api/properties (see get_properties in routes/properties.py)"""
+    try:
+        pagination = get_pagination_params()
+        offset = (pagination.page - 1) * pagination.limit
+        try:
+            args, cursor = listing_request_args()
+        except ValueError:
+            error_resp, status_code = error_response("Invalid cursor parameter", 400)
+            error_resp.headers['Access-Control-Allow-Origin'] = '*'
+            return error_resp, status_code
+
+        filters = build_listing_filters(**args)
+        # ensure_current may reload the index from MySQL: keep it off the event loop
+        if args['is_active'] and await asyncio.to_thread(property_index.ensure_current):
+            keys = property_index.listing_keys(**listing_index_args(args))
+            total = len(keys)
+            start = offset
+            if cursor is not None:
+                start = property_index.position_after(keys, cursor)
+            properties = await async_hydrate_listing_rows(keys_for_hydration(keys[start:start + pagination.limit]))
+        else:
+            # commercial_properties may not exist on older databases
+            if not has_table('commercial_properties'):
+                filters.pop('commercial', None)
+            if cursor is None:
+                total, properties = await asyncio.gather(
+                    async_count_listing(filters),
+                    async_fetch_listing_page(filters, pagination.limit, offset, cursor)
+                )
+            else:
+                # Cursor requests come from "load more": the client already has the total
+                total = None
+                properties = await async_fetch_listing_page(filters, pagination.limit, offset, cursor)
+        next_cursor = next_page_cursor(properties, pagination.limit)
+
+        primary_images = await async_fetch_primary_images(properties)
+        return listing_response(properties, primary_images, total, pagination, next_cursor)
+    except Exception as e:
+        error_msg = str(e)
+        print(f"Error fetching properties: {error_msg}")
+        traceback.print_exc()
+        error_resp, status_code = error_response(f"Error fetching properties: {error_msg}", 500)
+        error_resp.headers['Access-Control-Allow-Origin'] = '*'
+        return error_resp, status_code
+
+
+@async_cached_response("properties")
+async def get_property(property_id: int):
+    """GET /api/properties/<id>?category=... (see get_property in routes/properties.py)"""
+    try:
+        # The collision index may refresh from MySQL
+        category, error = await asyncio.to_thread(detail_request_category, property_id)
+        if error is not None:
+            return error
+
+        row, images, features = await async_fetch_property_detail(category, property_id)
+        if not row:
+            return error_response(
+                f"Property ID {property_id} not found in {category} properties",
+                404
+            )
+        return jsonify(build_property_detail_response(category, row, images, features))
+    except Exception as e:
+        print(f"Error fetching property: {str(e)}")
+        traceback.print_exc()
+        return error_response(f"Error fetching property: {str(e)}", 500)
+
+
+@async_cached_response("properties")
+async def get_property_stats():
+    """GET /api/stats/properties (see get_property_stats in routes/stats.py)"""
+    try:
+        stats_result, *type_results = await asyncio.gather(
+            async_execute_query(PROPERTY_STATS_QUERY),
+            *(async_execute_query(query) for query in PROPERTY_TYPE_STATS_QUERIES),
+            return_exceptions=True
+        )
+        if isinstance(stats_result, Exception):
+            raise stats_result
+        type_error = next((r for r in type_results if isinstance(r, Exception)), None)
+        if type_error is not None:
+            print(f"Error fetching property types: {str(type_error)}")
+            type_results = None
+            mark_uncacheable()
+        return property_stats_response(build_property_stats(stats_result, type_results))
+    except Exception as e:
+        print(f"Error fetching property stats: {str(e)}")
+        traceback.print_exc()
+        mark_uncacheable()
+        result = PropertyStatsSchema(total=0, for_sale=0, for_rent=0, by_type={}, featured=0)
+        return property_stats_response(result.dict(), reject_invalid_callback=False)
+
+
+async def get_localities_by_city():
+    """GET /api/localities?city=... (see get_localities_by_city in routes/cities.py)"""
+    city = request.args.get('city', '').strip()
+    try:
+        if not city:
+            return jsonify({
+                "success": True,
+                "localities": []
+            })
+
+        # Static mapping first, then the database
+        locality_list = get_localities_for_city(city)
+        if not locality_list:
+            localities = await async_execute_query(LOCALITIES_QUERY, (city, city))
+            if not localities:
+                localities = await async_execute_query(LOCALITIES_FALLBACK_QUERY, (city, city))
+            for loc in localities or []:
+                locality_name = (loc.get('locality') or '').strip()
+                if locality_name:
+                    locality_list.append(locality_name)
+
+        return localities_response(city, locality_list)
+    except Exception as e:
+        print(f"Error fetching localities for city {city}: {str(e)}")
+        traceback.print_exc()
+        return localities_error_response(e)
+
+
+# GET path pattern -> view; named groups become int view arguments
+ASYNC_ROUTES = (
+    (re.compile(r"^/api/properties$"), get_properties),
+    (re.compile(r"^/api/properties/(?P<property_id>\d+)$"), get_property),
+    (re.compile(r"^/api/stats/properties$"), get_property_stats),
+    (re.compile(r"^/api/localities$"), get_localities_by_city),
+)
+
+
+def match_async_route(method: str, path: str):
+    """(view, kwargs) for a request served by the async views, else (None, None)"""
+    if method not in ("GET", "HEAD"):
+        return None, None
+    for pattern, view in ASYNC_ROUTES:
+        match = pattern.match(path)
+        if match:
+            return view, {name: int(value) for name, value in match.groupdict().items()}
+    return None, None
@@ -15,8 +15,59 @@ from database import (
     get_db_cursor
 )
 from schemas import LoginSchema, LoginResponseSchema
-from utils.auth import verify_password
-from utils.helpers import get_client_ip, abort_with_message
+from utils.auth import verify_password_bounded, PasswordHashingBusy
+from utils.helpers import (
+    get_client_ip, get_proxy_client_ip, abort_with_message, error_response, invalidate_admin_auth
+)
+from utils.rate_limit import TokenBucketLimiter
+from utils.task_executor import submit_task
+
+
+# Login attempts per minute (token buckets, per worker process); 0 disables a limit
+login_ip_limiter = TokenBucketLimiter(float(os.getenv("LOGIN_RATE_PER_IP_PER_MINUTE", "10")))
+login_email_limiter = TokenBucketLimiter(float(os.getenv("LOGIN_RATE_PER_EMAIL_PER_MINUTE", "5")))
+
+
+def too_many_requests(message: str, retry_after: float):
+    error_resp, status_code = error_response(message, 429)
+    error_resp.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+    return error_resp, status_code
+
+
+def record_login(user_id, user_email, session_id, ip_address, user_agent):
+    """Update last_login and write the user_login log row"""
+    # Update last login
+    execute_update(
+        "UPDATE users SET last_login = %s WHERE id = %s",
+        (datetime.now(), user_id)
+    )
+
+    # Log login
+    try:
+        metadata = json.dumps({
+            "session_id": session_id,
+            "ip_address": ip_address,
+            "user_id": user_id
+        })
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO logs
+                (log_type, action, description, user_email, ip_address, user_agent, metadata)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """,
+                (
+                    "action",
+                    "user_login",
+                    f"User logged in from {ip_address}",
+                    user_email,
+                    ip_address,
+                    user_agent,
+                    metadata
+                )
+            )
+    except Exception:
+        traceback.print_exc()
 
 
 def register_auth_routes(app):
@@ -37,6 +88,17 @@ def register_auth_routes(app):
             except Exception as e:
                 return abort_with_message(400, str(e))
 
+            # Throttle before any database or hashing work (credential stuffing).
+            # The email bucket is only charged once the IP check passes, so a client
+            # that is already over its own limit cannot use up the account's tokens.
+            limiter_ip = get_proxy_client_ip() or ""
+            retry_after = login_ip_limiter.take(limiter_ip)
+            if not retry_after:
+                retry_after = login_email_limiter.take(login_data.email.lower().strip())
+            if retry_after:
+                print("LOGIN RATE LIMITED:", limiter_ip, login_data.email)
+                return too_many_requests("Too many login attempts. Please try again later.", retry_after)
+
             # Check DB connection
             connection_test = test_connection()
             if not connection_test.get("connected"):
@@ -56,17 +118,34 @@ def register_auth_routes(app):
                   AND role = 'admin'
                 LIMIT 1
             """
-            users = execute_query(user_query, (login_data.email,))
+            users = execute_query(user_query, (login_data.email,), primary=True)
             if not users:
                 return abort_with_message(401, "Invalid email or password")
 
             user = users[0]
 
-            # Verify password
+            # Verify password (bounded hashing pool; 429 when it is saturated)
             stored_hash = user.get("password_hash")
-            if not stored_hash or not verify_password(login_data.password, stored_hash):
+            if not stored_hash:
+                return abort_with_message(401, "Invalid email or password")
+            try:
+                password_ok, new_hash = verify_password_bounded(login_data.password, stored_hash)
+            except PasswordHashingBusy:
+                return too_many_requests("Too many login attempts in progress. Please try again shortly.", 1)
+            if not password_ok:
                 return abort_with_message(401, "Invalid email or password")
 
+            # Upgrade deprecated or outdated hashes while the plain password is at hand
+            if new_hash:
+                try:
+                    execute_update(
+                        "UPDATE users SET password_hash = %s WHERE id = %s",
+                        (new_hash, user["id"])
+                    )
+                    print("LOGIN: password hash upgraded for user", user["id"])
+                except Exception:
+                    traceback.print_exc()
+
             # -------------------------
             # CHECK ACTIVE SESSION (USER-SCOPED)
             # -------------------------
@@ -78,7 +157,7 @@ def register_auth_routes(app):
                   AND expires_at > NOW()
                 LIMIT 1
             """
-            active_sessions = execute_query(active_session_query, (user["id"],))
+            active_sessions = execute_query(active_session_query, (user["id"],), primary=True)
 
             if active_sessions:
                 return abort_with_message(
@@ -128,38 +207,11 @@ def register_auth_routes(app):
                 traceback.print_exc()
                 return abort_with_message(500, "Failed to create session")
 
-            # Update last login
-            execute_update(
-                "UPDATE users SET last_login = %s WHERE id = %s",
-                (datetime.now(), user["id"])
-            )
+            # Earlier sessions were just deactivated: drop cached admin checks in every worker
+            invalidate_admin_auth(user["email"])
 
-            # Log login
-            try:
-                metadata = json.dumps({
-                    "session_id": session_id,
-                    "ip_address": ip_address,
-                    "user_id": user["id"]
-                })
-                with get_db_cursor() as cursor:
-                    cursor.execute(
-                        """
-                        INSERT INTO logs
-                        (log_type, action, description, user_email, ip_address, user_agent, metadata)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)
-                        """,
-                        (
-                            "action",
-                            "user_login",
-                            f"User logged in from {ip_address}",
-                            user["email"],
-                            ip_address,
-                            user_agent,
-                            metadata
-                        )
-                    )
-            except Exception:
-                traceback.print_exc()
+            # last_login and the audit log row are bookkeeping: write them in the background
+            submit_task("audit", record_login, user["id"], user["email"], session_id, ip_address, user_agent)
 
             # Send actual role and is_admin from DB so non-admin users (is_admin=0) redirect to dashboard
             user_role = user.get("role") or "admin"
@@ -209,6 +261,8 @@ def register_auth_routes(app):
             except Exception:
                 pass  # Non-fatal; table may not exist in some envs
 
+            invalidate_admin_auth(user_email)
+
             return jsonify({
                 "success": True,
                 "message": "Logout successful"
@@ -233,7 +287,7 @@ def register_auth_routes(app):
                 ORDER BY created_at DESC
                 LIMIT 1
             """
-            sessions = execute_query(query)
+            sessions = execute_query(query, primary=True)
             print("AUTH CHECK-SESSION: sessions count:", len(sessions) if sessions else 0, "user_email:", sessions[0].get("user_email") if sessions else None)
 
             if sessions:
@@ -12,12 +12,14 @@ from schemas import (
 from utils.helpers import (
     abort_with_message, get_pagination_params, calculate_pages, normalize_image_url, require_admin_auth
 )
+from utils.response_cache import cached_response, invalidates
 
 
 def register_blogs_routes(app):
     """Register blogs routes"""
     
     @app.route("/api/blogs", methods=["GET"])
+    @cached_response("blogs")
     def get_blogs():
         """Get all blogs with filtering and pagination"""
         try:
@@ -86,6 +88,7 @@ def register_blogs_routes(app):
             abort_with_message(500, f"Failed to fetch blogs: {str(e)}")
     
     @app.route("/api/blogs/<int:blog_id>", methods=["GET"])
+    @cached_response("blogs")
     def get_blog(blog_id: int):
         """Get a single blog by ID"""
         try:
@@ -140,6 +143,7 @@ def register_blogs_routes(app):
     
     @app.route("/api/blogs", methods=["POST"])
     @require_admin_auth
+    @invalidates("blogs")
     def create_blog():
         """Create a new blog"""
         try:
@@ -197,6 +201,7 @@ def register_blogs_routes(app):
     
     @app.route("/api/blogs/<int:blog_id>", methods=["POST"])
     @require_admin_auth
+    @invalidates("blogs")
     def update_blog(blog_id: int):
         """Update a blog"""
         try:
@@ -284,6 +289,7 @@ def register_blogs_routes(app):
     
     @app.route("/api/blogs/<int:blog_id>", methods=["DELETE"])
     @require_admin_auth
+    @invalidates("blogs")
     def delete_blog(blog_id: int):
         """Delete a blog"""
         try:
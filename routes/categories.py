@@ -8,12 +8,14 @@ import re
 import traceback
 from database import execute_query, execute_insert, execute_update
 from utils.helpers import abort_with_message, require_admin_auth
+from utils.response_cache import cached_response, invalidates
 
 
 def register_categories_routes(app):
     """Register categories routes"""
     
     @app.route("/api/categories", methods=["GET"])
+    @cached_response("categories")
     def get_active_categories():
         """Get all active categories (public endpoint)"""
         try:
@@ -61,6 +63,7 @@ def register_categories_routes(app):
     # IMPORTANT: This route must be defined before /api/admin/categories to ensure proper matching
     @app.route("/api/admin/categories/<int:category_id>", methods=["GET", "PUT", "POST", "DELETE", "OPTIONS"])
     @require_admin_auth
+    @invalidates("categories")
     def handle_category(category_id):
         """Handle GET, PUT, POST, DELETE requests for a single category"""
         # Handle OPTIONS request for CORS preflight
@@ -188,6 +191,7 @@ def register_categories_routes(app):
     
     @app.route("/api/admin/categories", methods=["GET", "POST"])
     @require_admin_auth
+    @invalidates("categories")
     def handle_categories():
         """Handle GET and POST requests for categories"""
         if request.method == "GET":
@@ -7,6 +7,7 @@ import re
 import traceback
 from database import execute_query, execute_update
 from utils.helpers import abort_with_message, require_admin_auth
+from utils.response_cache import cached_response, invalidates, mark_uncacheable
 from data.city_localities import get_localities_for_city, get_all_cities as get_all_cities_from_file
 
 # Mapping of important/well-known cities per state
@@ -46,11 +47,98 @@ IMPORTANT_CITIES_BY_STATE = {
 }
 
 
+# Query both residential_properties and plot_properties tables
+# to get ALL unique localities for the given city (including from inactive properties)
+# Use TRIM and case-insensitive matching to handle any whitespace or case issues
+LOCALITIES_QUERY = """
+    SELECT DISTINCT locality
+    FROM (
+        SELECT DISTINCT TRIM(locality) as locality
+        FROM residential_properties
+        WHERE LOWER(TRIM(city)) = LOWER(TRIM(%s)) 
+          AND locality IS NOT NULL 
+          AND TRIM(locality) != ''
+        UNION
+        SELECT DISTINCT TRIM(locality) as locality
+        FROM plot_properties
+        WHERE LOWER(TRIM(city)) = LOWER(TRIM(%s)) 
+          AND locality IS NOT NULL 
+          AND TRIM(locality) != ''
+    ) AS all_localities
+    WHERE locality IS NOT NULL AND locality != ''
+    ORDER BY locality
+"""
+
+# Partial match (in case of city name variations) when the exact match finds nothing
+LOCALITIES_FALLBACK_QUERY = """
+    SELECT DISTINCT locality
+    FROM (
+        SELECT DISTINCT TRIM(locality) as locality
+        FROM residential_properties
+        WHERE LOWER(TRIM(city)) LIKE LOWER(CONCAT('%%', TRIM(%s), '%%'))
+          AND locality IS NOT NULL 
+          AND TRIM(locality) != ''
+        UNION
+        SELECT DISTINCT TRIM(locality) as locality
+        FROM plot_properties
+        WHERE LOWER(TRIM(city)) LIKE LOWER(CONCAT('%%', TRIM(%s), '%%'))
+          AND locality IS NOT NULL 
+          AND TRIM(locality) != ''
+    ) AS all_localities
+    WHERE locality IS NOT NULL AND locality != ''
+    ORDER BY locality
+"""
+
+
+def localities_response(city: str, locality_list: list):
+    """GET /api/localities body (JSON or JSONP); shared with the async serving mode"""
+    # Remove duplicates and sort
+    locality_list = sorted(list(set(locality_list)))
+
+    # Ensure we always return a valid response structure
+    data = {
+        "success": True,
+        "localities": locality_list if locality_list else []
+    }
+
+    # Additional debug logging
+    print(f"[API] Returning {len(data['localities'])} localities for city '{city}'")
+    if len(data['localities']) == 0:
+        print(f"[API] WARNING: No localities found for city '{city}'. Check static mapping and database.")
+
+    # Support JSONP if callback parameter is provided
+    callback = request.args.get('callback')
+    if callback:
+        # Validate callback name to prevent XSS
+        if re.match(r'^[a-zA-Z_$][a-zA-Z0-9_$]*$', callback):
+            response = make_response(f"{callback}({json.dumps(data)});")
+            response.headers['Content-Type'] = 'application/javascript'
+            return response
+        else:
+            # Invalid callback name, return regular JSON
+            return jsonify({'error': 'Invalid callback parameter'}), 400
+
+    return jsonify(data)
+
+
+def localities_error_response(error: Exception):
+    """JSONP even for errors; plain 500 otherwise"""
+    # Support JSONP even for errors
+    callback = request.args.get('callback')
+    if callback:
+        if re.match(r'^[a-zA-Z_$][a-zA-Z0-9_$]*$', callback):
+            response = make_response(f"{callback}({{'success': False, 'localities': []}});")
+            response.headers['Content-Type'] = 'application/javascript'
+            return response
+    return abort_with_message(500, f"Error fetching localities: {str(error)}")
+
+
 def register_cities_routes(app):
     """Register cities routes"""
     print("Registering cities routes...")
     
     @app.route("/api/cities", methods=["GET"])
+    @cached_response("cities")
     def get_active_cities():
         """Get cities for dropdown - from city_localities.py first, then DB fallback"""
         try:
@@ -103,6 +191,7 @@ def register_cities_routes(app):
         except Exception as e:
             print(f"Error fetching active cities: {str(e)}")
             traceback.print_exc()
+            mark_uncacheable()
             # Support JSONP even for errors
             callback = request.args.get('callback')
             if callback:
@@ -154,6 +243,7 @@ def register_cities_routes(app):
     
     @app.route("/api/admin/cities/bulk", methods=["GET", "POST"])
     @require_admin_auth
+    @invalidates("cities")
     def bulk_update_cities():
         """Bulk update cities (admin endpoint) - updates is_active status for multiple cities
         GET: Returns list of all cities for bulk update
@@ -240,27 +330,6 @@ def register_cities_routes(app):
                     "localities": []
                 })
             
-            # Query both residential_properties and plot_properties tables
-            # to get ALL unique localities for the given city (including from inactive properties)
-            # Use TRIM and case-insensitive matching to handle any whitespace or case issues
-            query = """
-                SELECT DISTINCT locality
-                FROM (
-                    SELECT DISTINCT TRIM(locality) as locality
-                    FROM residential_properties
-                    WHERE LOWER(TRIM(city)) = LOWER(TRIM(%s)) 
-                      AND locality IS NOT NULL 
-                      AND TRIM(locality) != ''
-                    UNION
-                    SELECT DISTINCT TRIM(locality) as locality
-                    FROM plot_properties
-                    WHERE LOWER(TRIM(city)) = LOWER(TRIM(%s)) 
-                      AND locality IS NOT NULL 
-                      AND TRIM(locality) != ''
-                ) AS all_localities
-                WHERE locality IS NOT NULL AND locality != ''
-                ORDER BY locality
-            """
             # First, try to get localities from the static mapping file
             locality_list = get_localities_for_city(city)
             
@@ -272,29 +341,11 @@ def register_cities_routes(app):
             if not locality_list:
                 # Trim the city parameter to ensure exact match
                 city_trimmed = city.strip()
-                localities = execute_query(query, (city_trimmed, city_trimmed))
+                localities = execute_query(LOCALITIES_QUERY, (city_trimmed, city_trimmed))
                 
                 # If no results with exact match, try partial match (in case of city name variations)
                 if not localities or len(localities) == 0:
-                    fallback_query = """
-                        SELECT DISTINCT locality
-                        FROM (
-                            SELECT DISTINCT TRIM(locality) as locality
-                            FROM residential_properties
-                            WHERE LOWER(TRIM(city)) LIKE LOWER(CONCAT('%%', TRIM(%s), '%%'))
-                              AND locality IS NOT NULL 
-                              AND TRIM(locality) != ''
-                            UNION
-                            SELECT DISTINCT TRIM(locality) as locality
-                            FROM plot_properties
-                            WHERE LOWER(TRIM(city)) LIKE LOWER(CONCAT('%%', TRIM(%s), '%%'))
-                              AND locality IS NOT NULL 
-                              AND TRIM(locality) != ''
-                        ) AS all_localities
-                        WHERE locality IS NOT NULL AND locality != ''
-                        ORDER BY locality
-                    """
-                    localities = execute_query(fallback_query, (city_trimmed, city_trimmed))
+                    localities = execute_query(LOCALITIES_FALLBACK_QUERY, (city_trimmed, city_trimmed))
                 
                 # Extract locality names from database
                 if localities:
@@ -303,41 +354,8 @@ def register_cities_routes(app):
                         if locality_name:
                             locality_list.append(locality_name)
             
-            # Remove duplicates and sort
-            locality_list = sorted(list(set(locality_list)))
-            
-            # Ensure we always return a valid response structure
-            data = {
-                "success": True,
-                "localities": locality_list if locality_list else []
-            }
-            
-            # Additional debug logging
-            print(f"[API] Returning {len(data['localities'])} localities for city '{city}'")
-            if len(data['localities']) == 0:
-                print(f"[API] WARNING: No localities found for city '{city}'. Check static mapping and database.")
-            
-            # Support JSONP if callback parameter is provided
-            callback = request.args.get('callback')
-            if callback:
-                # Validate callback name to prevent XSS
-                if re.match(r'^[a-zA-Z_$][a-zA-Z0-9_$]*$', callback):
-                    response = make_response(f"{callback}({json.dumps(data)});")
-                    response.headers['Content-Type'] = 'application/javascript'
-                    return response
-                else:
-                    # Invalid callback name, return regular JSON
-                    return jsonify({'error': 'Invalid callback parameter'}), 400
-            
-            return jsonify(data)
+            return localities_response(city, locality_list)
         except Exception as e:
             print(f"Error fetching localities for city {city}: {str(e)}")
             traceback.print_exc()
-            # Support JSONP even for errors
-            callback = request.args.get('callback')
-            if callback:
-                if re.match(r'^[a-zA-Z_$][a-zA-Z0-9_$]*$', callback):
-                    response = make_response(f"{callback}({{'success': False, 'localities': []}});")
-                    response.headers['Content-Type'] = 'application/javascript'
-                    return response
-            abort_with_message(500, f"Error fetching localities: {str(e)}")
\ No newline at end of file
+            return localities_error_response(e)
@@ -3,7 +3,6 @@ Contact inquiries routes
 """
 from flask import request, jsonify
 import traceback
-import threading
 from database import execute_query, execute_update, execute_insert
 from schemas import (
     ContactInquiryCreateSchema, ContactInquiryUpdateSchema, ContactInquiryResponseSchema
@@ -43,22 +42,18 @@ def register_inquiries_routes(app):
             if inquiry_data.subject and inquiry_data.subject.lower() == "schedule visit":
                 visit_date, visit_time, additional_notes = parse_visit_details_from_message(inquiry_data.message)
                 
-                def send_email():
-                    send_schedule_visit_email(
-                        inquiry_data.name,
-                        inquiry_data.email,
-                        inquiry_data.phone,
-                        visit_date,
-                        visit_time,
-                        inquiry_data.message,
-                        inquiry_data.property_id
-                    )
-                
-                thread = threading.Thread(target=send_email)
-                thread.daemon = True
-                thread.start()
+                # Queued in the email outbox (utils/email_outbox.py); delivery happens in the background
+                send_schedule_visit_email(
+                    inquiry_data.name,
+                    inquiry_data.email,
+                    inquiry_data.phone,
+                    visit_date,
+                    visit_time,
+                    inquiry_data.message,
+                    inquiry_data.property_id
+                )
             
-            # Send self-notification email for all contact inquiries
+            # Queue self-notification email for all contact inquiries (sent as a digest when several arrive together)
             def send_notification():
                 property_title = ""
                 if inquiry_data.property_id:
@@ -95,9 +90,7 @@ def register_inquiries_routes(app):
                     }
                 )
             
-            thread = threading.Thread(target=send_notification)
-            thread.daemon = True
-            thread.start()
+            send_notification()
             
             result = execute_query("SELECT * FROM contact_inquiries WHERE id = %s", (inquiry_id,))
             response = ContactInquiryResponseSchema(**dict(result[0]))
@@ -4,8 +4,18 @@ Metrics routes
 from flask import request, jsonify, make_response
 import traceback
 from datetime import datetime
-from database import execute_update, execute_query
-from utils.helpers import require_admin_auth, abort_with_message
+from database import execute_update, execute_query, get_replica_status
+from utils.helpers import require_admin_auth, abort_with_message, get_auth_cache_stats
+from utils.email_outbox import get_outbox_stats
+from utils.task_executor import get_task_stats
+from utils.app_metrics import get_pipeline_stats
+from utils.log_ingest import get_log_pipeline_stats
+from utils.response_cache import get_cache_stats
+from utils.property_index import property_index
+from utils.schema_info import refresh_schema_info, get_schema_summary
+from utils.metrics_rollup import (
+    hourly_latency_percentiles, endpoint_latency_percentiles, recent_latency_percentiles
+)
 
 
 def register_metrics_routes(app):
@@ -37,38 +47,41 @@ def register_metrics_routes(app):
             if system_hours > 168:  # Max 7 days
                 system_hours = 168
             
-            # Get metrics aggregated by hour from application_metrics table
+            # Time series, current stats and top endpoints are read from the
+            # pre-aggregated rollups (utils/metrics_rollup.py), never from raw rows
             query = """
                 SELECT 
-                    DATE_FORMAT(created_at, '%%Y-%%m-%%d %%H:00:00') as time_bucket,
-                    COUNT(*) as request_count,
-                    AVG(response_time_ms) as avg_response_time,
-                    MAX(response_time_ms) as max_response_time,
-                    MIN(response_time_ms) as min_response_time,
-                    SUM(CASE WHEN is_error = 1 THEN 1 ELSE 0 END) as error_count,
-                    SUM(CASE WHEN status_code >= 200 AND status_code < 300 THEN 1 ELSE 0 END) as success_count,
-                    SUM(CASE WHEN status_code >= 400 THEN 1 ELSE 0 END) as client_error_count,
-                    SUM(CASE WHEN status_code >= 500 THEN 1 ELSE 0 END) as server_error_count
-                FROM application_metrics
-                WHERE created_at >= DATE_SUB(NOW(), INTERVAL %s HOUR)
-                GROUP BY time_bucket
-                ORDER BY time_bucket ASC
+                    DATE_FORMAT(bucket_start, '%%Y-%%m-%%d %%H:00:00') as time_bucket,
+                    SUM(request_count) as request_count,
+                    SUM(total_response_time_ms) / NULLIF(SUM(request_count), 0) as avg_response_time,
+                    MAX(max_response_time_ms) as max_response_time,
+                    MIN(min_response_time_ms) as min_response_time,
+                    SUM(error_count) as error_count,
+                    SUM(success_count) as success_count,
+                    SUM(client_error_count) as client_error_count,
+                    SUM(server_error_count) as server_error_count
+                FROM application_metrics_rollup
+                WHERE granularity = 'hour'
+                  AND bucket_start >= DATE_FORMAT(DATE_SUB(UTC_TIMESTAMP(), INTERVAL %s HOUR), '%%Y-%%m-%%d %%H:00:00')
+                GROUP BY bucket_start
+                ORDER BY bucket_start ASC
             """
             
             metrics = execute_query(query, (hours,))
             
-            # Get current stats (last hour)
+            # Get current stats (last hour, from minute buckets)
             current_query = """
                 SELECT 
-                    COUNT(*) as request_count,
-                    AVG(response_time_ms) as avg_response_time,
-                    SUM(CASE WHEN is_error = 1 THEN 1 ELSE 0 END) as error_count,
-                    SUM(CASE WHEN status_code >= 200 AND status_code < 300 THEN 1 ELSE 0 END) as success_count
-                FROM application_metrics
-                WHERE created_at >= DATE_SUB(NOW(), INTERVAL 1 HOUR)
+                    SUM(request_count) as request_count,
+                    SUM(total_response_time_ms) / NULLIF(SUM(request_count), 0) as avg_response_time,
+                    SUM(error_count) as error_count,
+                    SUM(success_count) as success_count
+                FROM application_metrics_rollup
+                WHERE granularity = 'minute'
+                  AND bucket_start >= DATE_SUB(UTC_TIMESTAMP(), INTERVAL %s MINUTE)
             """
             
-            current_stats = execute_query(current_query)
+            current_stats = execute_query(current_query, (60,))
             current = current_stats[0] if current_stats and len(current_stats) > 0 else {}
             
             # Get top endpoints by request count
@@ -76,11 +89,12 @@ def register_metrics_routes(app):
                 SELECT 
                     endpoint,
                     method,
-                    COUNT(*) as request_count,
-                    AVG(response_time_ms) as avg_response_time,
-                    SUM(CASE WHEN is_error = 1 THEN 1 ELSE 0 END) as error_count
-                FROM application_metrics
-                WHERE created_at >= DATE_SUB(NOW(), INTERVAL %s HOUR)
+                    SUM(request_count) as request_count,
+                    SUM(total_response_time_ms) / NULLIF(SUM(request_count), 0) as avg_response_time,
+                    SUM(error_count) as error_count
+                FROM application_metrics_rollup
+                WHERE granularity = 'hour'
+                  AND bucket_start >= DATE_FORMAT(DATE_SUB(UTC_TIMESTAMP(), INTERVAL %s HOUR), '%%Y-%%m-%%d %%H:00:00')
                 GROUP BY endpoint, method
                 ORDER BY request_count DESC
                 LIMIT 10
@@ -88,6 +102,14 @@ def register_metrics_routes(app):
             
             top_endpoints = execute_query(top_endpoints_query, (hours,))
             
+            # Tail latency from the merged latency histograms
+            hourly_percentiles = hourly_latency_percentiles(hours)
+            current_percentiles = recent_latency_percentiles(60)
+            top_endpoint_percentiles = endpoint_latency_percentiles(
+                hours, [(e.get('endpoint'), e.get('method')) for e in top_endpoints]
+            )
+            empty_percentiles = {"p50": None, "p90": None, "p95": None, "p99": None}
+            
             # Get cache statistics from cache_logs (if table exists)
             cache_stats = {
                 "total_operations": 0,
@@ -193,7 +215,8 @@ def register_metrics_routes(app):
                         "error_count": int(m.get('error_count', 0) or 0),
                         "success_count": int(m.get('success_count', 0) or 0),
                         "client_error_count": int(m.get('client_error_count', 0) or 0),
-                        "server_error_count": int(m.get('server_error_count', 0) or 0)
+                        "server_error_count": int(m.get('server_error_count', 0) or 0),
+                        **hourly_percentiles.get(m.get('time_bucket', ''), empty_percentiles)
                     }
                     for m in metrics
                 ],
@@ -201,7 +224,8 @@ def register_metrics_routes(app):
                     "request_count": int(current.get('request_count', 0) or 0),
                     "avg_response_time": float(current.get('avg_response_time', 0) or 0),
                     "error_count": int(current.get('error_count', 0) or 0),
-                    "success_count": int(current.get('success_count', 0) or 0)
+                    "success_count": int(current.get('success_count', 0) or 0),
+                    **current_percentiles
                 },
                 "top_endpoints": [
                     {
@@ -209,11 +233,20 @@ def register_metrics_routes(app):
                         "method": e.get('method', ''),
                         "request_count": int(e.get('request_count', 0) or 0),
                         "avg_response_time": float(e.get('avg_response_time', 0) or 0),
-                        "error_count": int(e.get('error_count', 0) or 0)
+                        "error_count": int(e.get('error_count', 0) or 0),
+                        **top_endpoint_percentiles.get((e.get('endpoint'), e.get('method')), empty_percentiles)
                     }
                     for e in top_endpoints
                 ],
                 "cache_stats": cache_stats,
+                "metrics_pipeline": get_pipeline_stats(),
+                "logs_pipeline": get_log_pipeline_stats(),
+                "response_cache": get_cache_stats(),
+                "property_index": property_index.stats(),
+                "read_replicas": get_replica_status(),
+                "auth_cache": get_auth_cache_stats(),
+                "email_outbox": get_outbox_stats(),
+                "background_tasks": get_task_stats(),
                 "system_metrics": {
                     "time_series": system_time_series,
                     "current": {
@@ -235,6 +268,68 @@ def register_metrics_routes(app):
             traceback.print_exc()
             abort_with_message(500, f"Error fetching application metrics: {str(e)}")
     
+    @app.route("/api/admin/application-metrics/latency", methods=["GET", "OPTIONS"])
+    @require_admin_auth
+    def get_endpoint_latency():
+        """Hourly p50/p90/p95/p99 for one endpoint (e.g. ?endpoint=/api/properties&method=GET)"""
+        if request.method == "OPTIONS":
+            response = make_response()
+            response.headers['Access-Control-Allow-Origin'] = '*'
+            response.headers['Access-Control-Allow-Methods'] = 'GET, OPTIONS'
+            response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+            return response
+        
+        endpoint = request.args.get('endpoint', '').strip()
+        if not endpoint:
+            abort_with_message(400, "endpoint query parameter is required")
+        method = request.args.get('method', '').strip().upper() or None
+        
+        try:
+            hours = request.args.get('hours', default=24, type=int)
+            if hours < 1:
+                hours = 24
+            if hours > 168:  # Max 7 days
+                hours = 168
+            
+            hourly = hourly_latency_percentiles(hours, endpoint=endpoint, method=method)
+            response = jsonify({
+                "success": True,
+                "endpoint": endpoint,
+                "method": method,
+                "time_series": [
+                    {"time": time_bucket, **hourly[time_bucket]}
+                    for time_bucket in sorted(hourly)
+                ]
+            })
+            response.headers['Access-Control-Allow-Origin'] = '*'
+            return response
+        except Exception as e:
+            print(f"Error fetching endpoint latency: {str(e)}")
+            traceback.print_exc()
+            abort_with_message(500, f"Error fetching endpoint latency: {str(e)}")
+    
+    @app.route("/api/admin/schema-info", methods=["GET", "POST", "OPTIONS"])
+    @require_admin_auth
+    def schema_info():
+        """Cached table/column list used to pick query variants; POST reloads it after a migration"""
+        if request.method == "OPTIONS":
+            response = make_response()
+            response.headers['Access-Control-Allow-Origin'] = '*'
+            response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
+            response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+            return response
+        
+        try:
+            refreshed = refresh_schema_info() if request.method == "POST" else None
+            # Other worker processes pick up the change within SCHEMA_INFO_TTL_SECONDS
+            response = jsonify({"success": True, "refreshed": refreshed, **get_schema_summary()})
+            response.headers['Access-Control-Allow-Origin'] = '*'
+            return response
+        except Exception as e:
+            print(f"Error reading schema info: {str(e)}")
+            traceback.print_exc()
+            abort_with_message(500, f"Error reading schema info: {str(e)}")
+    
     @app.route("/api/admin/metrics/collect-app", methods=["POST", "OPTIONS"])
     def collect_app_metrics():
         """Collect and store frontend application-specific metrics (CPU, RAM, Bandwidth)"""
@@ -6,12 +6,14 @@ import traceback
 from database import execute_query, execute_update, execute_insert
 from schemas import PartnerResponseSchema, PartnerUpdateSchema, PartnerCreateSchema
 from utils.helpers import normalize_image_url, get_image_url_from_logo_url, abort_with_message, require_admin_auth
+from utils.response_cache import cached_response, invalidates
 
 
 def register_partners_routes(app):
     """Register partners routes"""
     
     @app.route("/api/partners", methods=["GET"])
+    @cached_response("partners")
     def get_partners():
         """Get all partners"""
         try:
@@ -71,6 +73,7 @@ def register_partners_routes(app):
     
     @app.route("/api/partners", methods=["POST"])
     @require_admin_auth
+    @invalidates("partners")
     def create_partner():
         """Create a new partner"""
         try:
@@ -117,6 +120,7 @@ def register_partners_routes(app):
     
     @app.route("/api/partners/<int:partner_id>", methods=["POST"])
     @require_admin_auth
+    @invalidates("partners")
     def update_partner(partner_id: int):
         """Update a partner"""
         try:
@@ -171,6 +175,7 @@ def register_partners_routes(app):
     
     @app.route("/api/partners/<int:partner_id>", methods=["DELETE"])
     @require_admin_auth
+    @invalidates("partners")
     def delete_partner(partner_id: int):
         """Delete a partner"""
         try:
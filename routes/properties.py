@@ -1,11 +1,13 @@
 """
 Properties routes
 """
-from flask import request, jsonify, current_app, make_response
+from flask import request, jsonify, current_app, make_response, send_file
 from datetime import datetime, date
 from decimal import Decimal
+import hashlib
 import traceback
 import json
+from typing import Optional, Tuple
 from database import execute_query, execute_update, execute_insert
 from models import PropertyType, PropertyStatus
 from schemas import PaginatedResponse
@@ -13,13 +15,115 @@ from utils.helpers import (
     get_pagination_params, calculate_pages, normalize_image_url, error_response, success_response,
     process_image_urls, require_admin_auth, safe_int, safe_float
 )
+from utils.response_cache import cached_response, invalidates
+from utils.image_store import (
+    get_image_file, save_uploaded_image, save_image_bytes, ImageNotFound, InvalidImageUpload
+)
+from utils.image_variants import get_variant_file
+from utils.property_queries import (
+    build_listing_filters, count_listing, fetch_listing_page, decode_cursor, next_page_cursor,
+    fetch_primary_images, normalize_listing_item, hydrate_listing_rows
+)
+from utils.property_index import property_index, keys_for_hydration
+from utils.property_detail import fetch_property_detail, build_property_detail_response
+from utils.id_collisions import get_collision, mark_collision_index_stale
+from utils.schema_info import has_table, has_column
 from config import IMAGES_DIR
 
 
+def listing_request_args() -> Tuple[dict, Optional[tuple]]:
+    """
+    GET /api/properties filters (build_listing_filters keyword arguments) and the
+    decoded keyset cursor; raises ValueError for a malformed cursor.
+    Shared with the async serving mode.
+    """
+    args = dict(
+        type_str=request.args.get('type'),
+        status_str=request.args.get('status'),
+        min_price=request.args.get('min_price', type=float),
+        max_price=request.args.get('max_price', type=float),
+        location=request.args.get('location'),
+        is_featured=request.args.get('is_featured', type=lambda x: x.lower() == 'true' if x else None),
+        is_active=request.args.get('is_active', default='true', type=lambda x: x.lower() == 'true' if x else True)
+    )
+    # Optional keyset pagination: ?cursor=<next_cursor> takes precedence over page
+    cursor = None
+    cursor_str = request.args.get('cursor')
+    if cursor_str:
+        cursor = decode_cursor(cursor_str)
+    return args, cursor
+
+
+def listing_index_args(args: dict) -> dict:
+    """listing_request_args() filters as property_index.listing_keys arguments (active rows only)"""
+    return {k: v for k, v in args.items() if k != 'is_active'}
+
+
+def listing_response(properties, primary_images, total, pagination, next_cursor):
+    """Normalize one page of listing rows into the paginated JSON response"""
+    normalized_properties = [
+        normalize_listing_item(prop, primary_images.get((prop.get('property_category'), prop.get('id'))))
+        for prop in properties
+    ]
+    
+    response = PaginatedResponse(
+        total=total,
+        page=pagination.page,
+        limit=pagination.limit,
+        pages=calculate_pages(total, pagination.limit) if total is not None else None,
+        items=normalized_properties,
+        next_cursor=next_cursor
+    )
+    result = jsonify(response.dict())
+    result.headers['Access-Control-Allow-Origin'] = '*'
+    return result
+
+
+def detail_request_category(property_id: int):
+    """
+    (category, None) for a valid GET /api/properties/<id> request, or
+    (category, error response) when the category is missing or the id collides.
+    Shared with the async serving mode.
+    """
+    # CRITICAL FIX: Category is REQUIRED - IDs are not globally unique across tables
+    category = request.args.get('category', '').lower()
+
+    if not category or category not in ['commercial', 'residential', 'plot']:
+        return category, error_response(
+            "Category parameter is required. Use ?category=commercial, ?category=residential, or ?category=plot",
+            400
+        )
+
+    # Cross-table ID collisions come from a periodically refreshed index, so only
+    # the requested category's table is read here
+    matches = get_collision(property_id)
+
+    # CRITICAL FIX: HARD-FAIL if ID exists in multiple tables (data integrity violation)
+    if matches:
+        error_msg = (
+            f"DATA_INTEGRITY_ERROR: Property ID {property_id} exists in multiple tables: {matches}. "
+            f"This is a critical data integrity violation. Each property ID must exist in only one table. "
+            f"Please delete the duplicate row(s) from the incorrect table(s)."
+        )
+        current_app.logger.error(error_msg)
+        return category, error_response(
+            {
+                "error": "DATA_INTEGRITY_ERROR",
+                "message": f"Property {property_id} exists in multiple tables",
+                "tables": matches,
+                "detail": "This property ID exists in multiple property tables. Please contact admin to resolve this data integrity issue."
+            },
+            500
+        )
+    
+    return category, None
+
+
 def register_properties_routes(app):
     """Register properties routes"""
     
     @app.route("/api/properties", methods=["GET", "OPTIONS"])
+    @cached_response("properties")
     def get_properties_route():
         """Get all properties with filtering and pagination"""
         # Handle OPTIONS request for CORS preflight
@@ -149,6 +253,7 @@ def register_properties_routes(app):
 
     @app.route("/api/properties", methods=["POST"])
     @require_admin_auth
+    @invalidates("properties")
     def create_property_route():
         """Create a new property"""
         return create_property()
@@ -159,294 +264,45 @@ def register_properties_routes(app):
             pagination = get_pagination_params()
             offset = (pagination.page - 1) * pagination.limit
             
-            # Get query parameters
-            type_str = request.args.get('type')
-            status_str = request.args.get('status')
-            min_price = request.args.get('min_price', type=float)
-            max_price = request.args.get('max_price', type=float)
-            location = request.args.get('location')
-            is_featured = request.args.get('is_featured', type=lambda x: x.lower() == 'true' if x else None)
-            is_active = request.args.get('is_active', default='true', type=lambda x: x.lower() == 'true' if x else True)
-            
-            # Build WHERE clause
-            is_active_int = 1 if is_active else 0
-            conditions = ["is_active = %s"]
-            params = [is_active_int]
-            
-            if type_str:
-                try:
-                    prop_type = PropertyType(type_str)
-                    conditions.append("type = %s")
-                    params.append(prop_type.value)
-                except ValueError:
-                    pass
-            
-            if status_str:
-                try:
-                    prop_status = PropertyStatus(status_str)
-                    conditions.append("status = %s")
-                    params.append(prop_status.value)
-                except ValueError:
-                    pass
-            
-            if min_price is not None:
-                conditions.append("price >= %s")
-                params.append(min_price)
-            
-            if max_price is not None:
-                conditions.append("price <= %s")
-                params.append(max_price)
-            
-            if location:
-                # Search in both city and locality fields
-                conditions.append("(LOWER(city) LIKE %s OR LOWER(locality) LIKE %s)")
-                params.append(f"%{location.lower()}%")
-                params.append(f"%{location.lower()}%")
-            
-            if is_featured is not None:
-                is_featured_int = 1 if is_featured else 0
-                conditions.append("is_featured = %s")
-                params.append(is_featured_int)
-            
-            where_clause = " AND ".join(conditions)
-            
-            # Build separate conditions for residential and plot properties
-            # For plots, exclude type filter since they don't have a type field
-            type_filter_index = None
-            if type_str and "type = %s" in where_clause:
-                # Find the index of type filter in conditions
-                for i, cond in enumerate(conditions):
-                    if cond == "type = %s":
-                        type_filter_index = i
-                        break
-            
-            # Build params for residential (include type filter) and plot (exclude type filter)
-            residential_params = list(params)
-            plot_params = [p for i, p in enumerate(params) if i != type_filter_index] if type_filter_index is not None else list(params)
-            
-            # Build where clauses
-            residential_where = where_clause
-            plot_where = " AND ".join([c for i, c in enumerate(conditions) if i != type_filter_index]) if type_filter_index is not None else where_clause
-            
-            # Commercial: build conditions (no "type" column; use property_type if filter matches)
-            conditions_com = ["is_active = %s"]
-            params_com = [is_active_int]
-            if type_str and type_str in ("office_space", "warehouse", "showrooms"):
-                conditions_com.append("property_type = %s")
-                params_com.append(type_str)
-            if min_price is not None:
-                conditions_com.append("price >= %s")
-                params_com.append(min_price)
-            if max_price is not None:
-                conditions_com.append("price <= %s")
-                params_com.append(max_price)
-            if location:
-                conditions_com.append("(LOWER(city) LIKE %s OR LOWER(locality) LIKE %s)")
-                params_com.append(f"%{location.lower()}%")
-                params_com.append(f"%{location.lower()}%")
-            if is_featured is not None:
-                conditions_com.append("is_featured = %s")
-                params_com.append(1 if is_featured else 0)
-            commercial_where = " AND ".join(conditions_com)
-
-            # Get total count from all three tables
-            count_res = execute_query(f"SELECT COUNT(*) as total FROM residential_properties WHERE {residential_where}", tuple(residential_params)) if residential_where else [{'total': 0}]
-            count_plot = execute_query(f"SELECT COUNT(*) as total FROM plot_properties WHERE {plot_where}", tuple(plot_params)) if plot_where else [{'total': 0}]
             try:
-                count_com = execute_query(f"SELECT COUNT(*) as total FROM commercial_properties WHERE {commercial_where}", tuple(params_com))
-            except Exception:
-                count_com = [{'total': 0}]
-            total = (count_res[0]['total'] if count_res else 0) + (count_plot[0]['total'] if count_plot else 0) + (count_com[0]['total'] if count_com else 0)
+                args, cursor = listing_request_args()
+            except ValueError:
+                error_resp, status_code = error_response("Invalid cursor parameter", 400)
+                error_resp.headers['Access-Control-Allow-Origin'] = '*'
+                return error_resp, status_code
+            is_active = args['is_active']
+            
+            filters = build_listing_filters(**args)
             
-            # Query both tables separately and combine results
+            # Merge the three tables in SQL: count + one page of keys, then hydrate only that page
             import time
             query_start = time.time()
             
-            # Query residential properties
-            residential_query = f"""
-                SELECT 
-                    id, city, locality, property_name as title, property_name, 
-                    unit_type, bedrooms, bathrooms, buildup_area as area, buildup_area, carpet_area, 
-                    super_built_up_area, price, price_text, price_negotiable,
-                    type, status, property_status, description,
-                    location_link, rera_number, rera_url, directions, length, breadth,
-                    builder, configuration, total_flats, total_floors, total_acres,
-                    is_featured, is_active, created_at, updated_at,
-                    'residential' as property_category,
-                    NULL as plot_area, NULL as plot_length, NULL as plot_breadth,
-                    NULL as project_name,
-                    type as property_type,
-                    NULL as price_includes_registration
-                FROM residential_properties
-                WHERE {residential_where}
-                ORDER BY created_at DESC
-            """
-            residential_props = execute_query(residential_query, tuple(residential_params)) if residential_where else []
-            
-            # Query plot properties (only if no type filter is set, since plots don't have a type field)
-            plot_props = []
-            if type_filter_index is None:
-                plot_query = f"""
-                    SELECT 
-                        id, city, locality, project_name as title, project_name as property_name,
-                        NULL as unit_type, 0 as bedrooms, 0 as bathrooms, plot_area as area, NULL as buildup_area, NULL as carpet_area,
-                        NULL as super_built_up_area, price, price_text, price_negotiable,
-                        'plot' as type, status, property_status, description,
-                        location_link, rera_number, rera_url, directions, NULL as length, NULL as breadth,
-                        builder, NULL as configuration, NULL as total_flats, NULL as total_floors, total_acres,
-                        is_featured, is_active, created_at, updated_at,
-                        'plot' as property_category,
-                        plot_area, plot_length, plot_breadth,
-                        project_name,
-                        NULL as price_includes_registration
-                    FROM plot_properties
-                    WHERE {plot_where}
-                    ORDER BY created_at DESC
-                """
-                plot_props = execute_query(plot_query, tuple(plot_params)) if plot_where else []
-
-            # Query commercial properties
-            commercial_props = []
-            try:
-                commercial_query = f"""
-                    SELECT
-                        id, city, locality, property_name as title, property_name,
-                        NULL as unit_type, 0 as bedrooms, 0 as bathrooms,
-                        COALESCE(super_built_up_area, 0) as area, NULL as buildup_area, carpet_area,
-                        super_built_up_area, price, price_text, price_negotiable,
-                        property_type as type, status, property_status, description,
-                        location_link, rera_number, rera_url, directions, NULL as length, NULL as breadth,
-                        NULL as builder, NULL as configuration, NULL as total_flats, total_floors, NULL as total_acres,
-                        is_featured, is_active, created_at, updated_at,
-                        'commercial' as property_category,
-                        plot_area, NULL as plot_length, NULL as plot_breadth,
-                        property_name as project_name,
-                        property_type,
-                        NULL as price_includes_registration,
-                        floor_number, total_seats_workstations, number_of_cabins, number_of_parking_slots,
-                        parking_options, frontage_width, frontage_unit, footfall_potential,
-                        ground_floor_area, ceiling_height, mezzanine_area,
-                        warehouse_type, clearance_height, clearance_height_unit, dock_levelers,
-                        number_of_shutters, shutter_height, shutter_height_unit, floor_load_capacity
-                    FROM commercial_properties
-                    WHERE {commercial_where}
-                    ORDER BY created_at DESC
-                """
-                commercial_props = execute_query(commercial_query, tuple(params_com))
-            except Exception as e:
-                print(f"Warning: could not query commercial_properties: {e}")
-
-            # Combine and sort by created_at
-            all_properties = residential_props + plot_props + commercial_props
-            all_properties.sort(key=lambda x: x.get('created_at', datetime.min), reverse=True)
-            
-            # Apply pagination
-            properties = all_properties[offset:offset + pagination.limit]
+            if is_active and property_index.ensure_current():
+                # In-memory index: filter with set intersections, read only this page from MySQL
+                keys = property_index.listing_keys(**listing_index_args(args))
+                total = len(keys)
+                start = offset
+                if cursor is not None:
+                    start = property_index.position_after(keys, cursor)
+                properties = hydrate_listing_rows(keys_for_hydration(keys[start:start + pagination.limit]))
+            else:
+                # commercial_properties may not exist on older databases
+                if not has_table('commercial_properties'):
+                    filters.pop('commercial', None)
+                # Cursor requests come from "load more": the client already has the total
+                total = count_listing(filters) if cursor is None else None
+                properties = fetch_listing_page(filters, pagination.limit, offset, cursor)
+            next_cursor = next_page_cursor(properties, pagination.limit)
             
             query_time = time.time() - query_start
             
             if query_time > 1.0:  # Log slow queries (> 1 second)
                 print(f"[PERF] Slow query detected: {query_time:.2f}s for page {pagination.page}, limit {pagination.limit}")
             
-            # Fetch primary images for each property and normalize image URLs
-            normalized_properties = []
-            for prop in properties:
-                prop_dict = dict(prop)
-                property_id = prop_dict.get('id')
-                property_category = prop_dict.get('property_category', 'residential')
-                
-                # Fetch primary image from the new image tables (project, floorplan, masterplan)
-                if property_id:
-                    try:
-                        if property_category == 'residential':
-                            primary_image_query = """
-                                SELECT image_url 
-                                FROM residential_property_images
-                                WHERE property_id = %s
-                                ORDER BY created_at ASC, image_order ASC 
-                                LIMIT 1
-                            """
-                        elif property_category == 'commercial':
-                            primary_image_query = """
-                                SELECT image_url 
-                                FROM commercial_property_images
-                                WHERE property_id = %s
-                                ORDER BY created_at ASC, image_order ASC 
-                                LIMIT 1
-                            """
-                        else:
-                            primary_image_query = """
-                                SELECT image_url 
-                                FROM plot_property_images
-                                WHERE property_id = %s
-                                ORDER BY created_at ASC, image_order ASC 
-                                LIMIT 1
-                            """
-                        
-                        primary_images = execute_query(primary_image_query, (property_id,))
-                        if primary_images and primary_images[0].get('image_url'):
-                            normalized_first_image = normalize_image_url(primary_images[0]['image_url'])
-                            prop_dict['primary_image'] = normalized_first_image
-                            # Populate images array with the first image for frontend display
-                            prop_dict['images'] = [{'image_url': normalized_first_image}]
-                    except Exception as e:
-                        # If image fetch fails, continue without images
-                        print(f"Warning: Could not fetch images for property {property_id}: {str(e)}")
-                
-                # Normalize existing primary_image if it exists (fallback - in case property table has primary_image field)
-                if 'primary_image' in prop_dict and prop_dict['primary_image']:
-                    prop_dict['primary_image'] = normalize_image_url(prop_dict['primary_image'])
-                    # If images array is empty but primary_image exists, populate it
-                    if 'images' not in prop_dict or not prop_dict.get('images'):
-                        prop_dict['images'] = [{'image_url': prop_dict['primary_image']}]
-                
-                # Ensure images array exists
-                if 'images' not in prop_dict:
-                    prop_dict['images'] = []
-                
-                # Construct location from city and locality if not already present
-                if 'location' not in prop_dict or not prop_dict.get('location'):
-                    city = prop_dict.get('city', '')
-                    locality = prop_dict.get('locality', '')
-                    if city and locality:
-                        prop_dict['location'] = f"{city}, {locality}"
-                    elif city:
-                        prop_dict['location'] = city
-                    elif locality:
-                        prop_dict['location'] = locality
-                    else:
-                        prop_dict['location'] = 'Location not specified'
-                
-                # Convert TINYINT(1) to boolean for price_negotiable and price_includes_registration
-                if 'price_negotiable' in prop_dict:
-                    prop_dict['price_negotiable'] = bool(prop_dict['price_negotiable'])
-                if 'price_includes_registration' in prop_dict:
-                    prop_dict['price_includes_registration'] = bool(prop_dict['price_includes_registration'])
-                
-                # Convert numeric fields to proper types
-                if 'bathrooms' in prop_dict and prop_dict['bathrooms'] is not None:
-                    prop_dict['bathrooms'] = float(prop_dict['bathrooms'])
-                if 'area' in prop_dict and prop_dict['area'] is not None:
-                    prop_dict['area'] = int(float(prop_dict['area']))
-                
-                # Serialize created_at and updated_at from database for API response
-                if 'created_at' in prop_dict and isinstance(prop_dict['created_at'], datetime):
-                    prop_dict['created_at'] = prop_dict['created_at'].isoformat()
-                if 'updated_at' in prop_dict and isinstance(prop_dict['updated_at'], datetime):
-                    prop_dict['updated_at'] = prop_dict['updated_at'].isoformat()
-                
-                normalized_properties.append(prop_dict)
-            
-            response = PaginatedResponse(
-                total=total,
-                page=pagination.page,
-                limit=pagination.limit,
-                pages=calculate_pages(total, pagination.limit),
-                items=normalized_properties
-            )
-            result = jsonify(response.dict())
-            result.headers['Access-Control-Allow-Origin'] = '*'
-            return result
+            # Fetch primary images for the whole page (one query per category) and normalize rows
+            primary_images = fetch_primary_images(properties)
+            return listing_response(properties, primary_images, total, pagination, next_cursor)
         except Exception as e:
             error_msg = str(e)
             print(f"Error fetching properties: {error_msg}")
@@ -744,6 +600,7 @@ def register_properties_routes(app):
             # We just need to link them to this property
             image_gallery = data.get("image_gallery") or []
             images = data.get("images") or []
+            has_image_title = has_column(img_table, 'image_title')
             
             # Process gallery images if available
             if image_gallery:
@@ -773,10 +630,16 @@ def register_properties_routes(app):
                             db_category = category_map.get(image_category, "project")
                             image_title = (gallery_item.get("title") or "").strip() or ""
                             # Insert into property images table
-                            execute_insert(
-                                f"INSERT INTO {img_table} (property_id, image_url, image_category, image_order, image_title) VALUES (%s, %s, %s, %s, %s)",
-                                (property_id, final_url, db_category, idx, image_title)
-                            )
+                            if has_image_title:
+                                execute_insert(
+                                    f"INSERT INTO {img_table} (property_id, image_url, image_category, image_order, image_title) VALUES (%s, %s, %s, %s, %s)",
+                                    (property_id, final_url, db_category, idx, image_title)
+                                )
+                            else:
+                                execute_insert(
+                                    f"INSERT INTO {img_table} (property_id, image_url, image_category, image_order) VALUES (%s, %s, %s, %s)",
+                                    (property_id, final_url, db_category, idx)
+                                )
                 except Exception as img_err:
                     print(f"Warning: could not insert gallery images for property {property_id}: {img_err}")
             
@@ -818,6 +681,9 @@ def register_properties_routes(app):
                 except Exception as fe:
                     print(f"Warning: could not insert features for property {property_id}: {fe}")
             
+            # A new AUTO_INCREMENT id may collide with another table; re-check on the next detail view
+            mark_collision_index_stale()
+            property_index.upsert(feature_category, property_id)
             return jsonify({"message": "Property created successfully", "id": property_id}), 201
         except ValueError as e:
             error_msg = f"Invalid data type: {str(e)}"
@@ -833,6 +699,7 @@ def register_properties_routes(app):
             return error_response(error_msg, 500)
     
     @app.route("/api/properties/<int:property_id>", methods=["GET"])
+    @cached_response("properties")
     def get_property(property_id: int):
         """Get a single property by ID with images and features
         
@@ -840,337 +707,21 @@ def register_properties_routes(app):
         Since property IDs can overlap between tables, category is REQUIRED to identify the correct table.
         """
         try:
-            # CRITICAL FIX: Category is REQUIRED - IDs are not globally unique across tables
-            category = request.args.get('category', '').lower()
-            
-            if not category or category not in ['commercial', 'residential', 'plot']:
-                return error_response(
-                    "Category parameter is required. Use ?category=commercial, ?category=residential, or ?category=plot",
-                    400
-                )
+            category, error = detail_request_category(property_id)
+            if error is not None:
+                return error
             
-            # CRITICAL FIX: Check ALL tables to detect ID collisions (safety guard)
-            commercial_result = None
-            residential_result = None
-            plot_result = None
-            
-            # Check all three tables in parallel
-            try:
-                commercial_query = """
-                    SELECT 
-                        id, city, locality, property_name as title, property_name,
-                        NULL as unit_type, 0 as bedrooms, 0 as bathrooms,
-                        COALESCE(super_built_up_area, 0) as area, NULL as buildup_area, carpet_area,
-                        super_built_up_area, price, price_text, price_negotiable,
-                        property_type as type, status, property_status, description,
-                        location_link, rera_number, rera_url, directions, NULL as length, NULL as breadth,
-                        NULL as builder, NULL as configuration, NULL as total_flats, total_floors, NULL as total_acres,
-                        is_featured, is_active, created_at, updated_at,
-                        'commercial' as property_category,
-                        plot_area, NULL as plot_length, NULL as plot_breadth,
-                        property_name as project_name,
-                        property_type,
-                        NULL as price_includes_registration,
-                        floor_number, total_seats_workstations, number_of_cabins, number_of_parking_slots,
-                        parking_options, frontage_width, frontage_unit, footfall_potential,
-                        ground_floor_area, ceiling_height, mezzanine_area,
-                        warehouse_type, clearance_height, clearance_height_unit, dock_levelers,
-                        number_of_shutters, shutter_height, shutter_height_unit, floor_load_capacity
-                    FROM commercial_properties
-                    WHERE id = %s
-                """
-                commercial_result = execute_query(commercial_query, (property_id,))
-            except Exception:
-                pass
-            
-            try:
-                residential_query = """
-                    SELECT 
-                        id, city, locality, property_name as title, property_name, 
-                        unit_type, bedrooms, bathrooms, buildup_area as area, buildup_area, carpet_area, 
-                        super_built_up_area, price, price_text, price_negotiable,
-                        type, villa_type, status, listing_type, property_status, description,
-                        location_link, rera_number, rera_url, directions, length, breadth,
-                        builder, configuration, total_flats, total_floors, total_acres,
-                        is_featured, is_active, created_at, updated_at,
-                        'residential' as property_category,
-                        NULL as plot_area, NULL as plot_length, NULL as plot_breadth,
-                        NULL as project_name,
-                        type as property_type,
-                        NULL as price_includes_registration,
-                        possession_date
-                    FROM residential_properties
-                    WHERE id = %s
-                """
-                residential_result = execute_query(residential_query, (property_id,))
-            except Exception:
-                pass
-            
-            try:
-                plot_query = """
-                    SELECT 
-                        id, city, locality, project_name as title, project_name as property_name,
-                        NULL as unit_type, 0 as bedrooms, 0 as bathrooms, plot_area as area, NULL as buildup_area, NULL as carpet_area,
-                        NULL as super_built_up_area, price, price_text, price_negotiable,
-                        'plot' as type, status, property_status, description,
-                        location_link, rera_number, rera_url, directions, NULL as length, NULL as breadth,
-                        builder, NULL as configuration, NULL as total_flats, NULL as total_floors, total_acres,
-                        is_featured, is_active, created_at, updated_at,
-                        'plot' as property_category,
-                        plot_area, plot_length, plot_breadth,
-                        project_name,
-                        'plot_properties' as property_type,
-                        NULL as price_includes_registration
-                    FROM plot_properties
-                    WHERE id = %s
-                """
-                plot_result = execute_query(plot_query, (property_id,))
-            except Exception:
-                pass
-            
-            # CRITICAL FIX: Safety guard - detect ID collisions
-            matches = []
-            if commercial_result:
-                matches.append('commercial')
-            if residential_result:
-                matches.append('residential')
-            if plot_result:
-                matches.append('plot')
-            
-            # CRITICAL FIX: HARD-FAIL if ID exists in multiple tables (data integrity violation)
-            if len(matches) > 1:
-                error_msg = (
-                    f"DATA_INTEGRITY_ERROR: Property ID {property_id} exists in multiple tables: {matches}. "
-                    f"This is a critical data integrity violation. Each property ID must exist in only one table. "
-                    f"Please delete the duplicate row(s) from the incorrect table(s)."
-                )
-                current_app.logger.error(error_msg)
-                return error_response(
-                    {
-                        "error": "DATA_INTEGRITY_ERROR",
-                        "message": f"Property {property_id} exists in multiple tables",
-                        "tables": matches,
-                        "detail": "This property ID exists in multiple property tables. Please contact admin to resolve this data integrity issue."
-                    },
-                    500
-                )
-            
-            # CRITICAL FIX: Return property from requested category ONLY
-            # If category doesn't match or property doesn't exist, return 404
-            properties = None
-            property_category = None
-            
-            if category == 'commercial' and commercial_result:
-                properties = commercial_result
-                property_category = 'commercial'
-            elif category == 'residential' and residential_result:
-                properties = residential_result
-                property_category = 'residential'
-            elif category == 'plot' and plot_result:
-                properties = plot_result
-                property_category = 'plot'
+            # Property row, images and features are fetched concurrently
+            row, images, features = fetch_property_detail(category, property_id)
             
             # If requested category doesn't have the property, return 404
-            if not properties:
+            if not row:
                 return error_response(
                     f"Property ID {property_id} not found in {category} properties",
                     404
                 )
             
-            property_data = dict(properties[0])
-            row = properties[0]
-
-            # Serialize created_at and updated_at from database for API response (for frontend "Listed on" display)
-            if 'created_at' in property_data and property_data['created_at'] is not None:
-                if isinstance(property_data['created_at'], datetime):
-                    property_data['created_at'] = property_data['created_at'].isoformat()
-            else:
-                # Ensure created_at from DB is always included when available
-                created_at_val = row.get('created_at')
-                if created_at_val is not None:
-                    property_data['created_at'] = created_at_val.isoformat() if isinstance(created_at_val, datetime) else created_at_val
-            if 'updated_at' in property_data and isinstance(property_data['updated_at'], datetime):
-                property_data['updated_at'] = property_data['updated_at'].isoformat()
-
-            # Residential: always include possession_date (same as other fields), serialize DATE to ISO string
-            if property_category == 'residential':
-                property_data.setdefault('possession_date', None)
-                pd = property_data.get('possession_date')
-                if pd is not None:
-                    if isinstance(pd, (datetime, date)):
-                        property_data['possession_date'] = pd.isoformat() if hasattr(pd, 'isoformat') else str(pd)
-                    elif not isinstance(pd, str):
-                        property_data['possession_date'] = str(pd)
-
-            # Commercial: parse parking_options from JSON string if present
-            if property_category == 'commercial' and property_data.get('parking_options') and isinstance(property_data['parking_options'], str):
-                try:
-                    property_data['parking_options'] = json.loads(property_data['parking_options'])
-                except Exception:
-                    property_data['parking_options'] = []
-
-            # Provide `direction` alias for frontend dropdown prefill.
-            # Keep `directions` unchanged for backward compatibility.
-            if 'direction' not in property_data or property_data.get('direction') is None:
-                directions_val = (property_data.get('directions') or '').strip().lower() if isinstance(property_data.get('directions'), str) else None
-                if directions_val in ('east', 'west', 'north', 'south'):
-                    property_data['direction'] = directions_val
-                else:
-                    property_data['direction'] = None
-            
-            # Construct location from city and locality if not already present
-            if 'location' not in property_data or not property_data.get('location'):
-                city = property_data.get('city', '')
-                locality = property_data.get('locality', '')
-                if city and locality:
-                    property_data['location'] = f"{city}, {locality}"
-                elif city:
-                    property_data['location'] = city
-                elif locality:
-                    property_data['location'] = locality
-                else:
-                    property_data['location'] = 'Location not specified'
-            
-            # Get images (wrap in try/except – some image tables may not exist; image_title column may not exist yet)
-            normalized_images = []
-            try:
-                if property_category == 'residential':
-                    images_query = """
-                        SELECT id, property_id, image_url, image_category as image_type, image_order,
-                        COALESCE(image_title, '') as image_title, created_at
-                        FROM residential_property_images
-                        WHERE property_id = %s
-                    """
-                    images_query_no_title = """
-                        SELECT id, property_id, image_url, image_category as image_type, image_order, created_at
-                        FROM residential_property_images
-                        WHERE property_id = %s
-                    """
-                elif property_category == 'commercial':
-                    images_query = """
-                        SELECT id, property_id, image_url, image_category as image_type, image_order,
-                        COALESCE(image_title, '') as image_title, created_at
-                        FROM commercial_property_images
-                        WHERE property_id = %s
-                    """
-                    images_query_no_title = """
-                        SELECT id, property_id, image_url, image_category as image_type, image_order, created_at
-                        FROM commercial_property_images
-                        WHERE property_id = %s
-                    """
-                else:
-                    images_query = """
-                        SELECT id, property_id, image_url, image_category as image_type, image_order,
-                        COALESCE(image_title, '') as image_title, created_at
-                        FROM plot_property_images
-                        WHERE property_id = %s
-                    """
-                    images_query_no_title = """
-                        SELECT id, property_id, image_url, image_category as image_type, image_order, created_at
-                        FROM plot_property_images
-                        WHERE property_id = %s
-                    """
-                try:
-                    images = execute_query(images_query, (property_id,))
-                except Exception as col_err:
-                    if "image_title" in str(col_err) or "1054" in str(col_err):
-                        images = execute_query(images_query_no_title, (property_id,))
-                        for img in images:
-                            img['image_title'] = ''
-                    else:
-                        raise
-                images = sorted(images, key=lambda x: (x.get('image_order') if x.get('image_order') is not None else 0, str(x.get('created_at') or '')))
-                for i, img in enumerate(images):
-                    img_dict = dict(img)
-                    if img_dict.get('image_url'):
-                        img_dict['image_url'] = normalize_image_url(img_dict['image_url'])
-                    # Convert datetime to ISO format string
-                    if 'created_at' in img_dict and isinstance(img_dict['created_at'], datetime):
-                        img_dict['created_at'] = img_dict['created_at'].isoformat()
-                    img_dict['is_primary'] = (i == 0)
-                    img_dict['image_order'] = img_dict.get('image_order') if img_dict.get('image_order') is not None else i
-                    if 'image_title' not in img_dict:
-                        img_dict['image_title'] = ''
-                    normalized_images.append(img_dict)
-            except Exception as img_err:
-                print(f"Warning: could not load images for property {property_id}: {img_err}")
-            property_data['images'] = normalized_images
-            
-            # Build image_gallery array for frontend
-            image_gallery = []
-            for img in normalized_images:
-                image_category = img.get('image_type', 'project')
-                # Map DB categories to frontend categories
-                category_map = {
-                    'project': 'project',
-                    'floorplan': 'floorplan',
-                    'masterplan': 'masterplan'
-                }
-                frontend_category = category_map.get(image_category, 'project')
-                image_gallery.append({
-                    'image_url': img.get('image_url'),
-                    'category': frontend_category,
-                    'title': (img.get('image_title') or '').strip() or '',
-                    'order': img.get('image_order', 0)
-                })
-            property_data['image_gallery'] = image_gallery
-            
-            property_data['project_images'] = []
-            property_data['floorplan_images'] = []
-            property_data['masterplan_images'] = []
-            
-            # Get features (wrap in try/except – table or column may not exist)
-            try:
-                features = execute_query(
-                    "SELECT feature_name FROM property_features WHERE property_category = %s AND property_id = %s",
-                    (property_category, property_id)
-                )
-                property_data['features'] = [feat.get('feature_name') for feat in features if feat.get('feature_name')]
-            except Exception as feat_err:
-                print(f"Warning: could not load features for property {property_id}: {feat_err}")
-                property_data['features'] = []
-            
-            # Convert TINYINT(1) to boolean
-            if property_data.get('price_negotiable') is not None:
-                property_data['price_negotiable'] = bool(property_data['price_negotiable'])
-            if property_data.get('price_includes_registration') is not None:
-                property_data['price_includes_registration'] = bool(property_data['price_includes_registration'])
-            
-            # Ensure numeric types (MySQL may return Decimal; avoid jsonify errors)
-            def _to_int(v):
-                if v is None: return None
-                try: return int(float(v))
-                except (TypeError, ValueError): return None
-            def _to_float(v):
-                if v is None: return None
-                try: return float(v)
-                except (TypeError, ValueError): return None
-            property_data['bedrooms'] = _to_int(property_data.get('bedrooms')) or 0
-            if 'bathrooms' in property_data: property_data['bathrooms'] = _to_float(property_data['bathrooms'])
-            if 'area' in property_data: property_data['area'] = _to_int(property_data['area'])
-            if 'price' in property_data: property_data['price'] = _to_float(property_data['price'])
-            
-            # Convert any remaining Decimals (e.g. in features, plot_area) so jsonify does not fail
-            def _decimal_to_float(obj):
-                if isinstance(obj, Decimal): return float(obj)
-                if isinstance(obj, dict):
-                    return {k: _decimal_to_float(v) for k, v in obj.items()}
-                if isinstance(obj, list):
-                    return [_decimal_to_float(v) for v in obj]
-                return obj
-            
-            # Convert datetime/date objects to ISO format strings for JSON serialization
-            def _datetime_to_iso(obj):
-                if isinstance(obj, (datetime, date)):
-                    return obj.isoformat()
-                if isinstance(obj, dict):
-                    return {k: _datetime_to_iso(v) for k, v in obj.items()}
-                if isinstance(obj, list):
-                    return [_datetime_to_iso(v) for v in obj]
-                return obj
-            
-            property_data = _decimal_to_float(property_data)
-            property_data = _datetime_to_iso(property_data)
+            property_data = build_property_detail_response(category, row, images, features)
             
             return jsonify(property_data)
         except Exception as e:
@@ -1180,6 +731,7 @@ def register_properties_routes(app):
     
     @app.route("/api/properties/<int:property_id>", methods=["POST"])
     @require_admin_auth
+    @invalidates("properties")
     def update_property(property_id: int):
         """Update a property. Dispatches by which table contains the id (residential, plot, commercial)."""
         try:
@@ -1360,6 +912,7 @@ def register_properties_routes(app):
             execute_update(f"UPDATE {table} SET {', '.join(sets)} WHERE id = %s", tuple(params))
             image_gallery = data.get("image_gallery") or []
             images = data.get("images") or []
+            has_image_title = has_column(img_table, 'image_title')
             try:
                 execute_update(f"DELETE FROM {img_table} WHERE property_id = %s", (property_id,))
             except Exception:
@@ -1371,10 +924,10 @@ def register_properties_routes(app):
                 if not final_url: continue
                 db_cat = {"project": "project", "floorplan": "floorplan", "masterplan": "masterplan"}.get(item.get("category", "project"), "project")
                 title = (item.get("title") or "").strip() or ""
-                try:
+                if has_image_title:
                     execute_update(f"INSERT INTO {img_table} (property_id, image_url, image_category, image_order, image_title) VALUES (%s, %s, %s, %s, %s)",
                         (property_id, final_url, db_cat, idx, title))
-                except Exception:
+                else:
                     execute_update(f"INSERT INTO {img_table} (property_id, image_url, image_category, image_order) VALUES (%s, %s, %s, %s)",
                         (property_id, final_url, db_cat, idx))
             if not image_gallery and images:
@@ -1396,6 +949,7 @@ def register_properties_routes(app):
                             (feature_category, property_id, name))
             except Exception:
                 pass
+            property_index.upsert(cat, property_id)
             return jsonify({"message": "Property updated successfully", "id": property_id})
         except ValueError as e:
             return error_response(f"Invalid data: {str(e)}", 400)
@@ -1406,6 +960,7 @@ def register_properties_routes(app):
     
     @app.route("/api/properties/<int:property_id>", methods=["DELETE"])
     @require_admin_auth
+    @invalidates("properties")
     def delete_property(property_id: int):
         """Delete a property (residential or plot) - Production-safe implementation"""
         try:
@@ -1483,6 +1038,8 @@ def register_properties_routes(app):
             
             # Success - return 200 with success message
             current_app.logger.info(f"Property {property_id} deletion verified successfully")
+            mark_collision_index_stale()
+            property_index.remove(property_category, property_id)
             return success_response("Property deleted successfully")
         except Exception as e:
             error_msg = f"Error deleting property {property_id}: {str(e)}"
@@ -1507,7 +1064,11 @@ def register_properties_routes(app):
     @app.route("/api/upload-image", methods=["POST", "OPTIONS"])
     @require_admin_auth
     def upload_image():
-        """Upload an image from base64 data, store in database, and return image URL"""
+        """
+        Upload an image, store it in the database, and return its URL.
+        Accepts multipart/form-data (one or more "image" files), a raw image body
+        (Content-Type: image/*), or the legacy JSON body with a base64 data URL.
+        """
         # Handle CORS preflight
         if request.method == "OPTIONS":
             response = make_response()
@@ -1516,6 +1077,9 @@ def register_properties_routes(app):
             response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Admin-Email'
             return response
         
+        if request.mimetype == 'multipart/form-data' or request.mimetype.startswith('image/'):
+            return upload_image_stream()
+        
         try:
             data = request.get_json()
             if not data:
@@ -1546,26 +1110,16 @@ def register_properties_routes(app):
             if not image_data or len(image_data) == 0:
                 return error_response("Decoded image data is empty", 400)
             
-            # Store image in the images table (separate table, no modification to existing tables)
+            # Store bytes in the blob store and record the images row
             try:
-                # Insert image into images table
-                insert_query = """
-                    INSERT INTO images (data, content_type) 
-                    VALUES (%s, %s)
-                """
-                image_id = execute_insert(insert_query, (image_data, content_type))
-                
-                if not image_id:
-                    return error_response("Failed to save image to database", 500)
+                saved = save_image_bytes(image_data, content_type)
                 
                 # Return image URL pointing to the serving endpoint
-                image_url = f"/api/images/{image_id}"
-                
                 return success_response(
                     message="Image uploaded successfully",
                     data={
-                        "image_url": image_url,
-                        "image_id": image_id
+                        "image_url": saved["image_url"],
+                        "image_id": saved["image_id"]
                     }
                 )
                 
@@ -1583,32 +1137,75 @@ def register_properties_routes(app):
             traceback.print_exc()
             return error_response(f"Failed to upload image: {str(e)}", 500)
     
-    @app.route("/api/images/<int:image_id>", methods=["GET"])
-    def get_image(image_id):
-        """Retrieve and serve image from database"""
+    def upload_image_stream():
+        """Streamed upload: files are spooled in chunks instead of parsed from base64 JSON"""
         try:
-            # Get image from images table
-            query = """
-                SELECT data, content_type 
-                FROM images 
-                WHERE id = %s
-            """
-            result = execute_query(query, (image_id,))
+            if request.mimetype == 'multipart/form-data':
+                files = request.files.getlist('image') or request.files.getlist('images')
+                if not files:
+                    return error_response("Image file is required (form field 'image')", 400)
+                streams = [f.stream for f in files]
+            else:
+                streams = [request.stream]
             
-            if not result or len(result) == 0:
-                return error_response("Image not found", 404)
+            uploaded = []
+            errors = []
+            for index, stream in enumerate(streams):
+                try:
+                    uploaded.append(save_uploaded_image(stream))
+                except InvalidImageUpload as invalid:
+                    errors.append({"index": index, "error": str(invalid)})
             
-            image_data = result[0]['data']
-            content_type = result[0]['content_type']
+            if not uploaded:
+                return error_response(errors[0]["error"], 400)
             
-            if not image_data:
-                return error_response("Image data is empty", 404)
+            data = {
+                "image_url": uploaded[0]["image_url"],
+                "image_id": uploaded[0]["image_id"]
+            }
+            if len(streams) > 1:
+                data["images"] = uploaded
+                data["errors"] = errors
+            return success_response(message="Image uploaded successfully", data=data)
             
-            # Create response with image data
-            response = make_response(image_data)
-            response.headers['Content-Type'] = content_type
+        except Exception as e:
+            error_msg = f"Error uploading image: {str(e)}"
+            print(error_msg)
+            traceback.print_exc()
+            return error_response(f"Failed to upload image: {str(e)}", 500)
+    
+    @app.route("/api/images/<int:image_id>", methods=["GET"])
+    def get_image(image_id):
+        """Serve an image from the on-disk blob cache (filled from the images table on first use)"""
+        try:
+            try:
+                path, sha256, content_type = get_image_file(image_id)
+            except ImageNotFound:
+                return error_response("Image not found", 404)
+            except OSError as cache_err:
+                # Cache directory not writable: fall back to serving the blob from the database
+                print(f"Warning: Image cache unavailable, serving image {image_id} from database: {str(cache_err)}")
+                return get_image_from_db(image_id)
+            
+            etag = sha256
+            requested_width = request.args.get('w', type=int)
+            if requested_width and requested_width > 0:
+                # Resized WebP/JPEG variant (falls back to the original when no variant applies)
+                variant = get_variant_file(path, sha256, requested_width, request.headers.get('Accept'))
+                if variant is not None:
+                    path, content_type, etag = variant
+            
+            # send_file streams the file and handles If-None-Match / If-Modified-Since and Range
+            response = send_file(
+                path,
+                mimetype=content_type,
+                conditional=True,
+                etag=etag,
+                max_age=31536000
+            )
             response.headers['Cache-Control'] = 'public, max-age=31536000'  # Cache for 1 year
-            
+            if requested_width:
+                response.headers['Vary'] = 'Accept'
             return response
             
         except Exception as e:
@@ -1617,4 +1214,28 @@ def register_properties_routes(app):
                 current_app.logger.error(error_msg, exc_info=True)
             print(error_msg)
             traceback.print_exc()
-            return error_response(f"Failed to retrieve image: {str(e)}", 500)
\ No newline at end of file
+            return error_response(f"Failed to retrieve image: {str(e)}", 500)
+    
+    def get_image_from_db(image_id):
+        """Serve an image straight from the images table (used when the disk cache is unavailable)"""
+        query = """
+            SELECT data, content_type 
+            FROM images 
+            WHERE id = %s
+        """
+        result = execute_query(query, (image_id,))
+        
+        if not result or len(result) == 0:
+            return error_response("Image not found", 404)
+        
+        image_data = result[0]['data']
+        content_type = result[0]['content_type']
+        
+        if not image_data:
+            return error_response("Image data is empty", 404)
+        
+        response = make_response(image_data)
+        response.headers['Content-Type'] = content_type
+        response.headers['Cache-Control'] = 'public, max-age=31536000'  # Cache for 1 year
+        response.set_etag(hashlib.sha256(image_data).hexdigest())
+        return response.make_conditional(request, accept_ranges=True, complete_length=len(image_data))
@@ -0,0 +1,143 @@
+"""
+Search routes
+"""
+from flask import request, jsonify, make_response
+import traceback
+from models import PropertyType
+from schemas import SearchQuerySchema, SearchResponseSchema, PropertyFilterSchema, PaginationParams
+from utils.helpers import calculate_pages, error_response
+from utils.response_cache import cached_response
+from utils.property_queries import CATEGORY_RANK, COMMERCIAL_TYPES, fetch_primary_images, normalize_listing_item
+from utils.property_search import (
+    SORT_FIELDS, SEARCH_MIN_TOKEN_LENGTH, build_search_filters, search_terms, search_properties, search_property_index
+)
+from utils.property_index import property_index
+
+
+def _bool_arg(value):
+    return value.lower() == 'true' if value else None
+
+
+def register_search_routes(app):
+    """Register search routes"""
+
+    @app.route("/api/search", methods=["GET", "OPTIONS"])
+    @cached_response("properties")
+    def search_properties_route():
+        """Ranked free-text property search
+
+        Query parameters: q (or query), category, type, status, min_price, max_price,
+        min_bedrooms, max_bedrooms, min_area, max_area, location, is_featured,
+        sort_by (relevance, price, created_at), sort_order (asc, desc), page, limit
+        """
+        if request.method == "OPTIONS":
+            response = make_response()
+            response.headers['Access-Control-Allow-Origin'] = '*'
+            response.headers['Access-Control-Allow-Methods'] = 'GET, OPTIONS'
+            response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+            return response
+
+        args = request.args
+        try:
+            # Commercial sub-types (office_space, ...) are not PropertyType values
+            type_str = args.get('type') or None
+            if type_str and type_str not in COMMERCIAL_TYPES:
+                type_str = PropertyType(type_str).value
+            category = args.get('category') or None
+            if category and category not in CATEGORY_RANK:
+                raise ValueError("category must be one of residential, plot, commercial")
+
+            search = SearchQuerySchema(
+                query=(args.get('q') or args.get('query') or '').strip() or None,
+                filters=PropertyFilterSchema(
+                    status=args.get('status') or None,
+                    min_price=args.get('min_price', type=float),
+                    max_price=args.get('max_price', type=float),
+                    min_bedrooms=args.get('min_bedrooms', type=int),
+                    max_bedrooms=args.get('max_bedrooms', type=int),
+                    min_area=args.get('min_area', type=int),
+                    max_area=args.get('max_area', type=int),
+                    location=(args.get('location') or '').strip() or None,
+                    is_featured=_bool_arg(args.get('is_featured')),
+                    is_active=_bool_arg(args.get('is_active', 'true')),
+                ),
+                pagination=PaginationParams(
+                    page=args.get('page', default=1, type=int),
+                    limit=args.get('limit', default=10, type=int),
+                ),
+                sort_by=args.get('sort_by') or None,
+                sort_order=(args.get('sort_order') or '').lower() or None,
+            )
+        except ValueError as e:
+            error_resp, status_code = error_response(f"Invalid search parameters: {str(e)}", 400)
+            error_resp.headers['Access-Control-Allow-Origin'] = '*'
+            return error_resp, status_code
+
+        terms = search_terms(search.query)
+        filters = search.filters
+        location_terms = search_terms(filters.location)
+        if (search.query and not terms) or (filters.location and not location_terms):
+            error_resp, status_code = error_response(
+                f"Search text must contain at least one word of {SEARCH_MIN_TOKEN_LENGTH} or more characters", 400
+            )
+            error_resp.headers['Access-Control-Allow-Origin'] = '*'
+            return error_resp, status_code
+
+        sort_by = search.sort_by or ('relevance' if terms else 'created_at')
+        if sort_by not in SORT_FIELDS:
+            error_resp, status_code = error_response(
+                f"sort_by must be one of {', '.join(SORT_FIELDS)}", 400
+            )
+            error_resp.headers['Access-Control-Allow-Origin'] = '*'
+            return error_resp, status_code
+        sort_order = search.sort_order or 'desc'
+
+        try:
+            pagination = search.pagination
+            offset = (pagination.page - 1) * pagination.limit
+            filter_args = dict(
+                type_str=type_str,
+                category=category,
+                status_str=filters.status.value if filters.status else None,
+                min_price=filters.min_price,
+                max_price=filters.max_price,
+                min_bedrooms=filters.min_bedrooms,
+                max_bedrooms=filters.max_bedrooms,
+                min_area=filters.min_area,
+                max_area=filters.max_area,
+                is_featured=filters.is_featured
+            )
+            is_active = filters.is_active if filters.is_active is not None else True
+            if is_active and property_index.ensure_current():
+                total, rows = search_property_index(
+                    terms, location_terms, sort_by, sort_order, pagination.limit, offset, **filter_args
+                )
+            else:
+                search_filters = build_search_filters(is_active=is_active, **filter_args)
+                total, rows = search_properties(
+                    search_filters, terms, location_terms, sort_by, sort_order, pagination.limit, offset
+                )
+
+            primary_images = fetch_primary_images(rows)
+            results = [
+                normalize_listing_item(row, primary_images.get((row.get('property_category'), row.get('id'))))
+                for row in rows
+            ]
+
+            response = SearchResponseSchema(
+                total=total,
+                page=pagination.page,
+                limit=pagination.limit,
+                pages=calculate_pages(total, pagination.limit),
+                results=results
+            )
+            result = jsonify(response.dict())
+            result.headers['Access-Control-Allow-Origin'] = '*'
+            return result
+        except Exception as e:
+            error_msg = str(e)
+            print(f"Error searching properties: {error_msg}")
+            traceback.print_exc()
+            error_resp, status_code = error_response(f"Error searching properties: {error_msg}", 500)
+            error_resp.headers['Access-Control-Allow-Origin'] = '*'
+            return error_resp, status_code
@@ -11,12 +11,107 @@ from database import execute_query
 from models import PropertyStatus
 from schemas import PropertyStatsSchema, FrontendStatsSchema, DashboardStatsSchema
 from utils.helpers import abort_with_message, require_admin_auth
+from utils.response_cache import cached_response, mark_uncacheable
+
+
+# Query residential_properties, plot_properties, and commercial_properties.
+# Normalize status: residential uses 'sell'/'new', plot/commercial use 'sale'/'rent'
+PROPERTY_STATS_QUERY = """
+    SELECT 
+        COUNT(*) as total,
+        SUM(CASE WHEN status IN ('sell', 'sale') THEN 1 ELSE 0 END) as for_sale,
+        SUM(CASE WHEN status IN ('new', 'rent') THEN 1 ELSE 0 END) as for_rent,
+        SUM(CASE WHEN is_featured = 1 THEN 1 ELSE 0 END) as featured
+    FROM (
+        SELECT status, is_featured FROM residential_properties WHERE is_active = 1
+        UNION ALL
+        SELECT status, is_featured FROM plot_properties WHERE is_active = 1
+        UNION ALL
+        SELECT status, is_featured FROM commercial_properties WHERE is_active = 1
+    ) as combined
+"""
+
+# Residential, plot and commercial type breakdowns (in that order)
+PROPERTY_TYPE_STATS_QUERIES = (
+    "SELECT type, COUNT(*) as count FROM residential_properties WHERE is_active = 1 GROUP BY type",
+    "SELECT 'plot' as type, COUNT(*) as count FROM plot_properties WHERE is_active = 1",
+    "SELECT property_type as type, COUNT(*) as count FROM commercial_properties WHERE is_active = 1 GROUP BY property_type",
+)
+
+
+def build_property_stats(stats_result, type_results=None) -> dict:
+    """GET /api/stats/properties body from PROPERTY_STATS_QUERY and PROPERTY_TYPE_STATS_QUERIES rows
+    (shared with the async serving mode)"""
+    total = 0
+    for_sale = 0
+    for_rent = 0
+    featured = 0
+    
+    if stats_result and len(stats_result) > 0 and stats_result[0]:
+        total = int(stats_result[0].get('total', 0) or 0)
+        for_sale = int(stats_result[0].get('for_sale', 0) or 0)
+        for_rent = int(stats_result[0].get('for_rent', 0) or 0)
+        featured = int(stats_result[0].get('featured', 0) or 0)
+    
+    by_type = {}
+    if type_results:
+        type_stats_res, type_stats_plot, type_stats_com = type_results
+        
+        if type_stats_res:
+            for row in type_stats_res:
+                if row and row.get('type') is not None:
+                    type_name = str(row.get('type', ''))
+                    count_val = row.get('count', 0)
+                    by_type[type_name] = int(count_val or 0)
+        
+        if type_stats_plot:
+            for row in type_stats_plot:
+                if row and row.get('count', 0) > 0:
+                    by_type['plot'] = by_type.get('plot', 0) + int(row.get('count', 0))
+        
+        if type_stats_com:
+            for row in type_stats_com:
+                if row and row.get('type') is not None:
+                    type_name = str(row.get('type', ''))
+                    count_val = row.get('count', 0)
+                    by_type[type_name] = by_type.get(type_name, 0) + int(count_val or 0)
+    
+    result = PropertyStatsSchema(
+        total=int(total or 0),
+        for_sale=int(for_sale or 0),
+        for_rent=int(for_rent or 0),
+        by_type=by_type if by_type else {},
+        featured=int(featured or 0)
+    )
+    return result.dict()
+
+
+def property_stats_response(result_dict: dict, reject_invalid_callback: bool = True):
+    """JSON response, or JSONP when a valid callback parameter is provided"""
+    callback = request.args.get('callback')
+    if callback:
+        # Validate callback name to prevent XSS
+        if re.match(r'^[a-zA-Z_$][a-zA-Z0-9_$]*$', callback):
+            response = make_response(f"{callback}({json.dumps(result_dict)});")
+            response.headers['Content-Type'] = 'application/javascript'
+            response.headers['Access-Control-Allow-Origin'] = '*'
+            return response
+        elif reject_invalid_callback:
+            # Invalid callback name, return regular JSON
+            response = jsonify({'error': 'Invalid callback parameter'})
+            response.headers['Access-Control-Allow-Origin'] = '*'
+            return response, 400
+    
+    response = jsonify(result_dict)
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
 
 
 def register_stats_routes(app):
     """Register statistics routes"""
     
     @app.route("/api/stats/properties", methods=["GET", "OPTIONS"])
+    @cached_response("properties")
     def get_property_stats():
         """Get property statistics (optimized with single query)"""
         # Handle OPTIONS request for CORS preflight
@@ -28,110 +123,24 @@ def register_stats_routes(app):
             return response
         
         try:
-            # Query residential_properties, plot_properties, and commercial_properties.
-            # Normalize status: residential uses 'sell'/'new', plot/commercial use 'sale'/'rent'
-            query = """
-                SELECT 
-                    COUNT(*) as total,
-                    SUM(CASE WHEN status IN ('sell', 'sale') THEN 1 ELSE 0 END) as for_sale,
-                    SUM(CASE WHEN status IN ('new', 'rent') THEN 1 ELSE 0 END) as for_rent,
-                    SUM(CASE WHEN is_featured = 1 THEN 1 ELSE 0 END) as featured
-                FROM (
-                    SELECT status, is_featured FROM residential_properties WHERE is_active = 1
-                    UNION ALL
-                    SELECT status, is_featured FROM plot_properties WHERE is_active = 1
-                    UNION ALL
-                    SELECT status, is_featured FROM commercial_properties WHERE is_active = 1
-                ) as combined
-            """
-            
-            stats_result = execute_query(query)
-            total = 0
-            for_sale = 0
-            for_rent = 0
-            featured = 0
-            
-            if stats_result and len(stats_result) > 0 and stats_result[0]:
-                total = int(stats_result[0].get('total', 0) or 0)
-                for_sale = int(stats_result[0].get('for_sale', 0) or 0)
-                for_rent = int(stats_result[0].get('for_rent', 0) or 0)
-                featured = int(stats_result[0].get('featured', 0) or 0)
-            
+            stats_result = execute_query(PROPERTY_STATS_QUERY)
             # Get type breakdown from residential, plot, and commercial tables
-            by_type = {}
             try:
-                type_stats_res = execute_query("SELECT type, COUNT(*) as count FROM residential_properties WHERE is_active = 1 GROUP BY type")
-                type_stats_plot = execute_query("SELECT 'plot' as type, COUNT(*) as count FROM plot_properties WHERE is_active = 1")
-                type_stats_com = execute_query("SELECT property_type as type, COUNT(*) as count FROM commercial_properties WHERE is_active = 1 GROUP BY property_type")
-                
-                if type_stats_res:
-                    for row in type_stats_res:
-                        if row and row.get('type') is not None:
-                            type_name = str(row.get('type', ''))
-                            count_val = row.get('count', 0)
-                            by_type[type_name] = int(count_val or 0)
-                
-                if type_stats_plot:
-                    for row in type_stats_plot:
-                        if row and row.get('count', 0) > 0:
-                            by_type['plot'] = by_type.get('plot', 0) + int(row.get('count', 0))
-                
-                if type_stats_com:
-                    for row in type_stats_com:
-                        if row and row.get('type') is not None:
-                            type_name = str(row.get('type', ''))
-                            count_val = row.get('count', 0)
-                            by_type[type_name] = by_type.get(type_name, 0) + int(count_val or 0)
+                type_results = [execute_query(query) for query in PROPERTY_TYPE_STATS_QUERIES]
             except Exception as e:
                 print(f"Error fetching property types: {str(e)}")
-            
-            result = PropertyStatsSchema(
-                total=int(total or 0),
-                for_sale=int(for_sale or 0),
-                for_rent=int(for_rent or 0),
-                by_type=by_type if by_type else {},
-                featured=int(featured or 0)
-            )
-            
-            result_dict = result.dict()
-            
-            # Support JSONP if callback parameter is provided
-            callback = request.args.get('callback')
-            if callback:
-                # Validate callback name to prevent XSS
-                if re.match(r'^[a-zA-Z_$][a-zA-Z0-9_$]*$', callback):
-                    response = make_response(f"{callback}({json.dumps(result_dict)});")
-                    response.headers['Content-Type'] = 'application/javascript'
-                    response.headers['Access-Control-Allow-Origin'] = '*'
-                    return response
-                else:
-                    # Invalid callback name, return regular JSON
-                    response = jsonify({'error': 'Invalid callback parameter'})
-                    response.headers['Access-Control-Allow-Origin'] = '*'
-                    return response, 400
-            
-            response = jsonify(result_dict)
-            response.headers['Access-Control-Allow-Origin'] = '*'
-            return response
+                type_results = None
+                mark_uncacheable()
+            return property_stats_response(build_property_stats(stats_result, type_results))
         except Exception as e:
             print(f"Error fetching property stats: {str(e)}")
             traceback.print_exc()
+            mark_uncacheable()
             result = PropertyStatsSchema(total=0, for_sale=0, for_rent=0, by_type={}, featured=0)
-            result_dict = result.dict()
-            
-            # Support JSONP in error case too
-            callback = request.args.get('callback')
-            if callback and re.match(r'^[a-zA-Z_$][a-zA-Z0-9_$]*$', callback):
-                response = make_response(f"{callback}({json.dumps(result_dict)});")
-                response.headers['Content-Type'] = 'application/javascript'
-                response.headers['Access-Control-Allow-Origin'] = '*'
-                return response
-            
-            response = jsonify(result_dict)
-            response.headers['Access-Control-Allow-Origin'] = '*'
-            return response
+            return property_stats_response(result.dict(), reject_invalid_callback=False)
     
     @app.route("/api/stats/frontend", methods=["GET", "OPTIONS"])
+    @cached_response("properties")
     def get_frontend_stats():
         """Get frontend statistics for homepage"""
         # Handle OPTIONS request for CORS preflight
@@ -150,6 +159,7 @@ def register_stats_routes(app):
                     return result[0]['count'] if result and len(result) > 0 else 0
                 except Exception as e:
                     print(f"Error executing query: {query}, Error: {str(e)}")
+                    mark_uncacheable()
                     return 0
             
             properties_listed = get_count("SELECT COUNT(*) as count FROM (SELECT id FROM residential_properties WHERE is_active = 1 UNION ALL SELECT id FROM plot_properties WHERE is_active = 1) as combined")
@@ -192,6 +202,7 @@ def register_stats_routes(app):
         except Exception as e:
             print(f"Error in get_frontend_stats: {str(e)}")
             traceback.print_exc()
+            mark_uncacheable()
             # Calculate years of experience dynamically even in error case
             current_year = datetime.now().year
             base_year = 2010
@@ -9,12 +9,14 @@ import traceback
 from database import execute_query, execute_update, execute_insert
 from schemas import TestimonialPublicSchema, TestimonialResponseSchema, TestimonialUpdateSchema, TestimonialCreateSchema
 from utils.helpers import error_response, success_response, require_admin_auth
+from utils.response_cache import cached_response, invalidates
 
 
 def register_testimonials_routes(app):
     """Register testimonials routes"""
     
     @app.route("/api/testimonials", methods=["GET"])
+    @cached_response("testimonials")
     def get_testimonials():
         """Get all testimonials (public endpoint - only approved)"""
         try:
@@ -105,6 +107,7 @@ def register_testimonials_routes(app):
     
     @app.route("/api/testimonials", methods=["POST"])
     @require_admin_auth
+    @invalidates("testimonials")
     def create_testimonial():
         """Create a new testimonial"""
         try:
@@ -169,6 +172,7 @@ def register_testimonials_routes(app):
     
     @app.route("/api/testimonials/<int:testimonial_id>", methods=["POST"])
     @require_admin_auth
+    @invalidates("testimonials")
     def update_testimonial(testimonial_id: int):
         """Update a testimonial"""
         try:
@@ -225,6 +229,7 @@ def register_testimonials_routes(app):
     
     @app.route("/api/testimonials/<int:testimonial_id>", methods=["DELETE"])
     @require_admin_auth
+    @invalidates("testimonials")
     def delete_testimonial(testimonial_id: int):
         """Delete a testimonial"""
         try:
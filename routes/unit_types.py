@@ -8,12 +8,14 @@ import re
 import traceback
 from database import execute_query, execute_insert, execute_update
 from utils.helpers import abort_with_message, require_admin_auth
+from utils.response_cache import cached_response, invalidates
 
 
 def register_unit_types_routes(app):
     """Register unit types routes"""
     
     @app.route("/api/unit-types", methods=["GET"])
+    @cached_response("unit_types")
     def get_active_unit_types():
         """Get all active unit types (public endpoint)"""
         try:
@@ -62,6 +64,7 @@ def register_unit_types_routes(app):
     # IMPORTANT: This route must be defined before /api/admin/unit-types to ensure proper matching
     @app.route("/api/admin/unit-types/<int:unit_type_id>", methods=["GET", "PUT", "POST", "DELETE", "OPTIONS"])
     @require_admin_auth
+    @invalidates("unit_types")
     def handle_unit_type(unit_type_id):
         """Handle GET, PUT, POST, DELETE requests for a single unit type"""
         # Handle OPTIONS request for CORS preflight
@@ -194,6 +197,7 @@ def register_unit_types_routes(app):
     
     @app.route("/api/admin/unit-types", methods=["GET", "POST"])
     @require_admin_auth
+    @invalidates("unit_types")
     def handle_unit_types():
         """Handle GET and POST requests for unit types"""
         if request.method == "GET":
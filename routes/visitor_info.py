@@ -3,7 +3,6 @@ Visitor info routes
 """
 from flask import request, jsonify, session
 import traceback
-import threading
 from database import execute_query, execute_insert
 from schemas import VisitorInfoCreateSchema, VisitorInfoResponseSchema
 from utils.helpers import abort_with_message, require_admin_auth, get_client_ip
@@ -86,7 +85,7 @@ def register_visitor_info_routes(app):
             # Make session permanent so it persists across browser restarts
             session.permanent = True
             
-            # Send self-notification email in background
+            # Queue self-notification email (delivered by the email outbox worker)
             def send_notification():
                 send_self_notification_email(
                     "new_visitor",
@@ -102,9 +101,7 @@ def register_visitor_info_routes(app):
                     }
                 )
             
-            thread = threading.Thread(target=send_notification)
-            thread.daemon = True
-            thread.start()
+            send_notification()
             
             result = execute_query("SELECT * FROM visitor_info WHERE id = %s", (visitor_id,))
             response = VisitorInfoResponseSchema(**dict(result[0]))
@@ -51,11 +51,12 @@ class PaginationParams(BaseModel):
 
 class PaginatedResponse(BaseModel):
     """Paginated response wrapper"""
-    total: int
+    total: Optional[int] = Field(..., description="Matching rows; None on cursor pages that skip the count")
     page: int
     limit: int
-    pages: int
+    pages: Optional[int]
     items: List[dict]
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor for the next page (keyset pagination)")
 
 
 # ============================================
@@ -1605,7 +1606,7 @@ class SearchResponseSchema(BaseModel):
     page: int
     limit: int
     pages: int
-    results: List[PropertyListResponseSchema]
+    results: List[dict] = Field(..., description="Listing-shaped property rows with a relevance score")
 
 
 # ============================================
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Email Outbox Worker
+
+Delivers the emails queued in the email_outbox table (see utils/email_outbox.py)
+over one reused SMTP connection. Run it as the single sender for the site and
+set EMAIL_OUTBOX_WORKER=external for the web processes, or run it from cron
+with --once on hosts that cannot keep a process alive.
+
+Usage:
+    python email_outbox_worker.py            # Run until interrupted
+    python email_outbox_worker.py --once     # Send everything that is due, then exit
+"""
+
+import sys
+import os
+import argparse
+
+# Add parent directory to path to import database module
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+project_root = os.path.dirname(backend_dir)
+
+# Add both backend and project root to path
+sys.path.insert(0, backend_dir)
+sys.path.insert(0, project_root)
+
+# Change to backend directory to ensure relative imports work
+os.chdir(backend_dir)
+
+# Import database functions
+try:
+    from utils.email_outbox import create_email_outbox_table, outbox_worker
+except ImportError as e:
+    print("ERROR: Could not import database module.")
+    print(f"Error: {e}")
+    print(f"Current path: {os.getcwd()}")
+    print(f"Backend dir: {backend_dir}")
+    sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Send the emails queued in the email_outbox table'
+    )
+    parser.add_argument(
+        '--once',
+        action='store_true',
+        help='Send every email that is due now, then exit'
+    )
+
+    args = parser.parse_args()
+
+    create_email_outbox_table()
+
+    if args.once:
+        total = 0
+        while True:
+            handled = outbox_worker.process_due()
+            if not handled:
+                break
+            total += handled
+        outbox_worker.stop()
+        print(f"Handled {total} outbox row(s): {outbox_worker.stats()}")
+        return 0
+
+    print("Email outbox worker running (Ctrl+C to stop)")
+    try:
+        outbox_worker.run_forever()
+    except KeyboardInterrupt:
+        print("\nStopping email outbox worker")
+    finally:
+        outbox_worker.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Property Listing Index Management Script
+
+Creates the composite indexes and lowercase generated city/locality columns used
+by the GET /api/properties filters and the FULLTEXT indexes used by /api/search
+(see utils/db_indexes.py), and verifies with EXPLAIN that every listing query
+shape uses an index.
+
+Adding an index, a FULLTEXT index or a STORED generated column rebuilds the
+table once; run this outside peak hours on large tables. Running workers pick up
+the new FULLTEXT indexes on their next schema refresh (SCHEMA_INFO_TTL_SECONDS).
+
+Usage:
+    python manage_indexes.py                 # Show missing columns/indexes (no changes)
+    python manage_indexes.py --apply         # Create them
+    python manage_indexes.py --explain       # EXPLAIN each listing query shape
+    python manage_indexes.py --apply --explain
+"""
+
+import sys
+import os
+import argparse
+
+# Add parent directory to path to import database module
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+project_root = os.path.dirname(backend_dir)
+
+# Add both backend and project root to path
+sys.path.insert(0, backend_dir)
+sys.path.insert(0, project_root)
+
+# Change to backend directory to ensure relative imports work
+os.chdir(backend_dir)
+
+# Import database functions
+try:
+    from utils.db_indexes import plan_index_changes, apply_index_changes, explain_listing_queries
+except ImportError as e:
+    print("ERROR: Could not import database module.")
+    print(f"Error: {e}")
+    print(f"Current path: {os.getcwd()}")
+    print(f"Backend dir: {backend_dir}")
+    sys.exit(1)
+
+
+def print_explain(results) -> bool:
+    """Print the EXPLAIN summary; returns True when every branch uses an index"""
+    print(f"\n{'Shape':<22} {'Table':<24} {'Access':<8} {'Key':<30} {'Rows':>8}")
+    print("-" * 96)
+    all_indexed = True
+    for row in results:
+        if row.get("error"):
+            all_indexed = False
+            print(f"{row['shape']:<22} ERROR: {row['error']}")
+            continue
+        marker = "" if row["uses_index"] else "  <-- full scan"
+        if row["filesort"]:
+            marker += "  <-- filesort"
+        all_indexed = all_indexed and row["uses_index"]
+        print(f"{row['shape']:<22} {row['table']:<24} {str(row['access_type']):<8} "
+              f"{str(row['key']):<30} {str(row['rows']):>8}{marker}")
+    return all_indexed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Create and verify the indexes used by the property listing filters and search'
+    )
+    parser.add_argument(
+        '--apply',
+        action='store_true',
+        help='Create the missing generated columns and indexes'
+    )
+    parser.add_argument(
+        '--explain',
+        action='store_true',
+        help='EXPLAIN each listing query shape and report tables read without an index'
+    )
+
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("Property Listing Indexes")
+    print("=" * 80)
+
+    statements = plan_index_changes()
+    if not statements:
+        print("\n✓ All listing/search columns and indexes exist.")
+    else:
+        print(f"\n{len(statements)} change(s) {'to apply' if args.apply else 'needed (run with --apply)'}:")
+        for _, statement in statements:
+            print(f"  {statement};")
+
+    exit_code = 0
+    if args.apply and statements:
+        print("\nApplying...")
+        applied, failed = apply_index_changes(statements)
+        print(f"\nApplied {applied}, failed {failed}.")
+        if failed:
+            exit_code = 1
+
+    if args.explain:
+        results = explain_listing_queries()
+        if not print_explain(results):
+            print("\nSome listing query shapes scan a table without an index.")
+            exit_code = 1
+        else:
+            print("\n✓ Every listing query shape uses an index.")
+        if any(row.get("filesort") for row in results):
+            print("Note: branches marked filesort sort their matching rows instead of reading them in index order.")
+
+    print("=" * 80)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
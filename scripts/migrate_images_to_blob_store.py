@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Image Blob Migration Script
+
+Moves image bytes out of the images.data LONGBLOB column into the
+content-addressed blob store (see utils/blob_store.py). Each image is copied in
+chunks, written to the store under its SHA-256 (identical images are stored once),
+and only then is its row switched to the store and its LONGBLOB cleared.
+/api/images/<id> URLs do not change.
+
+Usage:
+    python migrate_images_to_blob_store.py --dry-run            # Count what would be moved
+    python migrate_images_to_blob_store.py                      # Move all images
+    python migrate_images_to_blob_store.py --limit 100          # Move at most 100 images
+    python migrate_images_to_blob_store.py --keep-db-copy       # Copy to the store but keep the LONGBLOB
+    python migrate_images_to_blob_store.py --clear-db-copies    # Clear LONGBLOBs kept by --keep-db-copy
+"""
+
+import sys
+import os
+import argparse
+import tempfile
+
+# Add parent directory to path to import database module
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+project_root = os.path.dirname(backend_dir)
+
+# Add both backend and project root to path
+sys.path.insert(0, backend_dir)
+sys.path.insert(0, project_root)
+
+# Change to backend directory to ensure relative imports work
+os.chdir(backend_dir)
+
+# Import database functions
+try:
+    from database import execute_query, execute_update, get_db_cursor
+    from utils.blob_store import get_blob_store
+    from utils.image_store import copy_db_blob, DB_STORAGE, UPLOAD_SPOOL_MEMORY_BYTES
+except ImportError as e:
+    print("ERROR: Could not import database module.")
+    print(f"Error: {e}")
+    print(f"Current path: {os.getcwd()}")
+    print(f"Backend dir: {backend_dir}")
+    sys.exit(1)
+
+
+def pending_images(after_id: int, batch_size: int):
+    """Next batch of images whose bytes are still in MySQL"""
+    query = """
+        SELECT id, LENGTH(data) as size
+        FROM images
+        WHERE storage = %s AND data IS NOT NULL AND id > %s
+        ORDER BY id ASC
+        LIMIT %s
+    """
+    return execute_query(query, (DB_STORAGE, after_id, batch_size))
+
+
+def migrate_image(image_id: int, size: int, keep_db_copy: bool) -> str:
+    """Copy one image to the blob store and switch its row over; returns the SHA-256"""
+    store = get_blob_store()
+    with get_db_cursor() as cursor:
+        with tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MEMORY_BYTES) as spool:
+            sha256 = copy_db_blob(cursor, image_id, size, spool)
+            spool.seek(0)
+            store.put_file(spool, sha256)
+        if keep_db_copy:
+            cursor.execute(
+                "UPDATE images SET storage = %s, sha256 = %s, size_bytes = %s WHERE id = %s AND storage = %s",
+                (store.name, sha256, size, image_id, DB_STORAGE)
+            )
+        else:
+            cursor.execute(
+                "UPDATE images SET storage = %s, sha256 = %s, size_bytes = %s, data = NULL "
+                "WHERE id = %s AND storage = %s",
+                (store.name, sha256, size, image_id, DB_STORAGE)
+            )
+    return sha256
+
+
+def clear_db_copies(batch_size: int, limit: int = None) -> int:
+    """Clear the LONGBLOB of images already served from the blob store; returns rows cleared"""
+    cleared = 0
+    while limit is None or cleared < limit:
+        size = batch_size if limit is None else min(batch_size, limit - cleared)
+        affected = execute_update(
+            "UPDATE images SET data = NULL WHERE storage != %s AND data IS NOT NULL LIMIT %s",
+            (DB_STORAGE, size)
+        )
+        if not affected:
+            break
+        cleared += affected
+        print(f"  ✓ cleared {cleared} kept LONGBLOB(s)")
+    return cleared
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Move image bytes from the images LONGBLOB column into the blob store'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Only count the images and bytes that would be moved'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=50,
+        help='Images fetched per query (default: 50)'
+    )
+    parser.add_argument(
+        '--limit',
+        type=int,
+        help='Stop after moving this many images'
+    )
+    parser.add_argument(
+        '--keep-db-copy',
+        action='store_true',
+        help='Leave the LONGBLOB in place after copying (clear it later with --clear-db-copies)'
+    )
+    parser.add_argument(
+        '--clear-db-copies',
+        action='store_true',
+        help='Clear the LONGBLOBs left by --keep-db-copy for images already in the blob store'
+    )
+
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("Image Blob Migration")
+    print("=" * 80)
+
+    if args.dry_run:
+        if args.clear_db_copies:
+            totals = execute_query(
+                "SELECT COUNT(*) as count, COALESCE(SUM(LENGTH(data)), 0) as bytes "
+                "FROM images WHERE storage != %s AND data IS NOT NULL",
+                (DB_STORAGE,)
+            )
+            action = "cleared from MySQL (already in the blob store)"
+        else:
+            totals = execute_query(
+                "SELECT COUNT(*) as count, COALESCE(SUM(LENGTH(data)), 0) as bytes "
+                "FROM images WHERE storage = %s AND data IS NOT NULL",
+                (DB_STORAGE,)
+            )
+            action = "moved to the blob store"
+        count = int(totals[0]['count']) if totals else 0
+        total_bytes = int(totals[0]['bytes']) if totals else 0
+        print(f"\n{count} image(s), {total_bytes / (1024 * 1024):.1f} MB would be {action}.")
+        return 0
+
+    if args.clear_db_copies:
+        cleared = clear_db_copies(args.batch_size, args.limit)
+        print(f"\n{'=' * 80}")
+        print(f"Cleared {cleared} LONGBLOB copy(ies).")
+        if cleared:
+            print("Run OPTIMIZE TABLE images to return the freed LONGBLOB space to the filesystem.")
+        print("=" * 80)
+        return 0
+
+    moved = 0
+    failed = 0
+    moved_bytes = 0
+    hashes = set()
+    last_id = 0
+    while args.limit is None or moved < args.limit:
+        batch = pending_images(last_id, args.batch_size)
+        if not batch:
+            break
+        for row in batch:
+            if args.limit is not None and moved >= args.limit:
+                break
+            last_id = row['id']
+            try:
+                sha256 = migrate_image(row['id'], int(row['size'] or 0), args.keep_db_copy)
+                hashes.add(sha256)
+                moved += 1
+                moved_bytes += int(row['size'] or 0)
+                print(f"  ✓ image {row['id']} -> {sha256[:12]}… ({int(row['size'] or 0)} bytes)")
+            except Exception as e:
+                failed += 1
+                print(f"  ✗ image {row['id']}: {e}")
+
+    print(f"\n{'=' * 80}")
+    print(f"Moved {moved} image(s), {moved_bytes / (1024 * 1024):.1f} MB "
+          f"({len(hashes)} unique blob(s)); {failed} failed.")
+    if moved and not args.keep_db_copy:
+        print("Run OPTIMIZE TABLE images to return the freed LONGBLOB space to the filesystem.")
+    print("=" * 80)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
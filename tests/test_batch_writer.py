@@ -0,0 +1,76 @@
+from contextlib import contextmanager
+
+import pytest
+
+import utils.batch_writer as batch_writer
+from utils.batch_writer import BatchWriter
+
+
+class FakeCursor:
+    def __init__(self, batches, fail):
+        self.batches = batches
+        self.fail = fail
+
+    def executemany(self, query, rows):
+        if self.fail:
+            raise RuntimeError("database down")
+        self.batches.append(list(rows))
+
+
+@pytest.fixture
+def db(monkeypatch):
+    state = {"batches": [], "fail": False}
+
+    @contextmanager
+    def get_db_cursor(commit=True):
+        yield FakeCursor(state["batches"], state["fail"])
+
+    monkeypatch.setattr(batch_writer, "get_db_cursor", get_db_cursor)
+    return state
+
+
+def _writer(**kwargs):
+    # Long flush interval: the tests drive writes through flush()/stop()
+    options = dict(max_queue_size=5, batch_size=2, flush_interval_ms=60000)
+    options.update(kwargs)
+    writer = BatchWriter("test", "INSERT INTO t (a) VALUES (%s)", **options)
+    writer._ensure_started = lambda: None
+    return writer
+
+
+def test_flush_writes_in_batches_and_calls_hook(db):
+    flushed = []
+    writer = _writer(on_flush=flushed.append)
+    for i in range(5):
+        assert writer.submit((i,))
+    writer.flush()
+    assert db["batches"] == [[(0,), (1,)], [(2,), (3,)], [(4,)]]
+    assert flushed == db["batches"]
+    assert writer.stats()["written"] == 5 and writer.stats()["batches"] == 3
+
+
+def test_full_queue_drops_rows(db):
+    writer = _writer(max_queue_size=2)
+    assert [writer.submit((i,)) for i in range(3)] == [True, True, False]
+    assert writer.stats()["dropped"] == 1
+    writer.flush()  # nothing left for the atexit flush once the fake cursor is gone
+
+
+def test_failed_batch_is_counted_and_skips_hook(db):
+    flushed = []
+    writer = _writer(on_flush=flushed.append)
+    db["fail"] = True
+    writer.submit((1,))
+    writer.flush()
+    assert writer.stats()["failed"] == 1
+    assert flushed == []
+
+
+def test_background_flusher_writes_queued_rows(db):
+    writer = BatchWriter("test-thread", "INSERT INTO t (a) VALUES (%s)", batch_size=10, flush_interval_ms=20)
+    try:
+        writer.submit((1,))
+        writer.submit((2,))
+    finally:
+        writer.stop()
+    assert [row for batch in db["batches"] for row in batch] == [(1,), (2,)]
@@ -0,0 +1,34 @@
+import hashlib
+import io
+
+import pytest
+
+from utils.blob_store import BlobStore, LocalBlobStore
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NoOpen(BlobStore):
+        def exists(self, sha256):
+            return False
+
+        def put_file(self, fileobj, sha256):
+            return True
+
+    with pytest.raises(TypeError):
+        NoOpen()
+
+
+def test_local_store_deduplicates(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    data = b"\x89PNG\r\n\x1a\nimage"
+    sha256 = hashlib.sha256(data).hexdigest()
+    assert store.put_file(io.BytesIO(data), sha256) is True
+    assert store.put_file(io.BytesIO(data), sha256) is False
+    with store.open(sha256) as f:
+        assert f.read() == data
+    assert store.local_path(sha256).parent.parent.name == sha256[:2]
+
+
+def test_local_store_rejects_invalid_ids(tmp_path):
+    with pytest.raises(ValueError):
+        LocalBlobStore(tmp_path).exists("../etc/passwd")
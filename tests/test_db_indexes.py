@@ -0,0 +1,26 @@
+from utils import db_indexes
+
+
+def _explain(monkeypatch, access_type, key, extra=None):
+    plan = [
+        {"table": table, "type": access_type, "key": key, "rows": 100, "Extra": extra}
+        for table in db_indexes.PROPERTY_TABLES.values()
+    ]
+    monkeypatch.setattr(db_indexes, "has_table", lambda table: True)
+    monkeypatch.setattr(db_indexes, "execute_query", lambda query, params=None, primary=False: plan)
+    return db_indexes.explain_listing_queries()
+
+
+def test_ref_access_uses_index(monkeypatch):
+    results = _explain(monkeypatch, "ref", "idx_active_created", "Using where")
+    assert results and all(r["uses_index"] and not r["filesort"] for r in results)
+
+
+def test_full_index_scan_is_not_indexed(monkeypatch):
+    results = _explain(monkeypatch, "index", "idx_active_created")
+    assert not any(r["uses_index"] for r in results)
+
+
+def test_filesort_is_flagged(monkeypatch):
+    results = _explain(monkeypatch, "range", "idx_active_price", "Using index condition; Using filesort")
+    assert all(r["uses_index"] and r["filesort"] for r in results)
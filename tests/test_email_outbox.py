@@ -0,0 +1,126 @@
+import smtplib
+
+import pytest
+
+import utils.email_outbox as email_outbox
+from utils.email_outbox import (
+    EmailOutboxWorker, KIND_MESSAGE, KIND_SELF_NOTIFICATION, _is_permanent, _retry_delay
+)
+
+
+class FakeDB:
+    """Records execute_update/execute_query calls; returns queued results in order"""
+
+    def __init__(self, monkeypatch, updates=(), queries=()):
+        self.calls = []
+        self.updates = list(updates)
+        self.queries = list(queries)
+        monkeypatch.setattr(email_outbox, "execute_update", self.execute_update)
+        monkeypatch.setattr(email_outbox, "execute_query", self.execute_query)
+
+    def execute_update(self, query, params=None):
+        self.calls.append((" ".join(query.split()), params))
+        return self.updates.pop(0) if self.updates else 0
+
+    def execute_query(self, query, params=None, primary=False):
+        self.calls.append((" ".join(query.split()), params))
+        return self.queries.pop(0) if self.queries else []
+
+
+def _row(row_id, kind=KIND_MESSAGE, to_email="admin@example.com", attempts=0):
+    return {
+        "id": row_id, "kind": kind, "to_email": to_email, "sender_email": to_email,
+        "subject": f"subject {row_id}", "body": "body", "html_body": None,
+        "payload": '{"title": "t", "message": "m", "details": {}}', "attempts": attempts,
+    }
+
+
+@pytest.fixture
+def worker():
+    worker = EmailOutboxWorker()
+    yield worker
+    worker.stop()
+
+
+def test_retry_delay_is_exponential_and_capped(monkeypatch):
+    monkeypatch.setattr(email_outbox, "EMAIL_RETRY_BASE_SECONDS", 30)
+    monkeypatch.setattr(email_outbox, "EMAIL_RETRY_MAX_SECONDS", 3600)
+    assert [_retry_delay(n) for n in (1, 2, 3, 4)] == [30, 60, 120, 240]
+    assert _retry_delay(20) == 3600
+
+
+def test_permanent_errors():
+    assert _is_permanent(smtplib.SMTPResponseException(550, b"mailbox unavailable"))
+    assert not _is_permanent(smtplib.SMTPResponseException(421, b"try again later"))
+    assert not _is_permanent(smtplib.SMTPServerDisconnected("gone"))
+
+
+def test_claim_returns_nothing_when_no_row_is_due(monkeypatch, worker):
+    db = FakeDB(monkeypatch, updates=[0])
+    assert worker._claim(10) == []
+    assert len(db.calls) == 1
+    assert "next_attempt_at <= NOW()" in db.calls[0][0]
+
+
+def test_claim_pulls_in_pending_reminders_for_the_same_address(monkeypatch, worker):
+    due = [_row(1, KIND_SELF_NOTIFICATION), _row(2)]
+    coalesced = due + [_row(3, KIND_SELF_NOTIFICATION), _row(4, KIND_SELF_NOTIFICATION)]
+    db = FakeDB(monkeypatch, updates=[2, 2], queries=[due, coalesced])
+
+    assert worker._claim(10) == coalesced
+    claim_id = db.calls[0][1][0]
+    join_query, join_params = db.calls[2]
+    # Reminders still in their digest window are claimed regardless of next_attempt_at
+    assert "next_attempt_at" not in join_query
+    assert "attempts = 0" in join_query
+    assert join_params == (claim_id, KIND_SELF_NOTIFICATION, "admin@example.com")
+
+
+def test_claim_without_reminders_does_not_coalesce(monkeypatch, worker):
+    due = [_row(1), _row(2, to_email="other@example.com")]
+    db = FakeDB(monkeypatch, updates=[2], queries=[due])
+    assert worker._claim(10) == due
+    assert len(db.calls) == 2
+
+
+def test_process_due_sends_reminders_for_one_address_as_one_digest(monkeypatch, worker):
+    rows = [_row(1, KIND_SELF_NOTIFICATION), _row(2), _row(3, KIND_SELF_NOTIFICATION),
+            _row(4, KIND_SELF_NOTIFICATION, to_email="other@example.com")]
+    delivered = []
+    monkeypatch.setattr(worker, "_maintain", lambda: None)
+    monkeypatch.setattr(worker, "_claim", lambda limit: rows)
+    monkeypatch.setattr(worker, "_deliver", lambda settings, group: delivered.append([r["id"] for r in group]))
+    monkeypatch.setattr(email_outbox, "smtp_settings", lambda: {"host": "localhost"})
+
+    assert worker.process_due() == 4
+    assert sorted(delivered) == [[1, 3], [2], [4]]
+
+
+def test_process_due_without_smtp_retries_rows(monkeypatch, worker):
+    retried = []
+    monkeypatch.setattr(worker, "_maintain", lambda: None)
+    monkeypatch.setattr(worker, "_claim", lambda limit: [_row(1)])
+    monkeypatch.setattr(worker, "_mark_retry", lambda rows, error, permanent=False: retried.append(error))
+    monkeypatch.setattr(email_outbox, "smtp_settings", lambda: None)
+    assert worker.process_due() == 1
+    assert retried == ["SMTP is not configured"]
+
+
+def test_mark_retry_backs_off_then_fails(monkeypatch, worker):
+    monkeypatch.setattr(email_outbox, "EMAIL_MAX_ATTEMPTS", 3)
+    db = FakeDB(monkeypatch)
+    worker._mark_retry([_row(1, attempts=0), _row(2, attempts=2)], "timeout")
+
+    retry_query, retry_params = db.calls[0]
+    assert "status = 'pending'" in retry_query
+    assert retry_params == (1, "timeout", _retry_delay(1), 1)
+    fail_query, fail_params = db.calls[1]
+    assert "status = 'failed'" in fail_query
+    assert fail_params == (3, "timeout", 2)
+    assert worker.stats()["retried"] == 1 and worker.stats()["failed"] == 1
+
+
+def test_mark_retry_permanent_error_fails_immediately(monkeypatch, worker):
+    db = FakeDB(monkeypatch)
+    worker._mark_retry([_row(1, attempts=0)], "550 no such user", permanent=True)
+    assert "status = 'failed'" in db.calls[0][0]
@@ -0,0 +1,26 @@
+from utils import id_collisions
+
+
+def _tables(monkeypatch, existing):
+    monkeypatch.setattr(id_collisions, "has_table", lambda table: table in existing)
+
+
+def test_query_joins_every_pair_of_existing_tables(monkeypatch):
+    _tables(monkeypatch, {"commercial_properties", "residential_properties", "plot_properties"})
+    query = id_collisions.collision_query()
+    assert query.count("UNION ALL") == 2
+    assert "FROM commercial_properties a INNER JOIN plot_properties b" in query
+
+
+def test_query_skips_missing_tables(monkeypatch):
+    _tables(monkeypatch, {"residential_properties", "plot_properties"})
+    query = id_collisions.collision_query()
+    assert "commercial_properties" not in query
+    assert "UNION ALL" not in query
+
+
+def test_no_query_with_a_single_table(monkeypatch):
+    _tables(monkeypatch, {"residential_properties"})
+    monkeypatch.setattr(id_collisions, "execute_query", lambda query: 1 / 0)
+    assert id_collisions.collision_query() is None
+    assert id_collisions._load_collisions() == {}
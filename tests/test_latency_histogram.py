@@ -0,0 +1,21 @@
+from decimal import Decimal
+
+from utils.latency_histogram import bin_bounds, latency_bin, percentiles
+
+
+def test_latency_bin_round_trips_through_bounds():
+    for ms in (0.5, 1, 3, 17.5, 250, 4000):
+        lower, upper = bin_bounds(latency_bin(ms))
+        assert lower <= ms < upper
+
+
+def test_percentiles_empty_histogram():
+    assert percentiles({}) == {"p50": None, "p90": None, "p95": None, "p99": None}
+
+
+def test_percentiles_accepts_decimal_counts():
+    # MySQL returns SUM(request_count) as Decimal
+    from_db = percentiles({3: Decimal(5), 4: Decimal(2)})
+    assert from_db == percentiles({3: 5, 4: 2})
+    assert from_db["p50"] is not None
+
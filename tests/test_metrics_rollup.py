@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from utils.metrics_rollup import summarize_batch
+
+
+def _row(endpoint, response_time_ms, status_code, created_at):
+    return (endpoint, "GET", response_time_ms, status_code, status_code >= 400, "127.0.0.1", "ua", created_at)
+
+
+def test_rows_are_bucketed_by_request_time():
+    aggregates, histogram = summarize_batch([
+        _row("/api/images/<int:image_id>", 5, 200, datetime(2026, 1, 1, 10, 5, 59)),
+        _row("/api/images/<int:image_id>", 7, 500, datetime(2026, 1, 1, 10, 6, 1)),
+    ])
+    minute_a = aggregates[("minute", "2026-01-01 10:05:00", "/api/images/<int:image_id>", "GET")]
+    minute_b = aggregates[("minute", "2026-01-01 10:06:00", "/api/images/<int:image_id>", "GET")]
+    hour = aggregates[("hour", "2026-01-01 10:00:00", "/api/images/<int:image_id>", "GET")]
+    assert minute_a["count"] == minute_b["count"] == 1
+    assert hour["count"] == 2
+    assert hour["server_errors"] == 1 and hour["success"] == 1
+    assert hour["min"] == 5 and hour["max"] == 7
+    assert sum(count for key, count in histogram.items() if key[0] == "hour") == 2
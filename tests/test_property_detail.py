@@ -0,0 +1,18 @@
+import utils.property_detail as property_detail
+from utils.property_detail import build_property_detail_response, fetch_property_detail
+
+
+def test_image_normalization_error_degrades_to_no_images():
+    body = build_property_detail_response('plot', {'id': 5}, [None], [])
+    assert body['id'] == 5
+    assert body['images'] == []
+
+
+def test_image_query_failure_for_missing_property_returns_no_row(monkeypatch):
+    def fail(category, property_id):
+        raise RuntimeError("images query failed")
+
+    monkeypatch.setattr(property_detail, "fetch_property_row", lambda category, property_id: None)
+    monkeypatch.setattr(property_detail, "fetch_property_images", fail)
+    monkeypatch.setattr(property_detail, "fetch_property_features", fail)
+    assert fetch_property_detail('plot', 404) == (None, [], [])
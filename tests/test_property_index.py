@@ -0,0 +1,168 @@
+"""
+The in-memory index must answer GET /api/properties exactly like the SQL path.
+The SQL side runs build_listing_filters' WHERE clauses against the same rows in
+SQLite and orders them like build_page_keys_query.
+"""
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import utils.property_queries as property_queries
+from utils.property_index import PropertySearchIndex
+from utils.property_queries import CATEGORY_RANK, PROPERTY_TABLES, build_listing_filters
+
+
+BASE = datetime(2026, 3, 1, 12, 0, 0)
+
+ROWS = {
+    'residential': [
+        dict(id=1, name="Green Villa", city="Mysuru", locality="Vijayanagar", builder="Prestige",
+             type="villa", status="new", is_featured=1, is_active=1, price=9500000, area=2400, bedrooms=4,
+             created_at=BASE),
+        dict(id=2, name="Lake View", city="Mysuru", locality="Kuvempunagar", builder="Sobha",
+             type="apartment", status="sell", is_featured=0, is_active=1, price=4500000, area=1200, bedrooms=2,
+             created_at=BASE - timedelta(days=1)),
+        dict(id=3, name="Old House", city="Bengaluru", locality="Jayanagar", builder=None,
+             type="house", status="resale", is_featured=0, is_active=1, price=None, area=None, bedrooms=3,
+             created_at=BASE - timedelta(days=2)),
+        dict(id=4, name="Hidden", city="Mysuru", locality="Hebbal", builder=None,
+             type="apartment", status="new", is_featured=0, is_active=0, price=3000000, area=900, bedrooms=2,
+             created_at=BASE - timedelta(days=3)),
+    ],
+    'plot': [
+        dict(id=1, name="Sunrise Layout", city="Mysuru", locality="Bogadi", builder="Local",
+             type=None, status="new", is_featured=0, is_active=1, price=2500000, area=1500, bedrooms=0,
+             created_at=BASE),
+        dict(id=7, name="Ring Road Plots", city="Mandya", locality="Ring Road", builder=None,
+             type=None, status="sell", is_featured=1, is_active=1, price=5000000, area=2400, bedrooms=0,
+             created_at=BASE - timedelta(days=1)),
+    ],
+    'commercial': [
+        dict(id=1, name="City Centre Office", city="Mysuru", locality="Devaraja Mohalla", builder=None,
+             type="office_space", status="rent", is_featured=0, is_active=1, price=12000000, area=3000,
+             bedrooms=0, created_at=BASE),
+        dict(id=5, name="Cold Store", city="Mandya", locality="Industrial Area", builder=None,
+             type="warehouse", status="sale", is_featured=1, is_active=1, price=5000000, area=8000,
+             bedrooms=0, created_at=BASE - timedelta(days=1)),
+    ],
+}
+
+SHAPES = [
+    {},
+    {"type_str": "apartment"},
+    {"type_str": "villa"},
+    {"type_str": "office_space"},
+    {"type_str": "unknown"},
+    {"status_str": "new"},
+    {"status_str": "sell"},
+    {"min_price": 4000000},
+    {"max_price": 5000000},
+    {"min_price": 3000000, "max_price": 6000000},
+    {"is_featured": True},
+    {"is_featured": False},
+    {"location": "mysuru"},
+    {"location": "NAGAR"},
+    {"location": "ring"},
+    {"type_str": "apartment", "location": "mysuru", "max_price": 5000000},
+    {"status_str": "new", "is_featured": False},
+]
+
+
+@pytest.fixture
+def sql_db(monkeypatch):
+    # Plain LOWER(city) LIKE branch of location_condition (no generated columns in SQLite)
+    monkeypatch.setattr(property_queries, "has_column", lambda table, column: False)
+    db = sqlite3.connect(":memory:")
+    for category, table in PROPERTY_TABLES.items():
+        type_column = "property_type" if category == 'commercial' else "type"
+        db.execute(
+            f"CREATE TABLE {table} (id INTEGER, city TEXT, locality TEXT, {type_column} TEXT, status TEXT, "
+            "is_featured INTEGER, is_active INTEGER, price REAL, created_at TEXT)"
+        )
+        for row in ROWS[category]:
+            db.execute(
+                f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (row['id'], row['city'], row['locality'], row['type'], row['status'], row['is_featured'],
+                 row['is_active'], row['price'], row['created_at'].isoformat())
+            )
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def index():
+    index = PropertySearchIndex(enabled=False)
+    for category, rows in ROWS.items():
+        for row in rows:
+            if row['is_active']:
+                index._add((category, row['id']), row, [])
+    return index
+
+
+def sql_listing_keys(db, **kwargs):
+    """Keys selected by build_listing_filters, in the ORDER BY of build_page_keys_query"""
+    found = []
+    for category, (where, params) in build_listing_filters(**kwargs).items():
+        rows = db.execute(
+            f"SELECT id, created_at FROM {PROPERTY_TABLES[category]} WHERE {where.replace('%s', '?')}",
+            params
+        ).fetchall()
+        found.extend((created_at, category, property_id) for property_id, created_at in rows)
+    found.sort(key=lambda r: (-datetime.fromisoformat(r[0]).timestamp(), CATEGORY_RANK[r[1]], -r[2]))
+    return [(category, property_id) for _, category, property_id in found]
+
+
+@pytest.mark.parametrize("shape", SHAPES, ids=[repr(s) for s in SHAPES])
+def test_listing_keys_match_sql_filters(sql_db, index, shape):
+    assert index.listing_keys(**shape) == sql_listing_keys(sql_db, **shape)
+
+
+def test_listing_keys_exclude_inactive(index):
+    assert ('residential', 4) not in index.listing_keys()
+
+
+def _cursor_for(category, property_id):
+    row = next(r for r in ROWS[category] if r['id'] == property_id)
+    return row['created_at'], category, property_id
+
+
+def test_position_after_each_listed_key(index):
+    keys = index.listing_keys()
+    for i, (category, property_id) in enumerate(keys):
+        assert index.position_after(keys, _cursor_for(category, property_id)) == i + 1
+
+
+def test_position_after_ties_on_created_at(index):
+    # residential 1, plot 1 and commercial 1 share created_at: category rank breaks the tie
+    keys = index.listing_keys()
+    assert keys[:3] == [('residential', 1), ('plot', 1), ('commercial', 1)]
+    assert index.position_after(keys, (BASE, 'plot', 1)) == 2
+
+
+def test_position_after_removed_cursor_row(index):
+    keys = index.listing_keys()
+    index._remove(('plot', 1))
+    remaining = index.listing_keys()
+    # The cursor row is gone: the next page starts at the first key that sorted after it
+    assert remaining[index.position_after(remaining, (BASE, 'plot', 1))] == keys[2]
+
+
+def test_search_requires_every_term_as_prefix(index):
+    assert [key for key, _ in index.search(["lake", "vi"], [])] == [('residential', 2)]
+    assert index.search(["lake", "sobha", "nothing"], []) == []
+
+
+def test_search_ranks_name_matches_above_location_matches(index):
+    results = index.search(["mysuru"], [])
+    assert {key for key, _ in results} == {
+        ('residential', 1), ('residential', 2), ('plot', 1), ('commercial', 1)
+    }
+    assert index.search(["green"], [])[0][1] > index.search(["vijayanagar"], [])[0][1]
+
+
+def test_search_category_filters(index):
+    assert {k for k, _ in index.search([], [], type_str="plot")} == {('plot', 1), ('plot', 7)}
+    assert {k for k, _ in index.search([], [], type_str="warehouse")} == {('commercial', 5)}
+    assert {k for k, _ in index.search([], ["mand"])} == {('plot', 7), ('commercial', 5)}
+    assert {k for k, _ in index.search([], [], min_bedrooms=3)} == {('residential', 1), ('residential', 3)}
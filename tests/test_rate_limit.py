@@ -0,0 +1,56 @@
+import pytest
+
+import utils.rate_limit as rate_limit
+from utils.rate_limit import TokenBucketLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_allows_capacity_then_reports_wait(clock):
+    limiter = TokenBucketLimiter(6)  # 6 per minute: one token every 10 s
+    assert [limiter.take("1.2.3.4") for _ in range(6)] == [0.0] * 6
+    assert limiter.take("1.2.3.4") == pytest.approx(10.0)
+
+
+def test_bucket_refills_over_time(clock):
+    limiter = TokenBucketLimiter(6)
+    for _ in range(6):
+        limiter.take("key")
+    clock[0] += 4
+    assert limiter.take("key") == pytest.approx(6.0)
+    clock[0] += 6
+    assert limiter.take("key") == 0.0
+    assert limiter.take("key") > 0
+
+
+def test_refill_is_capped_at_capacity(clock):
+    limiter = TokenBucketLimiter(6, capacity=2)
+    clock[0] += 3600
+    assert [limiter.take("key") == 0.0 for _ in range(3)] == [True, True, False]
+
+
+def test_keys_are_independent(clock):
+    limiter = TokenBucketLimiter(1)
+    assert limiter.take("a") == 0.0
+    assert limiter.take("a") > 0
+    assert limiter.take("b") == 0.0
+
+
+def test_zero_rate_and_empty_key_are_not_limited(clock):
+    assert all(TokenBucketLimiter(0).take("key") == 0.0 for _ in range(100))
+    limiter = TokenBucketLimiter(1)
+    assert all(limiter.take("") == 0.0 for _ in range(5))
+
+
+def test_full_buckets_are_pruned(clock):
+    limiter = TokenBucketLimiter(60, max_keys=3)
+    for key in ("a", "b", "c"):
+        limiter.take(key)
+    clock[0] += 60  # a bucket refills from empty to full in capacity / rate seconds
+    limiter.take("d")
+    assert set(limiter._buckets) == {"d"}
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+import pytest
+from flask import Flask, jsonify
+
+import utils.response_cache as response_cache_module
+from utils.response_cache import ResponseCache, cached_response, mark_uncacheable
+
+
+def test_lru_eviction():
+    cache = ResponseCache(max_entries=2, default_ttl=60)
+    for key in ("a", "b", "c"):
+        cache.set(key, 200, [], key.encode(), ["properties"])
+    assert cache.get("a") is None
+    assert cache.get("c") == (200, [], b"c")
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(response_cache_module.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(default_ttl=10)
+    cache.set("a", 200, [], b"a", ["blogs"])
+    now[0] += 11
+    assert cache.get("a") is None
+
+
+def test_invalidate_tags_drops_tagged_entries_only():
+    cache = ResponseCache()
+    cache.set("props", 200, [], b"p", ["properties"])
+    cache.set("blogs", 200, [], b"b", ["blogs"])
+    assert cache.invalidate_tags("properties") == 1
+    assert cache.get("props") is None
+    assert cache.get("blogs") is not None
+
+
+def test_response_rendered_before_invalidation_is_not_stored():
+    cache = ResponseCache()
+    generation = cache.generation
+    cache.invalidate_tags("properties")
+    cache.set("props", 200, [], b"stale", ["properties"], generation=generation)
+    assert cache.get("props") is None
+
+
+def test_entry_for_other_versions_is_a_miss():
+    cache = ResponseCache()
+    cache.set("props", 200, [], b"p", ["properties"], versions={"properties": (1, None)})
+    assert cache.get("props", {"properties": (2, None)}) is None
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(response_cache_module, "response_cache", ResponseCache())
+    monkeypatch.setattr(
+        response_cache_module, "get_versions",
+        lambda tags: {tag: (7, datetime(2026, 1, 1)) for tag in tags}
+    )
+    app = Flask(__name__)
+    calls = {"count": 0, "fail": False}
+
+    @app.route("/stats")
+    @cached_response("properties")
+    def stats():
+        calls["count"] += 1
+        if calls["fail"]:
+            mark_uncacheable()
+            return jsonify({"total": 0})
+        return jsonify({"total": 42})
+
+    client = app.test_client()
+    client.calls = calls
+    return client
+
+
+def test_cached_view_and_conditional_get(client):
+    first = client.get("/stats")
+    assert first.headers["X-Cache"] == "MISS" and first.headers.get("ETag")
+    assert client.get("/stats").headers["X-Cache"] == "HIT"
+    assert client.get("/stats", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+    assert client.calls["count"] == 1
+
+
+def test_uncacheable_fallback_is_not_stored_or_validated(client):
+    client.calls["fail"] = True
+    fallback = client.get("/stats")
+    assert fallback.status_code == 200
+    assert "ETag" not in fallback.headers
+    assert fallback.headers["Cache-Control"] == "no-store"
+
+    client.calls["fail"] = False
+    recovered = client.get("/stats")
+    assert recovered.get_json() == {"total": 42}
+    assert client.calls["count"] == 2
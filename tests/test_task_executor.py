@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from utils.task_executor import BackgroundTaskExecutor, _parse_limits
+
+
+@pytest.fixture
+def executor():
+    executor = BackgroundTaskExecutor("test-tasks", workers=4, max_queue_size=100, limits={"audit": 1})
+    yield executor
+    executor.shutdown(timeout=5)
+
+
+class Tracker:
+    """Records the highest number of concurrently running tasks per type"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.peak = {}
+        self.release = threading.Event()
+
+    def task(self, task_type):
+        with self.lock:
+            self.running[task_type] = self.running.get(task_type, 0) + 1
+            self.peak[task_type] = max(self.peak.get(task_type, 0), self.running[task_type])
+        self.release.wait(5)
+        with self.lock:
+            self.running[task_type] -= 1
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+def test_parse_limits():
+    assert _parse_limits("audit=2, other = 1,bad,x=y") == {"audit": 2, "other": 1}
+
+
+def test_per_type_limit_leaves_workers_for_other_types(executor):
+    tracker = Tracker()
+    for _ in range(3):
+        executor.submit("audit", tracker.task, "audit")
+    for _ in range(3):
+        executor.submit("other", tracker.task, "other")
+
+    # "audit" is limited to 1, so the other 3 workers all run "other" tasks
+    _wait_for(lambda: tracker.peak.get("other") == 3)
+    assert tracker.peak["audit"] == 1
+    tracker.release.set()
+    _wait_for(lambda: executor.stats()["task_types"]["audit"]["completed"] == 3)
+    stats = executor.stats()["task_types"]
+    assert stats["audit"]["limit"] == 1 and stats["other"]["limit"] == 4
+    assert tracker.peak["audit"] == 1
+
+
+def test_full_queue_drops_tasks():
+    executor = BackgroundTaskExecutor("test-full", workers=1, max_queue_size=1, limits={})
+    release = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    try:
+        assert executor.submit("audit", block)
+        started.wait(5)
+        assert executor.submit("audit", block)  # queued behind the running task
+        assert not executor.submit("audit", block)
+        assert executor.stats()["task_types"]["audit"]["dropped"] == 1
+    finally:
+        release.set()
+        executor.shutdown(timeout=5)
+
+
+def test_failed_tasks_are_counted(executor):
+    def fail():
+        raise RuntimeError("boom")
+
+    executor.submit("audit", fail)
+    _wait_for(lambda: executor.stats()["task_types"]["audit"]["failed"] == 1)
+
+
+def test_shutdown_drains_queue_and_rejects_new_tasks():
+    executor = BackgroundTaskExecutor("test-drain", workers=1, max_queue_size=10, limits={})
+    done = []
+    for i in range(5):
+        executor.submit("audit", done.append, i)
+    executor.shutdown(timeout=5)
+    assert done == [0, 1, 2, 3, 4]
+    assert not executor.submit("audit", done.append, 5)
@@ -0,0 +1,48 @@
+"""
+Application request metrics pipeline.
+track_request_metrics (app.py) hands each API request to record_request_metric();
+rows are buffered and written to application_metrics in multi-row batches,
+and every written batch is folded into the rollups (utils/metrics_rollup.py).
+"""
+import os
+from datetime import datetime
+
+from utils.batch_writer import BatchWriter
+from utils.metrics_rollup import apply_rollups
+
+
+# Requests that matched no route are recorded under one endpoint instead of their raw paths
+UNMATCHED_ENDPOINT = "<unmatched>"
+
+INSERT_METRIC_QUERY = """
+    INSERT INTO application_metrics
+    (endpoint, method, response_time_ms, status_code, is_error, ip_address, user_agent, created_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+metrics_writer = BatchWriter(
+    "application_metrics",
+    INSERT_METRIC_QUERY,
+    max_queue_size=int(os.getenv("METRICS_QUEUE_SIZE", "10000")),
+    batch_size=int(os.getenv("METRICS_BATCH_SIZE", "200")),
+    flush_interval_ms=int(os.getenv("METRICS_FLUSH_INTERVAL_MS", "2000")),
+    on_flush=apply_rollups
+)
+
+
+def record_request_metric(endpoint, method, response_time_ms, status_code, ip_address, user_agent,
+                          requested_at: datetime = None) -> bool:
+    """
+    Queue one request metric row; returns False if the queue was full and the row dropped.
+    endpoint should be the route rule (e.g. /api/images/<int:image_id>), not the raw path,
+    so the rollups hold one row per route.
+    """
+    return metrics_writer.submit((
+        endpoint, method, round(response_time_ms, 2), status_code,
+        status_code >= 400, ip_address, user_agent, requested_at or datetime.utcnow()
+    ))
+
+
+def get_pipeline_stats() -> dict:
+    """Queue depth and enqueue/drop/write counters for the admin metrics endpoint"""
+    return metrics_writer.stats()
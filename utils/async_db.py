@@ -0,0 +1,95 @@
+"""
+Async MySQL access for the async serving mode (asgi.py).
+Uses SQLAlchemy's asyncio engine over aiomysql with the same credentials,
+read-replica routing and read-your-writes pinning as database.execute_query;
+the query strings come from the same builders (MySQL %s placeholders).
+
+Optional: requires `pip install aiomysql` (SQLAlchemy's asyncio extension also
+needs greenlet). The WSGI app under Passenger never imports this module.
+"""
+import os
+import threading
+from typing import Dict
+
+import database
+
+try:
+    from sqlalchemy.ext.asyncio import create_async_engine
+    import aiomysql  # noqa: F401  (driver for the mysql+aiomysql URLs)
+    ASYNC_DB_AVAILABLE = True
+except ImportError:
+    create_async_engine = None
+    ASYNC_DB_AVAILABLE = False
+
+
+ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", "10"))
+ASYNC_DB_MAX_OVERFLOW = int(os.getenv("ASYNC_DB_MAX_OVERFLOW", "20"))
+
+_engines: Dict[str, object] = {}  # server URL -> async engine
+_engines_pid = None
+_engines_lock = threading.Lock()
+
+
+def _get_async_engine(url):
+    """One async engine per server (primary / replica) and process"""
+    global _engines, _engines_pid
+    if not ASYNC_DB_AVAILABLE:
+        raise RuntimeError("Async database access needs the aiomysql package (pip install aiomysql)")
+    key = str(url)
+    with _engines_lock:
+        if _engines_pid != os.getpid():
+            # Engines (and their pools) must not be shared with a parent process
+            _engines = {}
+            _engines_pid = os.getpid()
+        async_engine = _engines.get(key)
+        if async_engine is None:
+            async_engine = create_async_engine(
+                url.set(drivername="mysql+aiomysql"),
+                pool_pre_ping=True,
+                pool_recycle=3600,
+                pool_size=ASYNC_DB_POOL_SIZE,
+                max_overflow=ASYNC_DB_MAX_OVERFLOW,
+                pool_timeout=30,
+                # Reads only: no transaction per query, always the latest committed data
+                isolation_level="AUTOCOMMIT",
+                connect_args={"charset": "utf8mb4", "connect_timeout": 10},
+            )
+            _engines[key] = async_engine
+        return async_engine
+
+
+async def async_execute_query(query: str, params: tuple = None, primary: bool = False) -> list:
+    """Async twin of database.execute_query: a SELECT as a list of dicts"""
+    if database.engine is None:
+        database.validate_db_credentials()  # This will raise a helpful error
+        raise RuntimeError("Database engine not initialized. Check environment variables.")
+
+    url = database.read_engine_url(primary)
+    try:
+        try:
+            conn = await _get_async_engine(url).connect()
+        except Exception as e:
+            if str(url) == str(database.engine.url):
+                raise
+            # Replica refused the connection: same failover as the sync path
+            database.report_replica_failure(url, e)
+            conn = await _get_async_engine(database.engine.url).connect()
+        async with conn:
+            result = await conn.exec_driver_sql(query, params or None)
+            return [dict(row) for row in result.mappings().all()]
+    except Exception as e:
+        print(f"Database query error: {str(e)}")
+        print(f"Query: {query}")
+        print(f"Params: {params}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+async def dispose_async_engines():
+    with _engines_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for async_engine in engines:
+        await async_engine.dispose()
+
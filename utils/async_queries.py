@@ -0,0 +1,90 @@
+"""
+Async versions of the listing and detail fetchers for the async serving mode
+(asgi.py). They run the same SQL builders as utils/property_queries.py and
+utils/property_detail.py through utils/async_db.py; independent queries are
+awaited together instead of one after another.
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from utils.async_db import async_execute_query
+from utils.property_queries import (
+    build_count_query, build_page_keys_query, build_seek_keys_query, build_rows_by_ids_query,
+    build_primary_images_query, group_keys_by_category, group_rows_by_category, order_hydrated_rows
+)
+from utils.property_detail import (
+    property_row_query, property_images_query, property_features_query, sort_images, feature_names
+)
+
+
+async def async_count_listing(filters: Dict[str, Tuple[str, list]]) -> int:
+    result = await async_execute_query(*build_count_query(filters))
+    return int(result[0]['total'] or 0) if result else 0
+
+
+async def async_hydrate_listing_rows(keys: List[dict]) -> List[dict]:
+    """hydrate_listing_rows with the per-category queries in flight together"""
+    ids_by_category = group_keys_by_category(keys)
+    results = await asyncio.gather(*(
+        async_execute_query(*build_rows_by_ids_query(category, ids))
+        for category, ids in ids_by_category.items()
+    ))
+    rows_by_key = {}
+    for category, rows in zip(ids_by_category, results):
+        for row in rows:
+            rows_by_key[(category, row['id'])] = row
+    return order_hydrated_rows(keys, rows_by_key)
+
+
+async def async_fetch_listing_page(
+    filters: Dict[str, Tuple[str, list]],
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[Tuple[datetime, str, int]] = None
+) -> List[dict]:
+    if cursor is not None:
+        query, params = build_seek_keys_query(filters, limit, cursor)
+    else:
+        query, params = build_page_keys_query(filters, limit, offset)
+    keys = await async_execute_query(query, params)
+    if not keys:
+        return []
+    return await async_hydrate_listing_rows(keys)
+
+
+async def async_fetch_primary_images(rows: List[dict]) -> Dict[Tuple[str, int], str]:
+    ids_by_category = group_rows_by_category(rows)
+    results = await asyncio.gather(
+        *(async_execute_query(*build_primary_images_query(category, ids)) for category, ids in ids_by_category.items()),
+        return_exceptions=True
+    )
+    images = {}
+    for (category, ids), result in zip(ids_by_category.items(), results):
+        if isinstance(result, Exception):
+            # If image fetch fails, continue without images
+            print(f"Warning: Could not fetch images for {category} properties {ids}: {str(result)}")
+            continue
+        for image in result:
+            if image.get('image_url'):
+                images[(category, image['property_id'])] = image['image_url']
+    return images
+
+
+async def async_fetch_property_detail(category: str, property_id: int) -> Tuple[Optional[dict], List[dict], List[str]]:
+    """fetch_property_detail: (row, images, features), the three queries awaited together"""
+    rows, images, features = await asyncio.gather(
+        async_execute_query(*property_row_query(category, property_id)),
+        async_execute_query(*property_images_query(category, property_id)),
+        async_execute_query(*property_features_query(category, property_id)),
+        return_exceptions=True
+    )
+    if isinstance(rows, Exception):
+        raise rows
+    if isinstance(images, Exception):
+        print(f"Warning: could not load images for property {property_id}: {images}")
+        images = []
+    if isinstance(features, Exception):
+        print(f"Warning: could not load features for property {property_id}: {features}")
+        features = []
+    return (rows[0] if rows else None), sort_images(images), feature_names(features)
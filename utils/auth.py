@@ -2,11 +2,15 @@
 Authentication utilities for password hashing and verification
 """
 import base64
+import os
+import threading
 import traceback
 import warnings
 import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from contextlib import redirect_stderr
 import io
+from typing import Optional, Tuple
 from passlib.context import CryptContext
 
 # Try to import scrypt for manual verification
@@ -198,3 +202,75 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
+
+
+# ==========================================================
+# BOUNDED HASHING POOL
+# bcrypt/scrypt cost hundreds of milliseconds of CPU. Login verification runs
+# on a small per-process pool with a fixed number of slots (running + queued);
+# when every slot is taken the caller gets PasswordHashingBusy (HTTP 429)
+# instead of another request thread stuck behind the hashes.
+# ==========================================================
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE_DEPTH = int(os.getenv("PASSWORD_HASH_QUEUE_DEPTH", "4"))
+PASSWORD_HASH_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", "10"))
+
+
+class PasswordHashingBusy(Exception):
+    """Every hashing slot is taken (or the hash timed out); try again shortly"""
+
+
+_hash_executor = None
+_hash_slots = None
+_hash_executor_pid = None
+_hash_executor_lock = threading.Lock()
+
+
+def _get_hash_executor():
+    # Passenger forks workers after import; each process needs its own pool threads
+    global _hash_executor, _hash_slots, _hash_executor_pid
+    if _hash_executor is not None and _hash_executor_pid == os.getpid():
+        return _hash_executor, _hash_slots
+    with _hash_executor_lock:
+        if _hash_executor is None or _hash_executor_pid != os.getpid():
+            _hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+            _hash_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_DEPTH)
+            _hash_executor_pid = os.getpid()
+        return _hash_executor, _hash_slots
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when the hash uses a deprecated scheme or outdated cost parameters"""
+    try:
+        return pwd_context.needs_update(hashed_password)
+    except Exception:
+        # Hashes passlib cannot identify (custom scrypt:N:r:p$salt$hash) are upgraded too
+        return hashed_password.startswith('scrypt:')
+
+
+def verify_password_and_rehash(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """(valid, new hash) where new hash is set when a valid password's hash is outdated"""
+    if not verify_password(plain_password, hashed_password):
+        return False, None
+    if password_needs_rehash(hashed_password):
+        # verify_password compares the stripped password; hash the same value
+        return True, get_password_hash(plain_password.strip())
+    return True, None
+
+
+def verify_password_bounded(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """verify_password_and_rehash on the hashing pool; raises PasswordHashingBusy when saturated"""
+    executor, slots = _get_hash_executor()
+    if not slots.acquire(blocking=False):
+        raise PasswordHashingBusy("Password hashing pool is saturated")
+    try:
+        future = executor.submit(verify_password_and_rehash, plain_password, hashed_password)
+    except Exception:
+        slots.release()
+        raise
+    # The slot is held until the hash finishes, even if this request stops waiting
+    future.add_done_callback(lambda _: slots.release())
+    try:
+        return future.result(timeout=PASSWORD_HASH_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        raise PasswordHashingBusy("Password verification timed out")
@@ -0,0 +1,158 @@
+"""
+Buffered multi-row INSERT writer for high-volume, fire-and-forget rows
+(request metrics, page-view logs). Rows are queued in memory and written by
+one background flusher thread, so request latency does not depend on the database.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+import traceback
+from typing import Callable, List, Optional
+
+from database import get_db_cursor
+
+
+class BatchWriter:
+    """
+    Bounded in-memory queue + single flusher thread.
+
+    - submit() never blocks: when the queue is full the row is dropped and counted
+    - the flusher writes a batch every flush_interval_ms or as soon as batch_size rows are queued
+    - pending rows are flushed on interpreter shutdown
+    """
+
+    def __init__(
+        self,
+        name: str,
+        insert_query: str,
+        max_queue_size: int = 10000,
+        batch_size: int = 200,
+        flush_interval_ms: int = 1000,
+        on_flush: Optional[Callable[[List[tuple]], None]] = None
+    ):
+        self.name = name
+        self.insert_query = insert_query
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(10, flush_interval_ms) / 1000.0
+        self.on_flush = on_flush
+        self._queue = queue.Queue(maxsize=max(1, max_queue_size))
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stop_event = threading.Event()
+        self._counters = {
+            "enqueued": 0,
+            "dropped": 0,
+            "written": 0,
+            "failed": 0,
+            "batches": 0,
+        }
+        atexit.register(self.stop)
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def submit(self, row: tuple) -> bool:
+        """Queue one row for insertion; returns False if it was dropped"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self._counters["dropped"] += 1
+            return False
+        with self._lock:
+            self._counters["enqueued"] += 1
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+        stats["queued"] = self._queue.qsize()
+        stats["max_queue_size"] = self._queue.maxsize
+        return stats
+
+    # ------------------------------------------------------------------
+    # Flusher side
+    # ------------------------------------------------------------------
+    def _ensure_started(self):
+        # Passenger forks workers after import; start (or restart) the thread in the serving process
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-flusher", daemon=True)
+            self._thread.start()
+
+    def _next_batch(self) -> List[tuple]:
+        """Block until the first row arrives, then collect until batch_size or flush interval"""
+        try:
+            first = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[tuple]):
+        with self._write_lock:
+            try:
+                # PyMySQL rewrites executemany() of INSERT ... VALUES into multi-row INSERTs
+                with get_db_cursor() as cursor:
+                    cursor.executemany(self.insert_query, batch)
+                with self._lock:
+                    self._counters["written"] += len(batch)
+                    self._counters["batches"] += 1
+            except Exception as e:
+                with self._lock:
+                    self._counters["failed"] += len(batch)
+                print(f"Warning: {self.name} batch insert of {len(batch)} rows failed: {str(e)}")
+                return
+            if self.on_flush:
+                try:
+                    self.on_flush(batch)
+                except Exception:
+                    print(f"Warning: {self.name} on_flush hook failed")
+                    traceback.print_exc()
+
+    def flush(self):
+        """Write everything currently queued (used on shutdown)"""
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._write(batch)
+
+    def stop(self, timeout: float = 5.0):
+        self._stop_event.set()
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._thread.join(timeout)
+        try:
+            self.flush()
+        except Exception:
+            pass
@@ -0,0 +1,97 @@
+"""
+Content-addressed blob storage for uploaded images.
+Blobs are named by their SHA-256, so identical uploads are stored once.
+The backend is chosen with BLOB_STORE_BACKEND (only "local" ships today);
+other backends (object storage, NFS mounts) implement the BlobStore interface.
+"""
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from config import BLOB_STORE_DIR
+
+
+BLOB_STORE_BACKEND = os.getenv("BLOB_STORE_BACKEND", "local").lower()
+
+
+class BlobStore(ABC):
+    """Interface for content-addressed blob backends (incomplete backends fail at construction)"""
+
+    name = "base"
+
+    @abstractmethod
+    def exists(self, sha256: str) -> bool:
+        ...
+
+    @abstractmethod
+    def put_file(self, fileobj: BinaryIO, sha256: str) -> bool:
+        """Store the contents of fileobj (read from its current position) under sha256.
+        Returns False if the blob already existed (deduplicated)."""
+
+    @abstractmethod
+    def open(self, sha256: str) -> BinaryIO:
+        ...
+
+    def local_path(self, sha256: str) -> Optional[Path]:
+        """Filesystem path that can be served directly, or None for remote backends"""
+        return None
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under <root>/<sha[:2]>/<sha[2:4]>/<sha>, written via temp file + rename"""
+
+    name = "local"
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, sha256: str) -> Path:
+        sha256 = sha256.lower()
+        if len(sha256) != 64 or any(c not in "0123456789abcdef" for c in sha256):
+            raise ValueError(f"Invalid blob id: {sha256}")
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def exists(self, sha256: str) -> bool:
+        return self._path(sha256).exists()
+
+    def put_file(self, fileobj: BinaryIO, sha256: str) -> bool:
+        path = self._path(sha256)
+        if path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                shutil.copyfileobj(fileobj, f, 256 * 1024)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_name, 0o644)
+            # Atomic on POSIX; a concurrent identical upload just replaces equal bytes
+            os.replace(tmp_name, path)
+        except Exception:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        return True
+
+    def open(self, sha256: str) -> BinaryIO:
+        return open(self._path(sha256), "rb")
+
+    def local_path(self, sha256: str) -> Optional[Path]:
+        return self._path(sha256)
+
+
+_store = None
+
+
+def get_blob_store() -> BlobStore:
+    global _store
+    if _store is None:
+        if BLOB_STORE_BACKEND == "local":
+            _store = LocalBlobStore(BLOB_STORE_DIR)
+        else:
+            raise ValueError(f"Unknown BLOB_STORE_BACKEND: {BLOB_STORE_BACKEND}")
+    return _store
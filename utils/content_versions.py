@@ -0,0 +1,76 @@
+"""
+Per-tag content version counters shared by all worker processes.
+Admin writes bump the version of the tags they touch ("properties", "blogs", ...);
+readers use the versions to build ETags and to detect stale cached responses
+without running the heavy queries.
+"""
+import os
+import threading
+import time
+import traceback
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from database import execute_query, execute_update
+
+
+# How long a worker trusts its local copy of the versions (writes in the same worker refresh immediately)
+CONTENT_VERSION_TTL_SECONDS = float(os.getenv("CONTENT_VERSION_TTL_SECONDS", "2"))
+
+KNOWN_TAGS = (
+    "properties", "blogs", "partners", "testimonials", "cities", "categories", "unit_types",
+    "auth",
+)
+
+CREATE_CONTENT_VERSIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS content_versions (
+        tag VARCHAR(50) PRIMARY KEY COMMENT 'Cache tag, e.g. properties or blogs',
+        version BIGINT NOT NULL DEFAULT 1,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+_lock = threading.Lock()
+_versions = {}  # tag -> (version, updated_at)
+_loaded_at = 0.0
+
+
+def create_content_versions_table():
+    execute_update(CREATE_CONTENT_VERSIONS_TABLE)
+    placeholders = ", ".join(["(%s)"] * len(KNOWN_TAGS))
+    execute_update(f"INSERT IGNORE INTO content_versions (tag) VALUES {placeholders}", KNOWN_TAGS)
+
+
+def _load_versions():
+    global _versions, _loaded_at
+    rows = execute_query("SELECT tag, version, updated_at FROM content_versions")
+    versions = {row['tag']: (int(row['version']), row['updated_at']) for row in rows}
+    with _lock:
+        _versions = versions
+        _loaded_at = time.monotonic()
+
+
+def get_versions(tags: Iterable[str]) -> Dict[str, Tuple[int, Optional[datetime]]]:
+    """Current (version, updated_at) per tag; unknown tags report (0, None)"""
+    if time.monotonic() - _loaded_at > CONTENT_VERSION_TTL_SECONDS:
+        _load_versions()
+    with _lock:
+        return {tag: _versions.get(tag, (0, None)) for tag in tags}
+
+
+def bump_versions(*tags: str):
+    """Record that content behind the tags changed (visible to every worker)"""
+    global _loaded_at
+    try:
+        for tag in tags:
+            execute_update(
+                "INSERT INTO content_versions (tag, version) VALUES (%s, 1) "
+                "ON DUPLICATE KEY UPDATE version = version + 1",
+                (tag,)
+            )
+    except Exception:
+        print(f"Warning: Could not bump content versions for {', '.join(tags)}")
+        traceback.print_exc()
+    with _lock:
+        # Force a reload so this worker never serves the old version after its own write
+        _loaded_at = 0.0
@@ -0,0 +1,202 @@
+"""
+Secondary indexes for the property listing filters (GET /api/properties).
+The listing filters every table by is_active plus any of type/property_type,
+status, a price range, is_featured and a city/locality substring, and orders
+by created_at DESC, id DESC (InnoDB appends the primary key to every secondary
+index, so (is_active, created_at) also serves the id tie-break).
+
+The FULLTEXT indexes behind /api/search (utils/property_search.py) are managed
+here too; until they exist, search falls back to LIKE for that table.
+
+plan_index_changes() lists the DDL that is still missing, apply_index_changes()
+runs it and explain_listing_queries() EXPLAINs each listing query shape to check
+that every table branch uses an index. scripts/manage_indexes.py is the CLI.
+"""
+import traceback
+from typing import Dict, List, Tuple
+
+from database import execute_query, execute_update
+from utils.property_queries import PROPERTY_TABLES, build_listing_filters, build_page_keys_query
+from utils.property_search import SEARCH_COLUMNS, LOCATION_COLUMNS
+from utils.schema_info import has_table, refresh_schema_info
+
+
+# Lowercase copies of city/locality so the location filter compares columns
+# instead of computing LOWER() per row (STORED so they can be indexed)
+GENERATED_COLUMNS = (
+    ("city_lc", "VARCHAR(255) GENERATED ALWAYS AS (LOWER(city)) STORED"),
+    ("locality_lc", "VARCHAR(255) GENERATED ALWAYS AS (LOWER(locality)) STORED"),
+)
+
+LISTING_INDEXES = {
+    'residential': (
+        ("idx_active_created", ("is_active", "created_at")),
+        ("idx_active_type_price", ("is_active", "type", "price")),
+        ("idx_active_status_created", ("is_active", "status", "created_at")),
+        ("idx_active_featured_created", ("is_active", "is_featured", "created_at")),
+        ("idx_active_price", ("is_active", "price")),
+        ("idx_city_lc", ("city_lc",)),
+        ("idx_locality_lc", ("locality_lc",)),
+    ),
+    'plot': (
+        ("idx_active_created", ("is_active", "created_at")),
+        ("idx_active_status_created", ("is_active", "status", "created_at")),
+        ("idx_active_featured_created", ("is_active", "is_featured", "created_at")),
+        ("idx_active_price", ("is_active", "price")),
+        ("idx_city_lc", ("city_lc",)),
+        ("idx_locality_lc", ("locality_lc",)),
+    ),
+    'commercial': (
+        ("idx_active_created", ("is_active", "created_at")),
+        ("idx_active_type_price", ("is_active", "property_type", "price")),
+        ("idx_active_featured_created", ("is_active", "is_featured", "created_at")),
+        ("idx_active_price", ("is_active", "price")),
+        ("idx_city_lc", ("city_lc",)),
+        ("idx_locality_lc", ("locality_lc",)),
+    ),
+}
+
+# FULLTEXT indexes used by /api/search (the first one added to a table rebuilds it)
+SEARCH_FULLTEXT_INDEXES = {
+    category: (("ft_search", SEARCH_COLUMNS[category]), ("ft_location", LOCATION_COLUMNS))
+    for category in PROPERTY_TABLES
+}
+
+# Listing query shapes checked by explain_listing_queries (build_listing_filters kwargs)
+LISTING_QUERY_SHAPES = (
+    ("default", {}),
+    ("type", {"type_str": "apartment"}),
+    ("commercial type", {"type_str": "office_space"}),
+    ("status", {"status_str": "new"}),
+    ("price range", {"min_price": 1000000, "max_price": 5000000}),
+    ("type + price range", {"type_str": "villa", "min_price": 1000000, "max_price": 5000000}),
+    ("featured", {"is_featured": True}),
+    ("location", {"location": "mysuru"}),
+)
+
+
+def existing_indexes(table: str) -> Dict[str, List[str]]:
+    """Index name -> columns (in index order) for one table"""
+    rows = execute_query(
+        "SELECT INDEX_NAME as index_name, COLUMN_NAME as column_name "
+        "FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+        "ORDER BY INDEX_NAME, SEQ_IN_INDEX",
+        (table,),
+        primary=True
+    )
+    indexes = {}
+    for row in rows:
+        indexes.setdefault(row['index_name'], []).append(row['column_name'].lower())
+    return indexes
+
+
+def existing_fulltext_indexes(table: str) -> set:
+    """Column sets of the FULLTEXT indexes on one table"""
+    rows = execute_query(
+        "SELECT INDEX_NAME as index_name, COLUMN_NAME as column_name "
+        "FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_TYPE = 'FULLTEXT'",
+        (table,),
+        primary=True
+    )
+    columns_by_index = {}
+    for row in rows:
+        columns_by_index.setdefault(row['index_name'], set()).add(row['column_name'].lower())
+    return {frozenset(columns) for columns in columns_by_index.values()}
+
+
+def existing_columns(table: str) -> set:
+    rows = execute_query(
+        "SELECT COLUMN_NAME as column_name FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,),
+        primary=True
+    )
+    return {row['column_name'].lower() for row in rows}
+
+
+def plan_index_changes() -> List[Tuple[str, str]]:
+    """(table, DDL statement) for every missing generated column and index"""
+    statements = []
+    for category, table in PROPERTY_TABLES.items():
+        if not has_table(table):
+            continue
+        columns = existing_columns(table)
+        for name, definition in GENERATED_COLUMNS:
+            if name not in columns:
+                statements.append((table, f"ALTER TABLE {table} ADD COLUMN {name} {definition}"))
+        indexes = existing_indexes(table)
+        covered = {tuple(cols) for cols in indexes.values()}
+        for name, index_columns in LISTING_INDEXES[category]:
+            # Skip when an index with the same leading columns exists under another name
+            if name in indexes or any(cols[:len(index_columns)] == index_columns for cols in covered):
+                continue
+            statements.append((table, f"ALTER TABLE {table} ADD INDEX {name} ({', '.join(index_columns)})"))
+        fulltext = existing_fulltext_indexes(table)
+        for name, index_columns in SEARCH_FULLTEXT_INDEXES[category]:
+            # MATCH() needs an index over exactly these columns, in any order
+            if name in indexes or frozenset(index_columns) in fulltext:
+                continue
+            statements.append(
+                (table, f"ALTER TABLE {table} ADD FULLTEXT INDEX {name} ({', '.join(index_columns)})")
+            )
+    return statements
+
+
+def apply_index_changes(statements: List[Tuple[str, str]]) -> Tuple[int, int]:
+    """Run the planned DDL; returns (applied, failed). Refreshes the schema cache afterwards."""
+    applied = 0
+    failed = 0
+    for table, statement in statements:
+        try:
+            execute_update(statement)
+            applied += 1
+            print(f"  ✓ {statement}")
+        except Exception as e:
+            if "Duplicate" in str(e) or "1060" in str(e) or "1061" in str(e):
+                continue  # Created concurrently
+            failed += 1
+            print(f"  ✗ {statement}: {e}")
+    refresh_schema_info()
+    return applied, failed
+
+
+# EXPLAIN access types that look rows up through an index. "index" is a full index
+# scan and counts as unindexed, like "ALL".
+INDEXED_ACCESS_TYPES = ('system', 'const', 'eq_ref', 'ref', 'ref_or_null', 'fulltext', 'index_merge', 'range')
+
+
+def explain_listing_queries() -> List[dict]:
+    """
+    EXPLAIN the first listing page for each filter shape.
+    One row per table branch: {"shape", "table", "key", "access_type", "rows", "uses_index",
+    "filesort"}; filesort is True when the branch sorts its rows instead of reading them
+    in index order.
+    """
+    results = []
+    for shape, kwargs in LISTING_QUERY_SHAPES:
+        filters = build_listing_filters(**kwargs)
+        filters = {c: f for c, f in filters.items() if has_table(PROPERTY_TABLES[c])}
+        query, params = build_page_keys_query(filters, 10, 0)
+        try:
+            plan = execute_query(f"EXPLAIN {query}", params, primary=True)
+        except Exception as e:
+            traceback.print_exc()
+            results.append({"shape": shape, "table": None, "key": None, "access_type": None,
+                            "rows": None, "uses_index": False, "filesort": False, "error": str(e)})
+            continue
+        for row in plan:
+            table = row.get('table')
+            if table not in PROPERTY_TABLES.values():
+                continue  # UNION RESULT / derived rows
+            results.append({
+                "shape": shape,
+                "table": table,
+                "key": row.get('key'),
+                "access_type": row.get('type'),
+                "rows": row.get('rows'),
+                "uses_index": bool(row.get('key')) and row.get('type') in INDEXED_ACCESS_TYPES,
+                "filesort": "Using filesort" in (row.get('Extra') or ''),
+            })
+    return results
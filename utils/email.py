@@ -2,8 +2,9 @@
 Email utilities for sending notifications
 """
 import os
+import time
 import traceback
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -38,6 +39,110 @@ def get_admin_email() -> str:
     return admin_email
 
 
+def smtp_settings() -> Optional[dict]:
+    """SMTP settings from environment variables, or None (logged) when incomplete"""
+    smtp_port_str = os.getenv("SMTP_PORT", "587")
+    settings = {
+        "host": os.getenv("SMTP_HOST"),
+        "port": int(smtp_port_str) if smtp_port_str else 587,
+        "user": os.getenv("SMTP_USER"),
+        "password": os.getenv("SMTP_PASSWORD"),
+        # Both default on; turn off only for a local SMTP stand-in (e.g. aiosmtpd in development)
+        "starttls": os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes"),
+        "auth": os.getenv("SMTP_AUTH", "true").lower() in ("1", "true", "yes"),
+    }
+
+    # Validate required SMTP settings
+    if not settings["host"]:
+        print("[EMAIL ERROR] SMTP_HOST environment variable not set.")
+        return None
+    if settings["auth"] and not settings["user"]:
+        print("[EMAIL ERROR] SMTP_USER environment variable not set.")
+        return None
+    if settings["auth"] and not settings["password"]:
+        print("[EMAIL ERROR] SMTP_PASSWORD environment variable not set.")
+        return None
+    return settings
+
+
+def build_email_message(
+    to_email: str,
+    subject: str,
+    body: str,
+    html_body: Optional[str] = None,
+    sender_email: Optional[str] = None
+) -> MIMEMultipart:
+    # Sender email (can be different from SMTP username)
+    if sender_email is None:
+        sender_email = os.getenv("SMTP_SENDER")
+        if not sender_email:
+            sender_email = get_admin_email()
+
+    # Create message
+    message = MIMEMultipart("alternative")
+    message["From"] = sender_email
+    message["To"] = to_email
+    message["Subject"] = subject
+
+    # Add plain text and HTML parts
+    text_part = MIMEText(body, "plain")
+    message.attach(text_part)
+
+    if html_body:
+        html_part = MIMEText(html_body, "html")
+        message.attach(html_part)
+    return message
+
+
+class SMTPConnection:
+    """
+    One authenticated SMTP session reused across messages (the outbox worker
+    keeps it open between batches). Connects lazily and reconnects once when
+    the server has dropped an idle connection.
+    """
+
+    def __init__(self, settings: dict, timeout: float = 30):
+        self.settings = settings
+        self.timeout = timeout
+        self._server = None
+        self.last_used = 0.0
+
+    def _connect(self):
+        server = smtplib.SMTP(self.settings["host"], self.settings["port"], timeout=self.timeout)
+        try:
+            if self.settings["starttls"]:
+                server.starttls()
+            if self.settings["auth"]:
+                server.login(self.settings["user"], self.settings["password"])
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+
+    def send(self, message):
+        if self._server is None:
+            self._connect()
+        try:
+            self._server.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self._server = None
+            self._connect()
+            self._server.send_message(message)
+        self.last_used = time.monotonic()
+
+    def close(self):
+        server, self._server = self._server, None
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                server.close()
+
+    @property
+    def connected(self) -> bool:
+        return self._server is not None
+
+
 def send_email_sync(
     to_email: str,
     subject: str,
@@ -46,54 +151,23 @@ def send_email_sync(
     sender_email: Optional[str] = None
 ) -> bool:
     """
-    Send email notification using SMTP (synchronous)
+    Send email notification using SMTP (synchronous, one connection per message)
     Returns True if email was sent successfully, False otherwise
+    Request handlers should queue mail with enqueue_email (utils/email_outbox.py) instead.
     """
     try:
-        # Get SMTP settings from environment variables (all required)
-        smtp_host = os.getenv("SMTP_HOST")
-        smtp_port_str = os.getenv("SMTP_PORT", "587")
-        smtp_port = int(smtp_port_str) if smtp_port_str else 587
-        smtp_user = os.getenv("SMTP_USER")
-        smtp_password = os.getenv("SMTP_PASSWORD")
-        
-        # Validate required SMTP settings
-        if not smtp_host:
-            print("[EMAIL ERROR] SMTP_HOST environment variable not set.")
+        settings = smtp_settings()
+        if settings is None:
             return False
-        if not smtp_user:
-            print("[EMAIL ERROR] SMTP_USER environment variable not set.")
-            return False
-        if not smtp_password:
-            print("[EMAIL ERROR] SMTP_PASSWORD environment variable not set.")
-            return False
-        
-        # Sender email (can be different from SMTP username)
-        if sender_email is None:
-            sender_email = os.getenv("SMTP_SENDER")
-            if not sender_email:
-                sender_email = get_admin_email()
-        
-        # Create message
-        message = MIMEMultipart("alternative")
-        message["From"] = sender_email
-        message["To"] = to_email
-        message["Subject"] = subject
-        
-        # Add plain text and HTML parts
-        text_part = MIMEText(body, "plain")
-        message.attach(text_part)
-        
-        if html_body:
-            html_part = MIMEText(html_body, "html")
-            message.attach(html_part)
-        
-        # Send email using smtplib (synchronous)
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_password)
-            server.send_message(message)
-        
+
+        message = build_email_message(to_email, subject, body, html_body, sender_email)
+
+        connection = SMTPConnection(settings)
+        try:
+            connection.send(message)
+        finally:
+            connection.close()
+
         print(f"[EMAIL SUCCESS] Email sent successfully to {to_email}")
         return True
         
@@ -219,7 +293,8 @@ Please log in to the dashboard to view and manage this request.
         </html>
         """
         
-        return send_email_sync(admin_email, subject, body, html_body)
+        from utils.email_outbox import enqueue_email
+        return enqueue_email(admin_email, subject, body, html_body)
         
     except Exception as e:
         print(f"[EMAIL ERROR] Error in send_schedule_visit_email: {str(e)}")
@@ -227,31 +302,23 @@ Please log in to the dashboard to view and manage this request.
         return False
 
 
-def send_self_notification_email(
-    notification_type: str,
-    title: str,
-    message: str,
-    details: Optional[dict] = None
-) -> bool:
-    """Send a self-reminder email to the admin about site notifications."""
-    try:
-        admin_email = get_admin_email()
-        
-        subject = f"🔔 Site Notification Reminder: {title}"
-        
-        details_text = ""
-        details_html = ""
-        if details:
-            details_text = "\n\nAdditional Details:\n"
-            details_html = '<div style="background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0;"><h3 style="margin-top: 0; color: #2c3e50;">Additional Details:</h3>'
-            for key, value in details.items():
-                if value is not None:
-                    key_formatted = key.replace('_', ' ').title()
-                    details_text += f"- {key_formatted}: {value}\n"
-                    details_html += f'<p><strong>{key_formatted}:</strong> {value}</p>'
-            details_html += "</div>"
-        
-        body = f"""Site Notification Reminder
+def render_self_notification(title: str, message: str, details: Optional[dict] = None) -> Tuple[str, str, str]:
+    """(subject, plain text body, HTML body) of a self-reminder email"""
+    subject = f"🔔 Site Notification Reminder: {title}"
+    
+    details_text = ""
+    details_html = ""
+    if details:
+        details_text = "\n\nAdditional Details:\n"
+        details_html = '<div style="background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0;"><h3 style="margin-top: 0; color: #2c3e50;">Additional Details:</h3>'
+        for key, value in details.items():
+            if value is not None:
+                key_formatted = key.replace('_', ' ').title()
+                details_text += f"- {key_formatted}: {value}\n"
+                details_html += f'<p><strong>{key_formatted}:</strong> {value}</p>'
+        details_html += "</div>"
+    
+    body = f"""Site Notification Reminder
 
 {title}
 
@@ -261,33 +328,95 @@ def send_self_notification_email(
 This is an automated reminder from Tirumakudalu Properties.
 Please log in to your dashboard to view and manage this notification.
 """
-        
-        html_body = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="background-color: #3498db; color: white; padding: 20px; border-radius: 5px 5px 0 0;">
-                <h1 style="margin: 0; font-size: 24px;">🔔 Site Notification Reminder</h1>
+    
+    html_body = f"""
+    <html>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+        <div style="background-color: #3498db; color: white; padding: 20px; border-radius: 5px 5px 0 0;">
+            <h1 style="margin: 0; font-size: 24px;">🔔 Site Notification Reminder</h1>
+        </div>
+        <div style="padding: 20px; background-color: #fff;">
+            <h2 style="color: #2c3e50; margin-top: 0;">{title}</h2>
+            <div style="background-color: #fff; padding: 15px; border-left: 4px solid #3498db; margin: 20px 0;">
+                <p style="white-space: pre-wrap; margin: 0;">{message}</p>
             </div>
-            <div style="padding: 20px; background-color: #fff;">
-                <h2 style="color: #2c3e50; margin-top: 0;">{title}</h2>
-                <div style="background-color: #fff; padding: 15px; border-left: 4px solid #3498db; margin: 20px 0;">
-                    <p style="white-space: pre-wrap; margin: 0;">{message}</p>
-                </div>
-                {details_html}
-                <div style="background-color: #e8f4f8; padding: 15px; border-radius: 5px; margin: 20px 0; text-align: center;">
-                    <p style="margin: 0;"><strong>Action Required:</strong> Please check your dashboard for more details.</p>
-                </div>
+            {details_html}
+            <div style="background-color: #e8f4f8; padding: 15px; border-radius: 5px; margin: 20px 0; text-align: center;">
+                <p style="margin: 0;"><strong>Action Required:</strong> Please check your dashboard for more details.</p>
             </div>
-            <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
-            <p style="color: #7f8c8d; font-size: 12px; text-align: center;">
-                This is an automated reminder from Tirumakudalu Properties.<br>
-                Please log in to your dashboard to view and manage this notification.
-            </p>
-        </body>
-        </html>
-        """
-        
-        return send_email_sync(admin_email, subject, body, html_body, sender_email=admin_email)
+        </div>
+        <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
+        <p style="color: #7f8c8d; font-size: 12px; text-align: center;">
+            This is an automated reminder from Tirumakudalu Properties.<br>
+            Please log in to your dashboard to view and manage this notification.
+        </p>
+    </body>
+    </html>
+    """
+    return subject, body, html_body
+
+
+def render_notification_digest(notifications: List[dict]) -> Tuple[str, str, str]:
+    """One email for several self-reminders; each item has title, message and details"""
+    subject = f"🔔 Site Notification Reminder: {len(notifications)} new notifications"
+    
+    sections_text = []
+    sections_html = []
+    for item in notifications:
+        details = item.get("details") or {}
+        lines = [f"- {key.replace('_', ' ').title()}: {value}" for key, value in details.items() if value is not None]
+        sections_text.append("\n".join([item.get("title", ""), item.get("message", "")] + lines))
+        rows = "".join(
+            f'<p style="margin: 2px 0;"><strong>{key.replace("_", " ").title()}:</strong> {value}</p>'
+            for key, value in details.items() if value is not None
+        )
+        sections_html.append(f"""
+            <div style="background-color: #fff; padding: 15px; border-left: 4px solid #3498db; margin: 20px 0;">
+                <h3 style="margin-top: 0; color: #2c3e50;">{item.get("title", "")}</h3>
+                <p style="white-space: pre-wrap;">{item.get("message", "")}</p>
+                {rows}
+            </div>""")
+    
+    body = "Site Notification Reminder\n\n" + "\n\n".join(sections_text) + """
+
+---
+This is an automated reminder from Tirumakudalu Properties.
+Please log in to your dashboard to view and manage these notifications.
+"""
+    
+    html_body = f"""
+    <html>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+        <div style="background-color: #3498db; color: white; padding: 20px; border-radius: 5px 5px 0 0;">
+            <h1 style="margin: 0; font-size: 24px;">🔔 {len(notifications)} Site Notifications</h1>
+        </div>
+        <div style="padding: 20px; background-color: #fff;">{"".join(sections_html)}
+        </div>
+        <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
+        <p style="color: #7f8c8d; font-size: 12px; text-align: center;">
+            This is an automated reminder from Tirumakudalu Properties.<br>
+            Please log in to your dashboard to view and manage these notifications.
+        </p>
+    </body>
+    </html>
+    """
+    return subject, body, html_body
+
+
+def send_self_notification_email(
+    notification_type: str,
+    title: str,
+    message: str,
+    details: Optional[dict] = None
+) -> bool:
+    """
+    Queue a self-reminder email to the admin about site notifications.
+    Reminders queued within EMAIL_DIGEST_WINDOW_SECONDS go out as one digest.
+    """
+    try:
+        admin_email = get_admin_email()
+        from utils.email_outbox import enqueue_self_notification
+        return enqueue_self_notification(admin_email, notification_type, title, message, details)
         
     except Exception as e:
         print(f"[SELF-NOTIFICATION ERROR] Error in send_self_notification_email: {str(e)}")
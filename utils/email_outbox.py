@@ -0,0 +1,406 @@
+"""
+Email outbox: notification emails are rows in email_outbox, and a single
+sender thread delivers them over one reused, authenticated SMTP connection.
+
+- request handlers only INSERT (enqueue_email / enqueue_self_notification)
+- failed sends are retried with exponential backoff, up to EMAIL_MAX_ATTEMPTS
+- admin self-reminders wait EMAIL_DIGEST_WINDOW_SECONDS; when the first one for an
+  address comes due, every other pending reminder for that address is claimed
+  with it and they go out as one digest email
+- rows are claimed with an UPDATE before sending, so several processes (every
+  Passenger worker, or scripts/email_outbox_worker.py) never send a row twice
+
+EMAIL_OUTBOX_WORKER=thread (default) runs the sender inside each web process
+(started by startup_tasks, so rows waiting on backoff are picked up after a restart);
+set it to "external" when scripts/email_outbox_worker.py runs as the one worker.
+For local testing point SMTP_HOST/SMTP_PORT at a stand-in such as
+`python -m aiosmtpd -n -l localhost:8025` with SMTP_STARTTLS=false and SMTP_AUTH=false.
+"""
+import atexit
+import json
+import os
+import smtplib
+import socket
+import threading
+import time
+import traceback
+import uuid
+from typing import List, Optional
+
+from database import execute_query, execute_update, execute_insert
+from utils.email import (
+    smtp_settings, build_email_message, SMTPConnection,
+    render_self_notification, render_notification_digest
+)
+
+
+EMAIL_OUTBOX_WORKER = os.getenv("EMAIL_OUTBOX_WORKER", "thread").lower()
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "20"))
+EMAIL_OUTBOX_POLL_SECONDS = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "15"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "8"))
+EMAIL_RETRY_BASE_SECONDS = int(os.getenv("EMAIL_RETRY_BASE_SECONDS", "30"))
+EMAIL_RETRY_MAX_SECONDS = int(os.getenv("EMAIL_RETRY_MAX_SECONDS", "3600"))
+EMAIL_DIGEST_WINDOW_SECONDS = int(os.getenv("EMAIL_DIGEST_WINDOW_SECONDS", "60"))
+# Close the SMTP session after this long without mail (servers drop idle sessions anyway)
+EMAIL_SMTP_IDLE_SECONDS = float(os.getenv("EMAIL_SMTP_IDLE_SECONDS", "60"))
+# A row stuck in 'sending' this long belonged to a process that died mid-send
+EMAIL_CLAIM_TIMEOUT_SECONDS = int(os.getenv("EMAIL_CLAIM_TIMEOUT_SECONDS", "600"))
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv("EMAIL_OUTBOX_RETENTION_DAYS", "7"))
+
+KIND_MESSAGE = "message"
+KIND_SELF_NOTIFICATION = "self_notification"
+
+CREATE_EMAIL_OUTBOX_TABLE = """
+    CREATE TABLE IF NOT EXISTS email_outbox (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        kind VARCHAR(30) NOT NULL DEFAULT 'message' COMMENT 'message or self_notification (digestible)',
+        to_email VARCHAR(255) NOT NULL,
+        sender_email VARCHAR(255) NULL,
+        subject VARCHAR(500) NOT NULL,
+        body MEDIUMTEXT NOT NULL,
+        html_body MEDIUMTEXT NULL,
+        payload JSON NULL COMMENT 'Self-notification title/message/details for digests',
+        status VARCHAR(20) NOT NULL DEFAULT 'pending' COMMENT 'pending, sending, sent or failed',
+        attempts INT NOT NULL DEFAULT 0,
+        next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        last_error TEXT NULL,
+        claimed_by VARCHAR(100) NULL,
+        claimed_at DATETIME NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        sent_at DATETIME NULL,
+        INDEX idx_status_next_attempt (status, next_attempt_at),
+        INDEX idx_claimed_by (claimed_by)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+
+def create_email_outbox_table():
+    execute_update(CREATE_EMAIL_OUTBOX_TABLE)
+
+
+# ==========================================================
+# PRODUCER SIDE
+# ==========================================================
+def enqueue_email(
+    to_email: str,
+    subject: str,
+    body: str,
+    html_body: Optional[str] = None,
+    sender_email: Optional[str] = None
+) -> bool:
+    """Queue one email; returns False if it could not be stored"""
+    try:
+        execute_insert(
+            """
+            INSERT INTO email_outbox (kind, to_email, sender_email, subject, body, html_body)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """,
+            (KIND_MESSAGE, to_email, sender_email, subject, body, html_body)
+        )
+    except Exception as e:
+        print(f"[EMAIL ERROR] Could not queue email to {to_email}: {str(e)}")
+        traceback.print_exc()
+        return False
+    outbox_worker.wake()
+    return True
+
+
+def enqueue_self_notification(
+    admin_email: str,
+    notification_type: str,
+    title: str,
+    message: str,
+    details: Optional[dict] = None
+) -> bool:
+    """Queue an admin self-reminder; it is held for the digest window before sending"""
+    subject, body, html_body = render_self_notification(title, message, details)
+    payload = json.dumps({
+        "notification_type": notification_type,
+        "title": title,
+        "message": message,
+        "details": details or {},
+    }, default=str)
+    try:
+        execute_insert(
+            """
+            INSERT INTO email_outbox
+            (kind, to_email, sender_email, subject, body, html_body, payload, next_attempt_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, NOW() + INTERVAL %s SECOND)
+            """,
+            (KIND_SELF_NOTIFICATION, admin_email, admin_email, subject, body, html_body, payload,
+             EMAIL_DIGEST_WINDOW_SECONDS)
+        )
+    except Exception as e:
+        print(f"[SELF-NOTIFICATION ERROR] Could not queue notification: {str(e)}")
+        traceback.print_exc()
+        return False
+    outbox_worker.wake()
+    return True
+
+
+# ==========================================================
+# SENDER SIDE
+# ==========================================================
+def _retry_delay(attempts: int) -> int:
+    return min(EMAIL_RETRY_MAX_SECONDS, EMAIL_RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+
+
+def _is_permanent(error: Exception) -> bool:
+    """5xx SMTP replies (bad recipient, rejected sender, ...) will not succeed on retry"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+
+class EmailOutboxWorker:
+    """Claims due outbox rows and sends them over one reused SMTP connection"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._connection: Optional[SMTPConnection] = None
+        self._last_purge = 0.0
+        self._counters = {
+            "sent": 0,
+            "digests": 0,
+            "retried": 0,
+            "failed": 0,
+            "batches": 0,
+        }
+        atexit.register(self.stop)
+
+    # ------------------------------------------------------------------
+    # Thread lifecycle
+    # ------------------------------------------------------------------
+    def wake(self):
+        """New mail was queued: start the in-process sender if needed and wake it"""
+        if EMAIL_OUTBOX_WORKER != "thread":
+            return
+        self._ensure_started()
+        self._wake_event.set()
+
+    def start(self):
+        """Start the in-process sender (EMAIL_OUTBOX_WORKER=thread) without waiting for new mail"""
+        if EMAIL_OUTBOX_WORKER == "thread":
+            self._ensure_started()
+
+    def _ensure_started(self):
+        # Passenger forks workers after import; start (or restart) the thread in the serving process
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._connection = None
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="email-outbox", daemon=True)
+            self._thread.start()
+
+    def run_forever(self):
+        while not self._stop_event.is_set():
+            try:
+                if self.process_due():
+                    continue  # more may be due right away
+            except Exception:
+                print("[EMAIL ERROR] Email outbox pass failed")
+                traceback.print_exc()
+            self._close_idle_connection()
+            self._wake_event.wait(EMAIL_OUTBOX_POLL_SECONDS)
+            self._wake_event.clear()
+        self._close_connection()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._thread.join(timeout)
+        if self._thread is None or not self._thread.is_alive():
+            # Foreground use (scripts/email_outbox_worker.py): nobody else closes the session
+            self._close_connection()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+        stats["mode"] = EMAIL_OUTBOX_WORKER
+        stats["running"] = self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+        stats["smtp_connected"] = self._connection is not None and self._connection.connected
+        return stats
+
+    # ------------------------------------------------------------------
+    # One pass
+    # ------------------------------------------------------------------
+    def process_due(self) -> int:
+        """Send one batch of due rows; returns how many rows were handled"""
+        self._maintain()
+        rows = self._claim(EMAIL_OUTBOX_BATCH_SIZE)
+        if not rows:
+            return 0
+
+        settings = smtp_settings()
+        if settings is None:
+            self._mark_retry(rows, "SMTP is not configured")
+            return len(rows)
+
+        # Self-reminders for the same address (claimed together by _claim) become one digest
+        digests = {}
+        for row in rows:
+            if row["kind"] == KIND_SELF_NOTIFICATION:
+                digests.setdefault(row["to_email"], []).append(row)
+            else:
+                self._deliver(settings, [row])
+        for group in digests.values():
+            self._deliver(settings, group)
+
+        with self._lock:
+            self._counters["batches"] += 1
+        return len(rows)
+
+    def _claim(self, limit: int) -> List[dict]:
+        claim_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        claimed = execute_update(
+            """
+            UPDATE email_outbox
+            SET status = 'sending', claimed_by = %s, claimed_at = NOW()
+            WHERE status = 'pending' AND next_attempt_at <= NOW()
+            ORDER BY id
+            LIMIT %s
+            """,
+            (claim_id, limit)
+        )
+        if not claimed:
+            return []
+        rows = self._claimed_rows(claim_id)
+
+        # Pull in the reminders still inside their digest window for the same addresses
+        addresses = sorted({row["to_email"] for row in rows if row["kind"] == KIND_SELF_NOTIFICATION})
+        if addresses:
+            placeholders = ", ".join(["%s"] * len(addresses))
+            joined = execute_update(
+                f"""
+                UPDATE email_outbox
+                SET status = 'sending', claimed_by = %s, claimed_at = NOW()
+                WHERE status = 'pending' AND kind = %s AND attempts = 0 AND to_email IN ({placeholders})
+                """,
+                (claim_id, KIND_SELF_NOTIFICATION, *addresses)
+            )
+            if joined:
+                rows = self._claimed_rows(claim_id)
+        return rows
+
+    def _claimed_rows(self, claim_id: str) -> List[dict]:
+        return execute_query(
+            "SELECT * FROM email_outbox WHERE claimed_by = %s AND status = 'sending' ORDER BY id",
+            (claim_id,),
+            primary=True
+        )
+
+    def _deliver(self, settings: dict, rows: List[dict]):
+        try:
+            if len(rows) > 1:
+                notifications = [json.loads(row["payload"] or "{}") for row in rows]
+                subject, body, html_body = render_notification_digest(notifications)
+            else:
+                subject, body, html_body = rows[0]["subject"], rows[0]["body"], rows[0]["html_body"]
+            message = build_email_message(rows[0]["to_email"], subject, body, html_body, rows[0]["sender_email"])
+            self._get_connection(settings).send(message)
+        except Exception as e:
+            if not _is_permanent(e):
+                # Connection state is unknown after a transport error; start a fresh session next time
+                self._close_connection()
+            print(f"[EMAIL ERROR] Failed to send outbox email to {rows[0]['to_email']}: {str(e)}")
+            self._mark_retry(rows, str(e), permanent=_is_permanent(e))
+            return
+
+        ids = [row["id"] for row in rows]
+        placeholders = ", ".join(["%s"] * len(ids))
+        execute_update(
+            f"""
+            UPDATE email_outbox
+            SET status = 'sent', sent_at = NOW(), attempts = attempts + 1, last_error = NULL, claimed_by = NULL
+            WHERE id IN ({placeholders})
+            """,
+            tuple(ids)
+        )
+        with self._lock:
+            self._counters["sent"] += len(rows)
+            if len(rows) > 1:
+                self._counters["digests"] += 1
+        print(f"[EMAIL SUCCESS] Email sent successfully to {rows[0]['to_email']}"
+              + (f" (digest of {len(rows)})" if len(rows) > 1 else ""))
+
+    def _mark_retry(self, rows: List[dict], error: str, permanent: bool = False):
+        for row in rows:
+            attempts = int(row["attempts"] or 0) + 1
+            if permanent or attempts >= EMAIL_MAX_ATTEMPTS:
+                execute_update(
+                    """
+                    UPDATE email_outbox
+                    SET status = 'failed', attempts = %s, last_error = %s, claimed_by = NULL
+                    WHERE id = %s
+                    """,
+                    (attempts, error[:2000], row["id"])
+                )
+                with self._lock:
+                    self._counters["failed"] += 1
+            else:
+                execute_update(
+                    """
+                    UPDATE email_outbox
+                    SET status = 'pending', attempts = %s, last_error = %s, claimed_by = NULL,
+                        next_attempt_at = NOW() + INTERVAL %s SECOND
+                    WHERE id = %s
+                    """,
+                    (attempts, error[:2000], _retry_delay(attempts), row["id"])
+                )
+                with self._lock:
+                    self._counters["retried"] += 1
+
+    def _maintain(self):
+        """Release rows orphaned by a dead sender; purge old sent rows about once an hour"""
+        execute_update(
+            """
+            UPDATE email_outbox SET status = 'pending', claimed_by = NULL
+            WHERE status = 'sending' AND claimed_at < NOW() - INTERVAL %s SECOND
+            """,
+            (EMAIL_CLAIM_TIMEOUT_SECONDS,)
+        )
+        if time.monotonic() - self._last_purge > 3600:
+            self._last_purge = time.monotonic()
+            execute_update(
+                "DELETE FROM email_outbox WHERE status = 'sent' AND sent_at < NOW() - INTERVAL %s DAY",
+                (EMAIL_OUTBOX_RETENTION_DAYS,)
+            )
+
+    # ------------------------------------------------------------------
+    # SMTP session
+    # ------------------------------------------------------------------
+    def _get_connection(self, settings: dict) -> SMTPConnection:
+        if self._connection is None or self._connection.settings != settings:
+            self._close_connection()
+            self._connection = SMTPConnection(settings)
+        return self._connection
+
+    def _close_idle_connection(self):
+        connection = self._connection
+        if connection is not None and time.monotonic() - connection.last_used > EMAIL_SMTP_IDLE_SECONDS:
+            self._close_connection()
+
+    def _close_connection(self):
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            connection.close()
+
+
+outbox_worker = EmailOutboxWorker()
+
+
+def start_outbox_worker():
+    outbox_worker.start()
+
+
+def get_outbox_stats() -> dict:
+    return outbox_worker.stats()
@@ -4,15 +4,20 @@ PRODUCTION-SAFE VERSION
 """
 
 import os
+import time
 import uuid
 import base64
+import threading
 import traceback
+from datetime import datetime
 from typing import List, Optional
 from pathlib import Path
 
 from flask import request, jsonify
 from schemas import PaginationParams
-from database import test_connection, execute_query
+from database import execute_query, pin_to_primary
+from utils.content_versions import get_versions, bump_versions
+from utils.schema_info import has_column
 
 
 # ==========================================================
@@ -30,6 +35,25 @@ def get_client_ip():
     return request.remote_addr
 
 
+# Reverse proxies in front of the app that append to X-Forwarded-For (cPanel/Passenger: 1)
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "1"))
+
+
+def get_proxy_client_ip():
+    """
+    Client address as recorded by our own reverse proxy, for rate limiting.
+    get_client_ip() trusts the first X-Forwarded-For entry, which the client can
+    set to anything; proxies append, so the entry TRUSTED_PROXY_HOPS from the
+    end is the one a client cannot forge.
+    """
+    forwarded_for = request.headers.get("X-Forwarded-For")
+    if forwarded_for and TRUSTED_PROXY_HOPS > 0:
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        if hops:
+            return hops[-min(TRUSTED_PROXY_HOPS, len(hops))]
+    return request.remote_addr
+
+
 # ==========================================================
 # PAGINATION
 # ==========================================================
@@ -327,15 +351,20 @@ def validate_active_session(user_email=None):
     """
     try:
         if user_email:
-            active_session_query = """
+            # user_email_lc (= LOWER(TRIM(user_email))) is indexed; older databases compare the expression
+            if has_column('user_sessions', 'user_email_lc'):
+                email_condition = "user_email_lc = LOWER(TRIM(%s))"
+            else:
+                email_condition = "LOWER(TRIM(user_email)) = LOWER(TRIM(%s))"
+            active_session_query = f"""
                 SELECT * FROM user_sessions
                 WHERE is_active = 1
                 AND expires_at > NOW()
-                AND LOWER(TRIM(user_email)) = LOWER(TRIM(%s))
+                AND {email_condition}
                 ORDER BY created_at DESC
                 LIMIT 1
             """
-            active_sessions = execute_query(active_session_query, (user_email,))
+            active_sessions = execute_query(active_session_query, (user_email,), primary=True)
         else:
             active_session_query = """
                 SELECT * FROM user_sessions
@@ -344,7 +373,7 @@ def validate_active_session(user_email=None):
                 ORDER BY created_at DESC
                 LIMIT 1
             """
-            active_sessions = execute_query(active_session_query)
+            active_sessions = execute_query(active_session_query, primary=True)
         if active_sessions and len(active_sessions) > 0:
             active_session = active_sessions[0]
             return (True, {
@@ -364,6 +393,94 @@ def validate_active_session(user_email=None):
         return (False, None)
 
 
+# ==========================================================
+# ADMIN AUTH CACHE
+# Successful admin checks (active admin user + active session) are kept per
+# worker for AUTH_CACHE_TTL_SECONDS, so admin requests skip the users and
+# user_sessions lookups. Login and logout call invalidate_admin_auth(), which
+# also bumps the "auth" content version so the other workers drop their
+# entries. There is no role-change endpoint: users/user_sessions rows changed
+# outside these routes (e.g. direct SQL) take effect after at most
+# AUTH_CACHE_TTL_SECONDS, or immediately if the change also calls
+# invalidate_admin_auth(). Failed checks are never cached.
+# ==========================================================
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+AUTH_VERSION_TAG = "auth"
+
+_auth_cache_lock = threading.Lock()
+_auth_cache = {}  # normalized email -> (cached_at, auth version, user, session_info)
+_auth_cache_counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _auth_version():
+    try:
+        return get_versions((AUTH_VERSION_TAG,))[AUTH_VERSION_TAG][0]
+    except Exception:
+        traceback.print_exc()
+        return None
+
+
+def get_cached_admin_auth(email: str):
+    """(user, session_info) from a still-valid cached admin check, else None"""
+    if AUTH_CACHE_TTL_SECONDS <= 0:
+        return None
+    version = _auth_version()
+    with _auth_cache_lock:
+        entry = _auth_cache.get(email)
+        if entry is not None:
+            cached_at, cached_version, user, session_info = entry
+            expires_at = session_info.get("expires_at")
+            if (
+                time.monotonic() - cached_at < AUTH_CACHE_TTL_SECONDS
+                and version is not None and cached_version == version
+                and (not isinstance(expires_at, datetime) or expires_at > datetime.now())
+            ):
+                _auth_cache_counters["hits"] += 1
+                return user, session_info
+            del _auth_cache[email]
+        _auth_cache_counters["misses"] += 1
+    return None
+
+
+def cache_admin_auth(email: str, user: dict, session_info: dict):
+    version = _auth_version()
+    if AUTH_CACHE_TTL_SECONDS <= 0 or version is None:
+        return
+    with _auth_cache_lock:
+        _auth_cache[email] = (time.monotonic(), version, user, session_info)
+
+
+def invalidate_admin_auth(email: Optional[str] = None):
+    """Forget cached admin checks (one email, or all) in every worker"""
+    with _auth_cache_lock:
+        if email:
+            _auth_cache.pop(email.lower().strip(), None)
+        else:
+            _auth_cache.clear()
+        _auth_cache_counters["invalidations"] += 1
+    bump_versions(AUTH_VERSION_TAG)
+
+
+def get_auth_cache_stats() -> dict:
+    with _auth_cache_lock:
+        return {"entries": len(_auth_cache), "ttl_seconds": AUTH_CACHE_TTL_SECONDS, **_auth_cache_counters}
+
+
+def fetch_auth_user(email: str) -> Optional[dict]:
+    """Active user (id, role) by normalized email, from the primary"""
+    # email_lc (= LOWER(TRIM(email))) is indexed; older databases compare the expression
+    email_column = "email_lc" if has_column('users', 'email_lc') else "LOWER(TRIM(email))"
+    user_query = f"""
+        SELECT id, role
+        FROM users
+        WHERE {email_column} = %s
+          AND is_active = 1
+        LIMIT 1
+    """
+    users = execute_query(user_query, (email,), primary=True)
+    return users[0] if users else None
+
+
 # ==========================================================
 # ADMIN AUTH DECORATOR — Role-based from DB (no email allowlist)
 # 401 = unauthenticated / session expired | 403 = forbidden (not admin)
@@ -386,35 +503,30 @@ def require_admin_auth(f):
         auth_email = auth_email.lower().strip()
 
         try:
-            if not test_connection().get("connected"):
-                return error_response("Database unavailable", 500)
-
-            # Look up user by email only; role check is below (403 if not admin)
-            user_query = """
-                SELECT id, role
-                FROM users
-                WHERE LOWER(TRIM(email)) = %s
-                  AND is_active = 1
-                LIMIT 1
-            """
-            users = execute_query(user_query, (auth_email,))
-            if not users:
-                print("AUTH CHECK FAIL: user not in DB or inactive", "auth_email:", auth_email)
-                return error_response("Unauthorized", 401)
-
-            if (users[0].get("role") or "").lower().strip() != "admin":
-                print("AUTH CHECK FAIL: user is not admin (403)", "auth_email:", auth_email, "role:", users[0].get("role"))
-                return error_response("Forbidden. Admin access required.", 403)
-
-            has_active_session, session_info = validate_active_session(auth_email)
-            if not has_active_session:
-                print("AUTH CHECK FAIL: no active session", "auth_email:", auth_email)
-                return error_response("Session expired. Please log in again.", 401)
-            print("AUTH CHECK OK:", auth_email)
+            if get_cached_admin_auth(auth_email) is None:
+                # Look up user by email only; role check is below (403 if not admin)
+                user = fetch_auth_user(auth_email)
+                if not user:
+                    print("AUTH CHECK FAIL: user not in DB or inactive", "auth_email:", auth_email)
+                    return error_response("Unauthorized", 401)
+
+                if (user.get("role") or "").lower().strip() != "admin":
+                    print("AUTH CHECK FAIL: user is not admin (403)", "auth_email:", auth_email, "role:", user.get("role"))
+                    return error_response("Forbidden. Admin access required.", 403)
+
+                has_active_session, session_info = validate_active_session(auth_email)
+                if not has_active_session:
+                    print("AUTH CHECK FAIL: no active session", "auth_email:", auth_email)
+                    return error_response("Session expired. Please log in again.", 401)
+                cache_admin_auth(auth_email, user, session_info)
+                print("AUTH CHECK OK:", auth_email)
+            # Admin pages read back what admins just edited: keep them off the replicas
+            pin_to_primary()
 
         except Exception:
+            # No per-request connection probe any more: a failing lookup means the DB is unavailable
             traceback.print_exc()
-            return error_response("Unauthorized", 401)
+            return error_response("Database unavailable", 500)
 
         return f(*args, **kwargs)
 
@@ -0,0 +1,109 @@
+"""
+Periodically refreshed index of property ids that exist in more than one
+property table. The three tables have independent AUTO_INCREMENT ids, so a
+collision is a data-integrity problem (see scripts/cleanup_id_collisions.py),
+but it is rare. Detecting it once per interval with a single join query means
+the detail endpoint only has to read the requested category's table.
+"""
+import os
+import threading
+import time
+import traceback
+from itertools import combinations
+from typing import Dict, List, Optional
+
+from database import execute_query
+from utils.property_queries import PROPERTY_TABLES
+from utils.schema_info import has_table
+
+
+ID_COLLISION_CHECK_SECONDS = float(os.getenv("ID_COLLISION_CHECK_SECONDS", "300"))
+
+# Order in which colliding tables are reported
+CATEGORY_ORDER = ('commercial', 'residential', 'plot')
+
+
+def collision_query() -> Optional[str]:
+    """
+    Primary-key joins (each side an index lookup) between every pair of property
+    tables that exist; None when fewer than two do
+    """
+    categories = [c for c in CATEGORY_ORDER if has_table(PROPERTY_TABLES[c])]
+    branches = [
+        f"SELECT a.id as id, '{first}' as first_category, '{second}' as second_category "
+        f"FROM {PROPERTY_TABLES[first]} a INNER JOIN {PROPERTY_TABLES[second]} b ON b.id = a.id"
+        for first, second in combinations(categories, 2)
+    ]
+    return "\nUNION ALL\n".join(branches) if branches else None
+
+
+_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_collisions: Dict[int, List[str]] = {}
+_checked_at = 0.0
+_loaded = False
+
+
+def _load_collisions() -> Dict[int, List[str]]:
+    query = collision_query()
+    if query is None:
+        return {}
+    collisions = {}
+    for row in execute_query(query):
+        categories = collisions.setdefault(int(row['id']), set())
+        categories.add(row['first_category'])
+        categories.add(row['second_category'])
+    return {
+        property_id: [c for c in CATEGORY_ORDER if c in categories]
+        for property_id, categories in collisions.items()
+    }
+
+
+def refresh_collision_index():
+    """Re-run the collision query; keeps the previous snapshot if it fails"""
+    global _collisions, _checked_at, _loaded
+    try:
+        collisions = _load_collisions()
+    except Exception:
+        print("Warning: Could not refresh property id collision index")
+        traceback.print_exc()
+        with _lock:
+            # Retry after the next interval instead of on every request
+            _checked_at = time.monotonic()
+        return
+    if collisions:
+        print(f"WARNING: {len(collisions)} property id(s) exist in multiple tables: {sorted(collisions)[:20]}")
+    with _lock:
+        _collisions = collisions
+        _checked_at = time.monotonic()
+        _loaded = True
+
+
+def _ensure_fresh():
+    if time.monotonic() - _checked_at <= ID_COLLISION_CHECK_SECONDS:
+        return
+    if _loaded:
+        # Another thread is already refreshing: keep answering from the current snapshot
+        if not _refresh_lock.acquire(blocking=False):
+            return
+    else:
+        _refresh_lock.acquire()
+    try:
+        if time.monotonic() - _checked_at > ID_COLLISION_CHECK_SECONDS:
+            refresh_collision_index()
+    finally:
+        _refresh_lock.release()
+
+
+def get_collision(property_id: int) -> Optional[List[str]]:
+    """Categories whose table contains property_id, when it is in more than one; None otherwise"""
+    _ensure_fresh()
+    with _lock:
+        return _collisions.get(int(property_id))
+
+
+def mark_collision_index_stale():
+    """Re-check on the next lookup (called after property writes in this worker)"""
+    global _checked_at
+    with _lock:
+        _checked_at = 0.0
@@ -0,0 +1,288 @@
+"""
+Storage and serving of images behind /api/images/<id>.
+New uploads are written to the content-addressed blob store (utils/blob_store.py)
+and the images row only keeps metadata (storage backend, sha256, size).
+Rows from the old LONGBLOB layout (storage = 'db') are copied to
+IMAGE_CACHE_DIR in fixed-size chunks (SUBSTRING reads, never the whole blob in
+memory) on first request. Images are immutable once uploaded, so an image id
+always maps to the same content hash.
+Uploads are spooled to a temp file in chunks and typed by magic bytes.
+
+Cache layout:
+    <IMAGE_CACHE_DIR>/blobs/<sha[:2]>/<sha>   bytes of storage = 'db' images
+    <IMAGE_CACHE_DIR>/ids/<image_id>.json     {"sha256", "content_type", "size", "storage"}
+"""
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple
+
+from config import IMAGE_CACHE_DIR
+from database import get_db_cursor, execute_insert
+from utils.blob_store import get_blob_store
+
+
+BLOB_CHUNK_SIZE = int(os.getenv("IMAGE_BLOB_CHUNK_SIZE", str(256 * 1024)))
+MAX_IMAGE_UPLOAD_BYTES = int(os.getenv("MAX_IMAGE_UPLOAD_MB", "15")) * 1024 * 1024
+# Uploads up to this size stay in memory while spooling; larger ones go to a temp file
+UPLOAD_SPOOL_MEMORY_BYTES = 1024 * 1024
+
+# images.storage value for rows whose bytes are still in the LONGBLOB column
+DB_STORAGE = "db"
+
+# Magic bytes -> MIME type; the client-declared content type is not trusted
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+# Fixed set of locks shared by image ids (id % stripes), so first-request copies of
+# one image are serialized without keeping a lock per requested id
+FETCH_LOCK_STRIPES = 64
+_fetch_locks = tuple(threading.Lock() for _ in range(FETCH_LOCK_STRIPES))
+
+
+class ImageNotFound(Exception):
+    """No row (or an empty blob) for the requested image id"""
+
+
+class InvalidImageUpload(ValueError):
+    """Upload is empty, too large or not a supported image type"""
+
+
+def blob_path(sha256: str) -> Path:
+    return IMAGE_CACHE_DIR / "blobs" / sha256[:2] / sha256
+
+
+def _meta_path(image_id: int) -> Path:
+    return IMAGE_CACHE_DIR / "ids" / f"{int(image_id)}.json"
+
+
+def _atomic_write_json(path: Path, payload: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_name, path)
+    except Exception:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def _write_meta(image_id: int, sha256: str, content_type: str, size: int, storage: str):
+    _atomic_write_json(_meta_path(image_id), {
+        "sha256": sha256, "content_type": content_type, "size": size, "storage": storage,
+    })
+
+
+def _serving_path(sha256: str, storage: str) -> Path:
+    """Where the bytes of an image are read from on disk"""
+    if storage != DB_STORAGE:
+        path = get_blob_store().local_path(sha256)
+        if path is not None:
+            return path
+    return blob_path(sha256)
+
+
+def get_cached_image(image_id: int) -> Optional[Tuple[Path, str, str]]:
+    """(path, sha256, content_type) if the image can be served from disk without MySQL"""
+    try:
+        with open(_meta_path(image_id)) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    path = _serving_path(meta["sha256"], meta.get("storage", DB_STORAGE))
+    if not path.exists():
+        return None
+    return path, meta["sha256"], meta["content_type"]
+
+
+def _image_lock(image_id: int) -> threading.Lock:
+    return _fetch_locks[int(image_id) % FETCH_LOCK_STRIPES]
+
+
+def copy_db_blob(cursor, image_id: int, size: int, target: BinaryIO) -> str:
+    """Copy images.data to target in BLOB_CHUNK_SIZE pieces; returns the SHA-256"""
+    digest = hashlib.sha256()
+    # SUBSTRING is 1-based
+    for offset in range(1, size + 1, BLOB_CHUNK_SIZE):
+        cursor.execute(
+            "SELECT SUBSTRING(data, %s, %s) FROM images WHERE id = %s",
+            (offset, BLOB_CHUNK_SIZE, image_id)
+        )
+        chunk = cursor.fetchone()[0]
+        digest.update(chunk)
+        target.write(chunk)
+    return digest.hexdigest()
+
+
+def _cache_from_blob_store(sha256: str, path: Path):
+    """Copy a blob from a non-local store backend into the disk cache"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f, get_blob_store().open(sha256) as source:
+            shutil.copyfileobj(source, f, BLOB_CHUNK_SIZE)
+        os.replace(tmp_name, path)
+    except Exception:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def cache_image_from_db(image_id: int) -> Tuple[Path, str, str]:
+    """Resolve an images row to a file on disk, copying LONGBLOB bytes to the cache when needed"""
+    with get_db_cursor(commit=False) as cursor:
+        cursor.execute(
+            "SELECT content_type, storage, sha256, size_bytes, LENGTH(data) FROM images WHERE id = %s",
+            (image_id,)
+        )
+        row = cursor.fetchone()
+        # A missing image is not a database error: leave the cursor block before raising
+        # ImageNotFound so get_db_cursor does not log a traceback for every 404
+        if not row:
+            content_type = storage = sha256 = size_bytes = db_size = None
+        else:
+            content_type, storage, sha256, size_bytes, db_size = row
+
+        if storage != DB_STORAGE and sha256:
+            path = _serving_path(sha256, storage)
+            if not path.exists():
+                _cache_from_blob_store(sha256, path)
+            try:
+                _write_meta(image_id, sha256, content_type, int(size_bytes or 0), storage)
+            except OSError as e:
+                print(f"Warning: Could not cache metadata of image {image_id}: {str(e)}")
+            return path, sha256, content_type
+
+        if db_size:
+            size = int(db_size)
+            tmp_dir = IMAGE_CACHE_DIR / "blobs"
+            tmp_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=str(tmp_dir), prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    sha256 = copy_db_blob(cursor, image_id, size, f)
+                path = blob_path(sha256)
+                if path.exists():
+                    os.unlink(tmp_name)
+                else:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(tmp_name, path)
+            except Exception:
+                if os.path.exists(tmp_name):
+                    os.unlink(tmp_name)
+                raise
+
+    if not db_size:
+        raise ImageNotFound(image_id)
+    _write_meta(image_id, sha256, content_type, size, DB_STORAGE)
+    return path, sha256, content_type
+
+
+def get_image_file(image_id: int) -> Tuple[Path, str, str]:
+    """Disk path, content hash and MIME type of an image, resolving it from MySQL on first use"""
+    cached = get_cached_image(image_id)
+    if cached is not None:
+        return cached
+    with _image_lock(image_id):
+        cached = get_cached_image(image_id)
+        if cached is not None:
+            return cached
+        return cache_image_from_db(image_id)
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """MIME type from the first bytes of a file, None if it is not a supported image"""
+    for signature, content_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if len(head) >= 12 and head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def spool_upload(stream: BinaryIO) -> Tuple[tempfile.SpooledTemporaryFile, int, str, str]:
+    """
+    Copy an upload stream into a spooled temp file in chunks, hashing as it goes.
+    Returns (file, size, sha256, content_type); the caller closes the file.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MEMORY_BYTES)
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    try:
+        while True:
+            chunk = stream.read(BLOB_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > MAX_IMAGE_UPLOAD_BYTES:
+                raise InvalidImageUpload(
+                    f"Image is larger than {MAX_IMAGE_UPLOAD_BYTES // (1024 * 1024)} MB"
+                )
+            if len(head) < 16:
+                head += chunk[:16 - len(head)]
+            digest.update(chunk)
+            spool.write(chunk)
+        if size == 0:
+            raise InvalidImageUpload("Image data is empty")
+        content_type = sniff_image_type(head)
+        if content_type is None:
+            raise InvalidImageUpload("Unsupported image type (expected JPEG, PNG, GIF or WebP)")
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, size, digest.hexdigest(), content_type
+
+
+def store_image(fileobj: BinaryIO, size: int, sha256: str, content_type: str) -> dict:
+    """
+    Write image bytes to the blob store (deduplicated by hash) and record the
+    images row. Returns {"image_id", "image_url", "content_type", "size"}.
+    """
+    store = get_blob_store()
+    fileobj.seek(0)
+    store.put_file(fileobj, sha256)
+    image_id = execute_insert(
+        "INSERT INTO images (data, content_type, storage, sha256, size_bytes) VALUES (NULL, %s, %s, %s, %s)",
+        (content_type, store.name, sha256, size)
+    )
+    if not image_id:
+        raise RuntimeError("Failed to save image to database")
+    try:
+        _write_meta(image_id, sha256, content_type, size, store.name)
+    except OSError as e:
+        # Not fatal: the first GET resolves the row from the database
+        print(f"Warning: Could not cache metadata of image {image_id}: {str(e)}")
+    return {
+        "image_id": image_id,
+        "image_url": f"/api/images/{image_id}",
+        "content_type": content_type,
+        "size": size,
+    }
+
+
+def save_uploaded_image(stream: BinaryIO) -> dict:
+    """Spool + validate one uploaded image stream, then store it"""
+    spool, size, sha256, content_type = spool_upload(stream)
+    try:
+        return store_image(spool, size, sha256, content_type)
+    finally:
+        spool.close()
+
+
+def save_image_bytes(image_data: bytes, content_type: str) -> dict:
+    """Store already-decoded image bytes (legacy base64 upload) with the declared content type"""
+    sha256 = hashlib.sha256(image_data).hexdigest()
+    return store_image(io.BytesIO(image_data), len(image_data), sha256, content_type)
@@ -0,0 +1,130 @@
+"""
+Resized variants of cached images for /api/images/<id>?w=<width>.
+Requested widths are rounded up to a fixed set of buckets so each image has a
+handful of variants at most. Variants are generated lazily with Pillow on first
+request (WebP when the client accepts it, JPEG otherwise) and stored next to the
+original in the disk cache, keyed by the original's SHA-256.
+Pillow is optional: without it the original image is served.
+"""
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+from config import IMAGE_CACHE_DIR
+
+# Pillow is optional; variants are skipped when it is not installed
+try:
+    from PIL import Image, ImageOps
+    _pil_available = True
+except ImportError:
+    _pil_available = False
+    Image = None
+    ImageOps = None
+
+
+VARIANT_WIDTHS = (160, 320, 640, 960, 1280, 1920)
+VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "80"))
+# Width used for listing card thumbnails
+THUMBNAIL_WIDTH = 320
+
+VARIANT_FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+
+# Fixed set of locks shared by (sha256, width, format) keys, so concurrent renders of one
+# variant are serialized without keeping a lock per variant ever served
+VARIANT_LOCK_STRIPES = 64
+_variant_locks = tuple(threading.Lock() for _ in range(VARIANT_LOCK_STRIPES))
+
+
+def variant_width(requested: int) -> int:
+    """Smallest bucket that is at least the requested width (largest bucket as a cap)"""
+    for width in VARIANT_WIDTHS:
+        if requested <= width:
+            return width
+    return VARIANT_WIDTHS[-1]
+
+
+def pick_format(accept_header: Optional[str]) -> str:
+    return 'webp' if accept_header and 'image/webp' in accept_header else 'jpeg'
+
+
+def thumbnail_url(image_url: Optional[str]) -> Optional[str]:
+    """Thumbnail variant URL for database-served images, None for anything else"""
+    if not image_url or not image_url.startswith("/api/images/") or "?" in image_url:
+        return None
+    return f"{image_url}?w={THUMBNAIL_WIDTH}"
+
+
+def variant_path(sha256: str, width: int, fmt: str) -> Path:
+    return IMAGE_CACHE_DIR / "variants" / sha256[:2] / sha256 / f"{width}.{fmt}"
+
+
+def _variant_lock(key: tuple) -> threading.Lock:
+    return _variant_locks[hash(key) % VARIANT_LOCK_STRIPES]
+
+
+def _render_variant(source_path: Path, width: int, fmt: str, target: Path) -> bool:
+    """Resize source into target; False when the original should be served instead"""
+    pil_format = VARIANT_FORMATS[fmt][0]
+    with Image.open(source_path) as img:
+        if getattr(img, "is_animated", False) or img.width <= width:
+            return False
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((width, img.height * width // img.width + 1), Image.LANCZOS)
+
+        if pil_format == 'JPEG':
+            if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+                # JPEG has no alpha channel: flatten onto white
+                rgba = img.convert('RGBA')
+                background = Image.new('RGB', rgba.size, (255, 255, 255))
+                background.paste(rgba, mask=rgba.split()[-1])
+                img = background
+            elif img.mode != 'RGB':
+                img = img.convert('RGB')
+        elif img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=str(target.parent), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                img.save(f, pil_format, quality=VARIANT_QUALITY, optimize=True)
+            os.replace(tmp_name, target)
+        except Exception:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+    return True
+
+
+def get_variant_file(source_path: Path, sha256: str, requested_width: int,
+                     accept_header: Optional[str]) -> Optional[Tuple[Path, str, str]]:
+    """
+    (path, content_type, etag) of the resized variant, or None when the original
+    should be served (Pillow missing, image already small enough, not decodable).
+    """
+    if not _pil_available:
+        return None
+    width = variant_width(requested_width)
+    fmt = pick_format(accept_header)
+    path = variant_path(sha256, width, fmt)
+    content_type = VARIANT_FORMATS[fmt][1]
+    etag = f"{sha256}-w{width}.{fmt}"
+    if path.exists():
+        return path, content_type, etag
+
+    with _variant_lock((sha256, width, fmt)):
+        if path.exists():
+            return path, content_type, etag
+        try:
+            if not _render_variant(source_path, width, fmt, path):
+                return None
+        except Exception as e:
+            # Undecodable or oversized images: serve the original
+            print(f"Warning: Could not create {width}px {fmt} variant of image {sha256}: {str(e)}")
+            return None
+    return path, content_type, etag
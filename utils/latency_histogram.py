@@ -0,0 +1,71 @@
+"""
+Fixed log-linear latency bins shared by the metrics rollups.
+Every power of two (in ms) is split into SUB_BUCKETS equal sub-buckets, so a
+bin's width is at most 1/SUB_BUCKETS of its value. Counts per bin can be summed
+across endpoints and time buckets without losing that precision.
+"""
+import math
+
+
+SUB_BUCKETS = 8
+# Highest power of two with its own bins (2^17 ms ~ 131 s); slower requests go to the last bin
+MAX_EXPONENT = 17
+BIN_COUNT = 1 + (MAX_EXPONENT + 1) * SUB_BUCKETS
+
+
+def latency_bin(response_time_ms: float) -> int:
+    """Bin index for one response time; bin 0 holds everything under 1 ms"""
+    if response_time_ms is None or response_time_ms < 1:
+        return 0
+    exponent = int(math.floor(math.log2(response_time_ms)))
+    if exponent > MAX_EXPONENT:
+        return BIN_COUNT - 1
+    sub_bucket = int((response_time_ms / (2 ** exponent) - 1) * SUB_BUCKETS)
+    return 1 + exponent * SUB_BUCKETS + min(sub_bucket, SUB_BUCKETS - 1)
+
+
+def bin_bounds(bin_index: int):
+    """(lower, upper) response time in ms covered by a bin"""
+    if bin_index <= 0:
+        return 0.0, 1.0
+    exponent, sub_bucket = divmod(bin_index - 1, SUB_BUCKETS)
+    base = 2 ** exponent
+    return base * (1 + sub_bucket / SUB_BUCKETS), base * (1 + (sub_bucket + 1) / SUB_BUCKETS)
+
+
+def latency_bin_sql(column: str) -> str:
+    """SQL expression equivalent to latency_bin() (used to backfill from raw rows)"""
+    return (
+        f"CASE WHEN {column} < 1 THEN 0 "
+        f"WHEN {column} >= {2 ** (MAX_EXPONENT + 1)} THEN {BIN_COUNT - 1} "
+        f"ELSE 1 + FLOOR(LOG2({column})) * {SUB_BUCKETS} "
+        f"+ LEAST(FLOOR(({column} / POW(2, FLOOR(LOG2({column}))) - 1) * {SUB_BUCKETS}), {SUB_BUCKETS - 1}) END"
+    )
+
+
+DEFAULT_QUANTILES = (50, 90, 95, 99)
+
+
+def percentiles(counts, quantiles=DEFAULT_QUANTILES) -> dict:
+    """
+    Estimate percentiles from {bin: count}, interpolating linearly inside the bin.
+    Returns {"p50": ms, ...}; values are None when the histogram is empty.
+    """
+    # SUM(request_count) comes back from MySQL as Decimal; normalise before mixing with floats
+    ordered = sorted((int(b), int(c)) for b, c in counts.items() if c)
+    total = sum(count for _, count in ordered)
+    result = {f"p{q}": None for q in quantiles}
+    if total <= 0:
+        return result
+
+    for q in quantiles:
+        rank = total * q / 100.0
+        seen = 0
+        for bin_index, count in ordered:
+            if seen + count >= rank:
+                lower, upper = bin_bounds(bin_index)
+                fraction = (rank - seen) / count if count else 0
+                result[f"p{q}"] = round(lower + (upper - lower) * fraction, 2)
+                break
+            seen += count
+    return result
@@ -0,0 +1,57 @@
+"""
+Frontend event ingestion for POST /api/logs.
+Events are queued in memory and written to logs in multi-row batches by a
+background flusher (utils/batch_writer.py), so page views cost no database
+round trip on the request path. High-volume page_view events can be sampled
+with LOGS_PAGE_VIEW_SAMPLE_RATE (1.0 = keep all, 0.1 = keep one in ten).
+"""
+import os
+import random
+import threading
+from datetime import datetime
+
+from utils.batch_writer import BatchWriter
+
+
+LOGS_PAGE_VIEW_SAMPLE_RATE = min(1.0, max(0.0, float(os.getenv("LOGS_PAGE_VIEW_SAMPLE_RATE", "1.0"))))
+# Most events accepted from one request (JSON array body)
+LOGS_MAX_EVENTS_PER_REQUEST = int(os.getenv("LOGS_MAX_EVENTS_PER_REQUEST", "100"))
+
+INSERT_LOG_QUERY = """
+    INSERT INTO logs
+    (log_type, action, description, user_email, ip_address, user_agent, metadata, created_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+logs_writer = BatchWriter(
+    "logs",
+    INSERT_LOG_QUERY,
+    max_queue_size=int(os.getenv("LOGS_QUEUE_SIZE", "10000")),
+    batch_size=int(os.getenv("LOGS_BATCH_SIZE", "200")),
+    flush_interval_ms=int(os.getenv("LOGS_FLUSH_INTERVAL_MS", "2000"))
+)
+
+_sample_lock = threading.Lock()
+_sampled_out = 0
+
+
+def record_log(log_type, action, description, user_email, ip_address, user_agent, metadata_json) -> bool:
+    """Queue one log row; returns False if it was sampled out or dropped (queue full)"""
+    global _sampled_out
+    if action == 'page_view' and LOGS_PAGE_VIEW_SAMPLE_RATE < 1.0 and random.random() >= LOGS_PAGE_VIEW_SAMPLE_RATE:
+        with _sample_lock:
+            _sampled_out += 1
+        return False
+    # created_at is taken now: the row reaches the table up to one flush interval later
+    return logs_writer.submit((
+        log_type, action, description, user_email, ip_address, user_agent, metadata_json, datetime.now()
+    ))
+
+
+def get_log_pipeline_stats() -> dict:
+    """Queue depth, enqueue/drop/write counters and sampling for the admin metrics endpoint"""
+    stats = logs_writer.stats()
+    with _sample_lock:
+        stats["sampled_out"] = _sampled_out
+    stats["page_view_sample_rate"] = LOGS_PAGE_VIEW_SAMPLE_RATE
+    return stats
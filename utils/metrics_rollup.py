@@ -0,0 +1,330 @@
+"""
+Incremental rollups of application_metrics.
+Each flushed batch of request metrics is folded into per-minute and per-hour
+buckets keyed by (endpoint, method), plus a latency histogram per bucket, so the
+admin dashboard reads O(buckets) rows instead of scanning raw requests.
+Raw rows and old buckets are pruned by a retention pass run from the flusher.
+All metric times are UTC: rows are stamped with datetime.utcnow() and the SQL
+windows compare against UTC_TIMESTAMP(), never the server's local clock.
+"""
+import os
+import threading
+import time
+import traceback
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from database import execute_query, execute_update, get_db_cursor
+from utils.latency_histogram import latency_bin, latency_bin_sql, percentiles
+
+
+# granularity -> DATE_FORMAT pattern of the bucket start
+GRANULARITIES = {
+    'minute': '%Y-%m-%d %H:%i:00',
+    'hour': '%Y-%m-%d %H:00:00',
+}
+# Same bucket starts as strftime formats (buckets of flushed rows are taken from their request time)
+BUCKET_FORMATS = {
+    'minute': '%Y-%m-%d %H:%M:00',
+    'hour': '%Y-%m-%d %H:00:00',
+}
+
+RAW_RETENTION_DAYS = int(os.getenv("METRICS_RAW_RETENTION_DAYS", "14"))
+MINUTE_RETENTION_HOURS = int(os.getenv("METRICS_MINUTE_RETENTION_HOURS", "48"))
+HOUR_RETENTION_DAYS = int(os.getenv("METRICS_HOUR_RETENTION_DAYS", "90"))
+PRUNE_INTERVAL_SECONDS = int(os.getenv("METRICS_PRUNE_INTERVAL_MINUTES", "60")) * 60
+PRUNE_CHUNK_SIZE = 5000
+
+CREATE_ROLLUP_TABLE = """
+    CREATE TABLE IF NOT EXISTS application_metrics_rollup (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        granularity VARCHAR(10) NOT NULL COMMENT 'minute or hour',
+        bucket_start DATETIME NOT NULL COMMENT 'Start of the time bucket (UTC)',
+        endpoint VARCHAR(255) NOT NULL COMMENT 'API endpoint path',
+        method VARCHAR(10) NOT NULL COMMENT 'HTTP method',
+        request_count INT NOT NULL DEFAULT 0,
+        total_response_time_ms DECIMAL(16, 2) NOT NULL DEFAULT 0,
+        min_response_time_ms DECIMAL(10, 2) NOT NULL DEFAULT 0,
+        max_response_time_ms DECIMAL(10, 2) NOT NULL DEFAULT 0,
+        error_count INT NOT NULL DEFAULT 0,
+        success_count INT NOT NULL DEFAULT 0,
+        client_error_count INT NOT NULL DEFAULT 0,
+        server_error_count INT NOT NULL DEFAULT 0,
+        UNIQUE KEY uniq_bucket_endpoint (granularity, bucket_start, endpoint, method),
+        INDEX idx_granularity_bucket (granularity, bucket_start)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+CREATE_HISTOGRAM_TABLE = """
+    CREATE TABLE IF NOT EXISTS application_metrics_latency_histogram (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        granularity VARCHAR(10) NOT NULL COMMENT 'minute or hour',
+        bucket_start DATETIME NOT NULL COMMENT 'Start of the time bucket (UTC)',
+        endpoint VARCHAR(255) NOT NULL COMMENT 'API endpoint path',
+        method VARCHAR(10) NOT NULL COMMENT 'HTTP method',
+        latency_bin SMALLINT NOT NULL COMMENT 'Bin index from utils.latency_histogram',
+        request_count INT NOT NULL DEFAULT 0,
+        UNIQUE KEY uniq_bucket_endpoint_bin (granularity, bucket_start, endpoint, method, latency_bin),
+        INDEX idx_granularity_bucket (granularity, bucket_start)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+ROLLUP_COLUMNS = """
+    (granularity, bucket_start, endpoint, method, request_count, total_response_time_ms,
+     min_response_time_ms, max_response_time_ms, error_count, success_count,
+     client_error_count, server_error_count)
+"""
+
+ROLLUP_ON_DUPLICATE = """
+    ON DUPLICATE KEY UPDATE
+        request_count = request_count + VALUES(request_count),
+        total_response_time_ms = total_response_time_ms + VALUES(total_response_time_ms),
+        min_response_time_ms = LEAST(min_response_time_ms, VALUES(min_response_time_ms)),
+        max_response_time_ms = GREATEST(max_response_time_ms, VALUES(max_response_time_ms)),
+        error_count = error_count + VALUES(error_count),
+        success_count = success_count + VALUES(success_count),
+        client_error_count = client_error_count + VALUES(client_error_count),
+        server_error_count = server_error_count + VALUES(server_error_count)
+"""
+
+HISTOGRAM_ON_DUPLICATE = """
+    ON DUPLICATE KEY UPDATE request_count = request_count + VALUES(request_count)
+"""
+
+_prune_lock = threading.Lock()
+_last_prune = 0.0
+
+
+def create_rollup_tables():
+    """Create rollup tables and seed them from existing raw rows on first run"""
+    execute_update(CREATE_ROLLUP_TABLE)
+    execute_update(CREATE_HISTOGRAM_TABLE)
+    existing = execute_query("SELECT 1 as found FROM application_metrics_rollup LIMIT 1")
+    if not existing:
+        backfill_rollups()
+
+
+def backfill_rollups():
+    """
+    Aggregate the raw rows still within retention into empty rollup tables.
+    INSERT IGNORE keeps this safe when several workers start at the same time.
+    """
+    windows = {
+        'minute': f"INTERVAL {MINUTE_RETENTION_HOURS} HOUR",
+        'hour': f"INTERVAL {RAW_RETENTION_DAYS} DAY",
+    }
+    for granularity, pattern in GRANULARITIES.items():
+        execute_update(f"""
+            INSERT IGNORE INTO application_metrics_rollup {ROLLUP_COLUMNS}
+            SELECT
+                %s, DATE_FORMAT(created_at, %s) as bucket, endpoint, method,
+                COUNT(*), SUM(response_time_ms), MIN(response_time_ms), MAX(response_time_ms),
+                SUM(CASE WHEN is_error = 1 THEN 1 ELSE 0 END),
+                SUM(CASE WHEN status_code >= 200 AND status_code < 300 THEN 1 ELSE 0 END),
+                SUM(CASE WHEN status_code >= 400 THEN 1 ELSE 0 END),
+                SUM(CASE WHEN status_code >= 500 THEN 1 ELSE 0 END)
+            FROM application_metrics
+            WHERE created_at >= DATE_SUB(UTC_TIMESTAMP(), {windows[granularity]})
+            GROUP BY bucket, endpoint, method
+        """, (granularity, pattern))
+        execute_update(f"""
+            INSERT IGNORE INTO application_metrics_latency_histogram
+            (granularity, bucket_start, endpoint, method, latency_bin, request_count)
+            SELECT %s, DATE_FORMAT(created_at, %s) as bucket, endpoint, method,
+                   {latency_bin_sql('response_time_ms')} as bin, COUNT(*)
+            FROM application_metrics
+            WHERE created_at >= DATE_SUB(UTC_TIMESTAMP(), {windows[granularity]})
+            GROUP BY bucket, endpoint, method, bin
+        """, (granularity, pattern))
+    print("Application metrics rollups backfilled from raw rows")
+
+
+def summarize_batch(batch: List[tuple]) -> Tuple[Dict[tuple, dict], Dict[tuple, int]]:
+    """
+    Fold metric rows (endpoint, method, response_time_ms, status_code, is_error, ip, user_agent,
+    created_at) into per-(granularity, bucket_start, endpoint, method) aggregates and
+    per-(granularity, bucket_start, endpoint, method, bin) counts. Rows are bucketed by
+    their request time, not by when the batch is flushed.
+    """
+    aggregates = {}
+    histogram = {}
+    for row in batch:
+        endpoint, method, response_time_ms, status_code, is_error = row[:5]
+        created_at = row[7] if len(row) > 7 and row[7] is not None else datetime.utcnow()
+        response_time_ms = float(response_time_ms or 0)
+        bin_index = latency_bin(response_time_ms)
+        for granularity, bucket_format in BUCKET_FORMATS.items():
+            key = (granularity, created_at.strftime(bucket_format), endpoint, method)
+            agg = aggregates.get(key)
+            if agg is None:
+                agg = aggregates[key] = {
+                    'count': 0, 'total': 0.0, 'min': response_time_ms, 'max': response_time_ms,
+                    'errors': 0, 'success': 0, 'client_errors': 0, 'server_errors': 0,
+                }
+            agg['count'] += 1
+            agg['total'] += response_time_ms
+            agg['min'] = min(agg['min'], response_time_ms)
+            agg['max'] = max(agg['max'], response_time_ms)
+            if is_error:
+                agg['errors'] += 1
+            if 200 <= status_code < 300:
+                agg['success'] += 1
+            if status_code >= 400:
+                agg['client_errors'] += 1
+            if status_code >= 500:
+                agg['server_errors'] += 1
+
+            bin_key = key + (bin_index,)
+            histogram[bin_key] = histogram.get(bin_key, 0) + 1
+    return aggregates, histogram
+
+
+def apply_rollups(batch: List[tuple]):
+    """BatchWriter on_flush hook: add a flushed batch to the minute and hour buckets of its requests"""
+    aggregates, histogram = summarize_batch(batch)
+    if not aggregates:
+        return
+
+    rollup_values = []
+    rollup_params = []
+    for (granularity, bucket_start, endpoint, method), agg in aggregates.items():
+        rollup_values.append("(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)")
+        rollup_params.extend([
+            granularity, bucket_start, endpoint, method, agg['count'], round(agg['total'], 2),
+            round(agg['min'], 2), round(agg['max'], 2), agg['errors'], agg['success'],
+            agg['client_errors'], agg['server_errors'],
+        ])
+    histogram_values = []
+    histogram_params = []
+    for (granularity, bucket_start, endpoint, method, bin_index), count in histogram.items():
+        histogram_values.append("(%s, %s, %s, %s, %s, %s)")
+        histogram_params.extend([granularity, bucket_start, endpoint, method, bin_index, count])
+
+    with get_db_cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO application_metrics_rollup {ROLLUP_COLUMNS} VALUES "
+            + ", ".join(rollup_values) + ROLLUP_ON_DUPLICATE,
+            tuple(rollup_params)
+        )
+        cursor.execute(
+            "INSERT INTO application_metrics_latency_histogram "
+            "(granularity, bucket_start, endpoint, method, latency_bin, request_count) VALUES "
+            + ", ".join(histogram_values) + HISTOGRAM_ON_DUPLICATE,
+            tuple(histogram_params)
+        )
+
+    maybe_prune()
+
+
+def _delete_in_chunks(query: str, params: tuple) -> int:
+    """Run a DELETE ... LIMIT repeatedly so no single statement holds locks for long"""
+    deleted = 0
+    while True:
+        affected = execute_update(f"{query} LIMIT {PRUNE_CHUNK_SIZE}", params)
+        deleted += affected or 0
+        if not affected or affected < PRUNE_CHUNK_SIZE:
+            return deleted
+
+
+def prune_metrics() -> dict:
+    """Apply retention to raw rows, minute buckets and hour buckets"""
+    deleted = {
+        'raw': _delete_in_chunks(
+            "DELETE FROM application_metrics WHERE created_at < DATE_SUB(UTC_TIMESTAMP(), INTERVAL %s DAY)",
+            (RAW_RETENTION_DAYS,)
+        ),
+        'minute': 0,
+        'hour': 0,
+    }
+    for table in ('application_metrics_rollup', 'application_metrics_latency_histogram'):
+        deleted['minute'] += _delete_in_chunks(
+            f"DELETE FROM {table} WHERE granularity = 'minute' AND bucket_start < DATE_SUB(UTC_TIMESTAMP(), INTERVAL %s HOUR)",
+            (MINUTE_RETENTION_HOURS,)
+        )
+        deleted['hour'] += _delete_in_chunks(
+            f"DELETE FROM {table} WHERE granularity = 'hour' AND bucket_start < DATE_SUB(UTC_TIMESTAMP(), INTERVAL %s DAY)",
+            (HOUR_RETENTION_DAYS,)
+        )
+    return deleted
+
+
+def maybe_prune():
+    """Run prune_metrics() at most once per PRUNE_INTERVAL_SECONDS in this process"""
+    global _last_prune
+    now = time.monotonic()
+    if _last_prune and now - _last_prune < PRUNE_INTERVAL_SECONDS:
+        return
+    if not _prune_lock.acquire(blocking=False):
+        return
+    try:
+        _last_prune = now
+        deleted = prune_metrics()
+        if any(deleted.values()):
+            print(f"Pruned application metrics: {deleted}")
+    except Exception:
+        print("Warning: application metrics retention pass failed")
+        traceback.print_exc()
+    finally:
+        _prune_lock.release()
+
+
+def hourly_latency_percentiles(hours: int, endpoint: str = None, method: str = None) -> Dict[str, dict]:
+    """Percentiles per hour bucket ('%Y-%m-%d %H:00:00' -> {"p50": ...}), optionally for one endpoint"""
+    conditions = [
+        "granularity = 'hour'",
+        "bucket_start >= DATE_FORMAT(DATE_SUB(UTC_TIMESTAMP(), INTERVAL %s HOUR), '%%Y-%%m-%%d %%H:00:00')",
+    ]
+    params = [hours]
+    if endpoint:
+        conditions.append("endpoint = %s")
+        params.append(endpoint)
+    if method:
+        conditions.append("method = %s")
+        params.append(method)
+    rows = execute_query(f"""
+        SELECT DATE_FORMAT(bucket_start, '%%Y-%%m-%%d %%H:00:00') as time_bucket,
+               latency_bin, SUM(request_count) as request_count
+        FROM application_metrics_latency_histogram
+        WHERE {" AND ".join(conditions)}
+        GROUP BY bucket_start, latency_bin
+    """, tuple(params))
+
+    histograms = {}
+    for row in rows:
+        histograms.setdefault(row['time_bucket'], {})[row['latency_bin']] = row['request_count']
+    return {time_bucket: percentiles(counts) for time_bucket, counts in histograms.items()}
+
+
+def endpoint_latency_percentiles(hours: int, endpoints: List[Tuple[str, str]]) -> Dict[tuple, dict]:
+    """Percentiles over the whole window for the given (endpoint, method) pairs"""
+    if not endpoints:
+        return {}
+    pairs = ", ".join(["(%s, %s)"] * len(endpoints))
+    params = [hours]
+    for endpoint, method in endpoints:
+        params.extend([endpoint, method])
+    rows = execute_query(f"""
+        SELECT endpoint, method, latency_bin, SUM(request_count) as request_count
+        FROM application_metrics_latency_histogram
+        WHERE granularity = 'hour'
+          AND bucket_start >= DATE_FORMAT(DATE_SUB(UTC_TIMESTAMP(), INTERVAL %s HOUR), '%%Y-%%m-%%d %%H:00:00')
+          AND (endpoint, method) IN ({pairs})
+        GROUP BY endpoint, method, latency_bin
+    """, tuple(params))
+
+    histograms = {}
+    for row in rows:
+        histograms.setdefault((row['endpoint'], row['method']), {})[row['latency_bin']] = row['request_count']
+    return {key: percentiles(counts) for key, counts in histograms.items()}
+
+
+def recent_latency_percentiles(minutes: int = 60) -> dict:
+    """Percentiles across all endpoints over the last few minute buckets"""
+    rows = execute_query("""
+        SELECT latency_bin, SUM(request_count) as request_count
+        FROM application_metrics_latency_histogram
+        WHERE granularity = 'minute'
+          AND bucket_start >= DATE_SUB(UTC_TIMESTAMP(), INTERVAL %s MINUTE)
+        GROUP BY latency_bin
+    """, (minutes,))
+    return percentiles({row['latency_bin']: row['request_count'] for row in rows})
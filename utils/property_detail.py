@@ -0,0 +1,309 @@
+"""
+Queries behind GET /api/properties/<id>?category=...
+Only the requested category's table is read (cross-table id collisions come from
+utils/id_collisions.py), and the images and features queries run on a small
+thread pool while the property row is fetched, so a detail view costs one
+round trip of wall time instead of five or six serial ones.
+The query builders and build_property_detail_response are shared with the
+async serving mode (asgi.py).
+"""
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+from database import execute_query
+from utils.helpers import normalize_image_url
+from utils.property_queries import PROPERTY_TABLES, IMAGE_TABLES
+from utils.schema_info import has_column
+
+
+DETAIL_FETCH_WORKERS = int(os.getenv("PROPERTY_DETAIL_FETCH_WORKERS", "4"))
+
+# Column projections used by GET /api/properties/<id> (superset of the listing columns)
+DETAIL_COLUMNS = {
+    'commercial': """
+        id, city, locality, property_name as title, property_name,
+        NULL as unit_type, 0 as bedrooms, 0 as bathrooms,
+        COALESCE(super_built_up_area, 0) as area, NULL as buildup_area, carpet_area,
+        super_built_up_area, price, price_text, price_negotiable,
+        property_type as type, status, property_status, description,
+        location_link, rera_number, rera_url, directions, NULL as length, NULL as breadth,
+        NULL as builder, NULL as configuration, NULL as total_flats, total_floors, NULL as total_acres,
+        is_featured, is_active, created_at, updated_at,
+        'commercial' as property_category,
+        plot_area, NULL as plot_length, NULL as plot_breadth,
+        property_name as project_name,
+        property_type,
+        NULL as price_includes_registration,
+        floor_number, total_seats_workstations, number_of_cabins, number_of_parking_slots,
+        parking_options, frontage_width, frontage_unit, footfall_potential,
+        ground_floor_area, ceiling_height, mezzanine_area,
+        warehouse_type, clearance_height, clearance_height_unit, dock_levelers,
+        number_of_shutters, shutter_height, shutter_height_unit, floor_load_capacity
+    """,
+    'residential': """
+        id, city, locality, property_name as title, property_name,
+        unit_type, bedrooms, bathrooms, buildup_area as area, buildup_area, carpet_area,
+        super_built_up_area, price, price_text, price_negotiable,
+        type, villa_type, status, listing_type, property_status, description,
+        location_link, rera_number, rera_url, directions, length, breadth,
+        builder, configuration, total_flats, total_floors, total_acres,
+        is_featured, is_active, created_at, updated_at,
+        'residential' as property_category,
+        NULL as plot_area, NULL as plot_length, NULL as plot_breadth,
+        NULL as project_name,
+        type as property_type,
+        NULL as price_includes_registration,
+        possession_date
+    """,
+    'plot': """
+        id, city, locality, project_name as title, project_name as property_name,
+        NULL as unit_type, 0 as bedrooms, 0 as bathrooms, plot_area as area, NULL as buildup_area, NULL as carpet_area,
+        NULL as super_built_up_area, price, price_text, price_negotiable,
+        'plot' as type, status, property_status, description,
+        location_link, rera_number, rera_url, directions, NULL as length, NULL as breadth,
+        builder, NULL as configuration, NULL as total_flats, NULL as total_floors, total_acres,
+        is_featured, is_active, created_at, updated_at,
+        'plot' as property_category,
+        plot_area, plot_length, plot_breadth,
+        project_name,
+        'plot_properties' as property_type,
+        NULL as price_includes_registration
+    """,
+}
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    # Passenger forks workers after import; each process needs its own pool threads
+    global _executor, _executor_pid
+    if _executor is not None and _executor_pid == os.getpid():
+        return _executor
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=DETAIL_FETCH_WORKERS, thread_name_prefix="property-detail")
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def property_row_query(category: str, property_id: int) -> Tuple[str, tuple]:
+    return f"SELECT {DETAIL_COLUMNS[category]} FROM {PROPERTY_TABLES[category]} WHERE id = %s", (property_id,)
+
+
+def property_images_query(category: str, property_id: int) -> Tuple[str, tuple]:
+    table = IMAGE_TABLES[category]
+    if has_column(table, 'image_title'):
+        title_column = "COALESCE(image_title, '') as image_title"
+    else:
+        title_column = "'' as image_title"
+    query = f"""
+        SELECT id, property_id, image_url, image_category as image_type, image_order,
+        {title_column}, created_at
+        FROM {table}
+        WHERE property_id = %s
+    """
+    return query, (property_id,)
+
+
+def property_features_query(category: str, property_id: int) -> Tuple[str, tuple]:
+    return (
+        "SELECT feature_name FROM property_features WHERE property_category = %s AND property_id = %s",
+        (category, property_id)
+    )
+
+
+def sort_images(images: List[dict]) -> List[dict]:
+    """Image rows ordered by (image_order, created_at)"""
+    return sorted(images, key=lambda x: (x.get('image_order') if x.get('image_order') is not None else 0, str(x.get('created_at') or '')))
+
+
+def feature_names(rows: List[dict]) -> List[str]:
+    return [feat.get('feature_name') for feat in rows if feat.get('feature_name')]
+
+
+def fetch_property_row(category: str, property_id: int) -> Optional[dict]:
+    rows = execute_query(*property_row_query(category, property_id))
+    return rows[0] if rows else None
+
+
+def fetch_property_images(category: str, property_id: int) -> List[dict]:
+    return sort_images(execute_query(*property_images_query(category, property_id)))
+
+
+def fetch_property_features(category: str, property_id: int) -> List[str]:
+    return feature_names(execute_query(*property_features_query(category, property_id)))
+
+
+def fetch_property_detail(category: str, property_id: int) -> Tuple[Optional[dict], List[dict], List[str]]:
+    """
+    (row, images, features) for one property. The row is None when the id is not
+    in the category's table; image/feature failures degrade to empty lists.
+    """
+    executor = _get_executor()
+    images_future = executor.submit(fetch_property_images, category, property_id)
+    features_future = executor.submit(fetch_property_features, category, property_id)
+
+    row = fetch_property_row(category, property_id)
+
+    try:
+        images = images_future.result()
+    except Exception as img_err:
+        print(f"Warning: could not load images for property {property_id}: {img_err}")
+        images = []
+    try:
+        features = features_future.result()
+    except Exception as feat_err:
+        print(f"Warning: could not load features for property {property_id}: {feat_err}")
+        features = []
+    return row, images, features
+
+
+def build_property_detail_response(category: str, row: dict, images: List[dict], features: List[str]) -> dict:
+    """JSON-ready body of GET /api/properties/<id> from fetch_property_detail's results"""
+    property_data = dict(row)
+
+    # Serialize created_at and updated_at from database for API response (for frontend "Listed on" display)
+    if 'created_at' in property_data and property_data['created_at'] is not None:
+        if isinstance(property_data['created_at'], datetime):
+            property_data['created_at'] = property_data['created_at'].isoformat()
+    else:
+        # Ensure created_at from DB is always included when available
+        created_at_val = row.get('created_at')
+        if created_at_val is not None:
+            property_data['created_at'] = created_at_val.isoformat() if isinstance(created_at_val, datetime) else created_at_val
+    if 'updated_at' in property_data and isinstance(property_data['updated_at'], datetime):
+        property_data['updated_at'] = property_data['updated_at'].isoformat()
+
+    # Residential: always include possession_date (same as other fields), serialize DATE to ISO string
+    if category == 'residential':
+        property_data.setdefault('possession_date', None)
+        pd = property_data.get('possession_date')
+        if pd is not None:
+            if isinstance(pd, (datetime, date)):
+                property_data['possession_date'] = pd.isoformat() if hasattr(pd, 'isoformat') else str(pd)
+            elif not isinstance(pd, str):
+                property_data['possession_date'] = str(pd)
+
+    # Commercial: parse parking_options from JSON string if present
+    if category == 'commercial' and property_data.get('parking_options') and isinstance(property_data['parking_options'], str):
+        try:
+            property_data['parking_options'] = json.loads(property_data['parking_options'])
+        except Exception:
+            property_data['parking_options'] = []
+
+    # Provide `direction` alias for frontend dropdown prefill.
+    # Keep `directions` unchanged for backward compatibility.
+    if 'direction' not in property_data or property_data.get('direction') is None:
+        directions_val = (property_data.get('directions') or '').strip().lower() if isinstance(property_data.get('directions'), str) else None
+        if directions_val in ('east', 'west', 'north', 'south'):
+            property_data['direction'] = directions_val
+        else:
+            property_data['direction'] = None
+
+    # Construct location from city and locality if not already present
+    if 'location' not in property_data or not property_data.get('location'):
+        city = property_data.get('city', '')
+        locality = property_data.get('locality', '')
+        if city and locality:
+            property_data['location'] = f"{city}, {locality}"
+        elif city:
+            property_data['location'] = city
+        elif locality:
+            property_data['location'] = locality
+        else:
+            property_data['location'] = 'Location not specified'
+
+    # Normalize images (already ordered by image_order, created_at)
+    normalized_images = []
+    try:
+        for i, img in enumerate(images):
+            img_dict = dict(img)
+            if img_dict.get('image_url'):
+                img_dict['image_url'] = normalize_image_url(img_dict['image_url'])
+            # Convert datetime to ISO format string
+            if 'created_at' in img_dict and isinstance(img_dict['created_at'], datetime):
+                img_dict['created_at'] = img_dict['created_at'].isoformat()
+            img_dict['is_primary'] = (i == 0)
+            img_dict['image_order'] = img_dict.get('image_order') if img_dict.get('image_order') is not None else i
+            if 'image_title' not in img_dict:
+                img_dict['image_title'] = ''
+            normalized_images.append(img_dict)
+    except Exception as img_err:
+        print(f"Warning: could not normalize images for property {row.get('id')}: {img_err}")
+    property_data['images'] = normalized_images
+
+    # Build image_gallery array for frontend
+    image_gallery = []
+    for img in normalized_images:
+        image_category = img.get('image_type', 'project')
+        # Map DB categories to frontend categories
+        category_map = {
+            'project': 'project',
+            'floorplan': 'floorplan',
+            'masterplan': 'masterplan'
+        }
+        frontend_category = category_map.get(image_category, 'project')
+        image_gallery.append({
+            'image_url': img.get('image_url'),
+            'category': frontend_category,
+            'title': (img.get('image_title') or '').strip() or '',
+            'order': img.get('image_order', 0)
+        })
+    property_data['image_gallery'] = image_gallery
+
+    property_data['project_images'] = []
+    property_data['floorplan_images'] = []
+    property_data['masterplan_images'] = []
+
+    property_data['features'] = features
+
+    # Convert TINYINT(1) to boolean
+    if property_data.get('price_negotiable') is not None:
+        property_data['price_negotiable'] = bool(property_data['price_negotiable'])
+    if property_data.get('price_includes_registration') is not None:
+        property_data['price_includes_registration'] = bool(property_data['price_includes_registration'])
+
+    # Ensure numeric types (MySQL may return Decimal; avoid jsonify errors)
+    def _to_int(v):
+        if v is None: return None
+        try: return int(float(v))
+        except (TypeError, ValueError): return None
+    def _to_float(v):
+        if v is None: return None
+        try: return float(v)
+        except (TypeError, ValueError): return None
+    property_data['bedrooms'] = _to_int(property_data.get('bedrooms')) or 0
+    if 'bathrooms' in property_data: property_data['bathrooms'] = _to_float(property_data['bathrooms'])
+    if 'area' in property_data: property_data['area'] = _to_int(property_data['area'])
+    if 'price' in property_data: property_data['price'] = _to_float(property_data['price'])
+
+    # Convert any remaining Decimals (e.g. in features, plot_area) so jsonify does not fail
+    def _decimal_to_float(obj):
+        if isinstance(obj, Decimal): return float(obj)
+        if isinstance(obj, dict):
+            return {k: _decimal_to_float(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [_decimal_to_float(v) for v in obj]
+        return obj
+
+    # Convert datetime/date objects to ISO format strings for JSON serialization
+    def _datetime_to_iso(obj):
+        if isinstance(obj, (datetime, date)):
+            return obj.isoformat()
+        if isinstance(obj, dict):
+            return {k: _datetime_to_iso(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [_datetime_to_iso(v) for v in obj]
+        return obj
+
+    property_data = _decimal_to_float(property_data)
+    property_data = _datetime_to_iso(property_data)
+
+    return property_data
@@ -0,0 +1,528 @@
+"""
+In-process search index over the active properties of all three tables, for
+hosts where MySQL FULLTEXT is unavailable (enable with PROPERTY_INDEX_ENABLED=true).
+
+The index holds:
+    token -> {property key: field weight} posting lists for name, city,
+        locality, builder and features (prefix lookups via a sorted vocabulary)
+    exact-value sets for category, type, status and is_featured
+    sorted (value, key) arrays for price and area range filters
+so GET /api/properties and GET /api/search answer filter combinations with set
+intersections instead of SQL scans; only the resulting page is read from MySQL.
+
+It is loaded at startup and updated incrementally by the property write routes.
+Writes in other worker processes are detected through the "properties" content
+version (utils/content_versions.py), which triggers a full reload; the index is
+also rebuilt every PROPERTY_INDEX_REFRESH_SECONDS as a safety net.
+"""
+import bisect
+import os
+import re
+import threading
+import time
+import traceback
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from database import execute_query
+from models import PropertyType, PropertyStatus
+from utils.content_versions import get_versions
+from utils.property_queries import PROPERTY_TABLES, CATEGORY_RANK, COMMERCIAL_TYPES
+from utils.schema_info import has_table
+
+
+PROPERTY_INDEX_ENABLED = os.getenv("PROPERTY_INDEX_ENABLED", "false").lower() == "true"
+PROPERTY_INDEX_REFRESH_SECONDS = float(os.getenv("PROPERTY_INDEX_REFRESH_SECONDS", "900"))
+# After a failed load, answer from SQL for this long before trying again
+LOAD_RETRY_SECONDS = 30
+
+# Ranking weight of a term match per field
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'builder': 2.0,
+    'city': 1.5,
+    'locality': 1.5,
+    'features': 1.0,
+}
+
+# Columns loaded per category (aliases shared across tables)
+INDEX_COLUMNS = {
+    'residential': """
+        id, property_name as name, city, locality, builder, type, status,
+        is_featured, is_active, price, buildup_area as area, bedrooms, created_at
+    """,
+    'plot': """
+        id, project_name as name, city, locality, builder, NULL as type, status,
+        is_featured, is_active, price, plot_area as area, 0 as bedrooms, created_at
+    """,
+    'commercial': """
+        id, property_name as name, city, locality, NULL as builder, property_type as type, status,
+        is_featured, is_active, price, super_built_up_area as area, 0 as bedrooms, created_at
+    """,
+}
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Attributes replaced as a whole when the index is rebuilt (see PropertySearchIndex._reset)
+INDEX_STATE = (
+    '_docs', '_by_category', '_by_type', '_by_status', '_featured', '_price', '_area',
+    '_postings', '_vocab', '_location_postings', '_location_vocab', '_location_values',
+)
+
+Key = Tuple[str, int]
+
+
+def tokenize(text) -> List[str]:
+    return re.findall(r"\w+", str(text).lower()) if text else []
+
+
+def _to_float(value) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _sort_key(created_at, category: str, property_id: int) -> tuple:
+    """Listing order: created_at DESC (NULLs last), category rank ASC, id DESC"""
+    if isinstance(created_at, datetime):
+        return (0, -(created_at - _EPOCH).total_seconds(), CATEGORY_RANK[category], -property_id)
+    return (1, 0, CATEGORY_RANK[category], -property_id)
+
+
+class PropertySearchIndex:
+    """Token and attribute index over active properties, keyed by (category, id)"""
+
+    def __init__(self, enabled: bool = PROPERTY_INDEX_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self._reset()
+        self._loaded_at = None
+        self._failed_at = None
+        self._version = None
+        # Incremental writes made by this worker whose version bump is still to be seen
+        self._own_writes = 0
+        self._counters = {"loads": 0, "load_failures": 0, "incremental_updates": 0, "queries": 0}
+
+    def _reset(self):
+        self._docs: Dict[Key, dict] = {}
+        self._by_category: Dict[str, Set[Key]] = {c: set() for c in CATEGORY_RANK}
+        self._by_type: Dict[str, Set[Key]] = {}
+        self._by_status: Dict[str, Set[Key]] = {}
+        self._featured: Set[Key] = set()
+        self._price: List[Tuple[float, Key]] = []
+        self._area: List[Tuple[float, Key]] = []
+        self._postings: Dict[str, Dict[Key, float]] = {}
+        self._vocab: List[str] = []
+        self._location_postings: Dict[str, Set[Key]] = {}
+        self._location_vocab: List[str] = []
+        # Full lowercased city/locality values, for the listing's substring location filter
+        self._location_values: Dict[str, Set[Key]] = {}
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def _fetch_rows(self, category: str, property_id: Optional[int] = None) -> List[dict]:
+        table = PROPERTY_TABLES[category]
+        if property_id is None:
+            return execute_query(f"SELECT {INDEX_COLUMNS[category]} FROM {table} WHERE is_active = 1")
+        return execute_query(f"SELECT {INDEX_COLUMNS[category]} FROM {table} WHERE id = %s", (property_id,))
+
+    def _fetch_features(self, category: Optional[str] = None, property_id: Optional[int] = None) -> Dict[Key, List[str]]:
+        if property_id is None:
+            rows = execute_query("SELECT property_category, property_id, feature_name FROM property_features")
+        else:
+            rows = execute_query(
+                "SELECT property_category, property_id, feature_name FROM property_features "
+                "WHERE property_category = %s AND property_id = %s",
+                (category, property_id)
+            )
+        features = {}
+        for row in rows:
+            if row.get('feature_name'):
+                features.setdefault((row['property_category'], int(row['property_id'])), []).append(row['feature_name'])
+        return features
+
+    def _is_current(self, version: int) -> bool:
+        return (
+            self._version == version
+            and self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < PROPERTY_INDEX_REFRESH_SECONDS
+        )
+
+    def load(self, expected_version: Optional[int] = None) -> bool:
+        """Rebuild the whole index from MySQL; the previous index keeps serving until the swap"""
+        if not self.enabled:
+            return False
+        with self._load_lock:
+            if expected_version is not None and self._is_current(expected_version):
+                # Another thread reloaded while this one waited
+                return True
+            started = time.monotonic()
+            try:
+                version = get_versions(("properties",))["properties"][0]
+                rows_by_category = {
+                    category: self._fetch_rows(category)
+                    for category in PROPERTY_TABLES
+                    if has_table(PROPERTY_TABLES[category])
+                }
+                features = self._fetch_features()
+            except Exception:
+                print("Warning: Could not load the property search index")
+                traceback.print_exc()
+                with self._lock:
+                    self._counters["load_failures"] += 1
+                    self._failed_at = time.monotonic()
+                return False
+
+            # Build off to the side so queries keep using the current index meanwhile
+            fresh = PropertySearchIndex(enabled=False)
+            for category, rows in rows_by_category.items():
+                for row in rows:
+                    key = (category, int(row['id']))
+                    fresh._add(key, row, features.get(key, []))
+
+            with self._lock:
+                for name in INDEX_STATE:
+                    setattr(self, name, getattr(fresh, name))
+                self._version = version
+                self._own_writes = 0
+                self._loaded_at = time.monotonic()
+                self._failed_at = None
+                self._counters["loads"] += 1
+                count = len(self._docs)
+        print(f"Property search index loaded: {count} properties in {(time.monotonic() - started) * 1000:.0f}ms")
+        return True
+
+    def ensure_current(self) -> bool:
+        """True when the index can answer queries (reloading it first if it is stale)"""
+        if not self.enabled:
+            return False
+        try:
+            version = get_versions(("properties",))["properties"][0]
+        except Exception:
+            traceback.print_exc()
+            return self._version is not None
+        with self._lock:
+            if self._is_current(version):
+                return True
+            behind = version - self._version if self._version is not None else None
+            if (
+                behind is not None and 0 < behind <= self._own_writes
+                and time.monotonic() - self._loaded_at < PROPERTY_INDEX_REFRESH_SECONDS
+            ):
+                # Only this worker's own writes, already applied incrementally
+                self._own_writes -= behind
+                self._version = version
+                return True
+            if self._failed_at is not None and time.monotonic() - self._failed_at < LOAD_RETRY_SECONDS:
+                return False
+        return self.load(expected_version=version)
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+    def _add(self, key: Key, row: dict, features: Iterable[str]):
+        category, property_id = key
+        doc = {
+            'category': category,
+            'id': property_id,
+            'type': (row.get('type') or '').lower() or None,
+            'status': (row.get('status') or '').lower() or None,
+            'is_featured': bool(row.get('is_featured')),
+            'price': _to_float(row.get('price')),
+            'area': _to_float(row.get('area')),
+            'bedrooms': int(_to_float(row.get('bedrooms')) or 0),
+            'sort_key': _sort_key(row.get('created_at'), category, property_id),
+            'tokens': {},
+            'location_tokens': set(),
+            'location_values': set(),
+        }
+        for field, value in (
+            ('name', row.get('name')), ('builder', row.get('builder')),
+            ('city', row.get('city')), ('locality', row.get('locality')),
+            ('features', " ".join(features)),
+        ):
+            for token in tokenize(value):
+                doc['tokens'][token] = max(doc['tokens'].get(token, 0.0), FIELD_WEIGHTS[field])
+        for value in (row.get('city'), row.get('locality')):
+            if value:
+                doc['location_values'].add(str(value).lower())
+                doc['location_tokens'].update(tokenize(value))
+
+        self._docs[key] = doc
+        self._by_category[category].add(key)
+        if doc['type']:
+            self._by_type.setdefault(doc['type'], set()).add(key)
+        if doc['status']:
+            self._by_status.setdefault(doc['status'], set()).add(key)
+        if doc['is_featured']:
+            self._featured.add(key)
+        if doc['price'] is not None:
+            bisect.insort(self._price, (doc['price'], key))
+        if doc['area'] is not None:
+            bisect.insort(self._area, (doc['area'], key))
+        for token, weight in doc['tokens'].items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                bisect.insort(self._vocab, token)
+            postings[key] = weight
+        for token in doc['location_tokens']:
+            keys = self._location_postings.get(token)
+            if keys is None:
+                keys = self._location_postings[token] = set()
+                bisect.insort(self._location_vocab, token)
+            keys.add(key)
+        for value in doc['location_values']:
+            self._location_values.setdefault(value, set()).add(key)
+
+    def _remove(self, key: Key):
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        self._by_category[doc['category']].discard(key)
+        if doc['type']:
+            self._by_type.get(doc['type'], set()).discard(key)
+        if doc['status']:
+            self._by_status.get(doc['status'], set()).discard(key)
+        self._featured.discard(key)
+        for values, value in ((self._price, doc['price']), (self._area, doc['area'])):
+            if value is not None:
+                i = bisect.bisect_left(values, (value, key))
+                if i < len(values) and values[i] == (value, key):
+                    values.pop(i)
+        for token in doc['tokens']:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[token]
+                    self._vocab.pop(bisect.bisect_left(self._vocab, token))
+        for token in doc['location_tokens']:
+            keys = self._location_postings.get(token)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._location_postings[token]
+                    self._location_vocab.pop(bisect.bisect_left(self._location_vocab, token))
+        for value in doc['location_values']:
+            keys = self._location_values.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._location_values[value]
+
+    def upsert(self, category: str, property_id: int):
+        """Re-read one property after an admin write and replace its entry"""
+        if not self.enabled or self._loaded_at is None:
+            return
+        try:
+            rows = self._fetch_rows(category, property_id)
+            features = self._fetch_features(category, property_id)
+        except Exception:
+            print(f"Warning: Could not update search index for {category} property {property_id}")
+            traceback.print_exc()
+            return
+        key = (category, int(property_id))
+        with self._lock:
+            self._remove(key)
+            if rows and rows[0].get('is_active'):
+                self._add(key, rows[0], features.get(key, []))
+            self._own_writes += 1
+            self._counters["incremental_updates"] += 1
+
+    def remove(self, category: str, property_id: int):
+        if not self.enabled or self._loaded_at is None:
+            return
+        with self._lock:
+            self._remove((category, int(property_id)))
+            self._own_writes += 1
+            self._counters["incremental_updates"] += 1
+
+    # ------------------------------------------------------------------
+    # Queries (callers hold self._lock)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _range(values: List[Tuple[float, Key]], low: Optional[float], high: Optional[float]) -> Set[Key]:
+        start = 0 if low is None else bisect.bisect_left(values, (low,))
+        end = len(values) if high is None else bisect.bisect_right(values, (high, ('\uffff', float('inf'))))
+        return {key for _, key in values[start:end]}
+
+    @staticmethod
+    def _prefix(vocab: List[str], prefix: str) -> List[str]:
+        start = bisect.bisect_left(vocab, prefix)
+        end = bisect.bisect_left(vocab, prefix + '\uffff')
+        return vocab[start:end]
+
+    def _apply_common(self, keys: Set[Key], min_price, max_price, is_featured) -> Set[Key]:
+        if min_price is not None or max_price is not None:
+            keys &= self._range(self._price, min_price, max_price)
+        if is_featured is not None:
+            keys = keys & self._featured if is_featured else keys - self._featured
+        return keys
+
+    def _sorted_keys(self, keys: Set[Key]) -> List[Key]:
+        return sorted(keys, key=lambda k: self._docs[k]['sort_key'])
+
+    def listing_keys(
+        self,
+        type_str: Optional[str] = None,
+        status_str: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        location: Optional[str] = None,
+        is_featured: Optional[bool] = None
+    ) -> List[Key]:
+        """Active properties matching the GET /api/properties filters, in listing order
+        (same semantics as utils.property_queries.build_listing_filters)"""
+        with self._lock:
+            self._counters["queries"] += 1
+            residential_type = None
+            if type_str:
+                try:
+                    residential_type = PropertyType(type_str).value
+                except ValueError:
+                    pass
+            status = None
+            if status_str:
+                try:
+                    status = PropertyStatus(status_str).value
+                except ValueError:
+                    pass
+
+            residential = set(self._by_category['residential'])
+            if residential_type:
+                residential &= self._by_type.get(residential_type, set())
+            # plot_properties has no type column: left out when a residential type is set
+            plot = set() if residential_type else set(self._by_category['plot'])
+            if status:
+                residential &= self._by_status.get(status, set())
+                plot &= self._by_status.get(status, set())
+            # Commercial has no status filter; property_type only for commercial types
+            commercial = set(self._by_category['commercial'])
+            if type_str and type_str in COMMERCIAL_TYPES:
+                commercial &= self._by_type.get(type_str, set())
+
+            keys = self._apply_common(residential | plot | commercial, min_price, max_price, is_featured)
+            if location:
+                needle = location.lower()
+                located = set()
+                for value, value_keys in self._location_values.items():
+                    if needle in value:
+                        located |= value_keys
+                keys &= located
+            return self._sorted_keys(keys)
+
+    def position_after(self, keys: List[Key], cursor: Tuple[datetime, str, int]) -> int:
+        """Index in listing-ordered keys of the first entry after a decoded keyset cursor"""
+        created_at, category, property_id = cursor
+        cursor_key = _sort_key(created_at, category, property_id)
+        with self._lock:
+            sort_keys = [self._docs[k]['sort_key'] if k in self._docs else cursor_key for k in keys]
+        return bisect.bisect_right(sort_keys, cursor_key)
+
+    def search(
+        self,
+        terms: List[str],
+        location_terms: List[str],
+        type_str: Optional[str] = None,
+        category: Optional[str] = None,
+        status_str: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_bedrooms: Optional[int] = None,
+        max_bedrooms: Optional[int] = None,
+        min_area: Optional[float] = None,
+        max_area: Optional[float] = None,
+        is_featured: Optional[bool] = None,
+        sort_by: str = 'relevance',
+        sort_order: str = 'desc'
+    ) -> List[Tuple[Key, float]]:
+        """(key, relevance) of active properties matching /api/search (same semantics as
+        utils.property_search: every term required and prefix-matched)"""
+        with self._lock:
+            self._counters["queries"] += 1
+            categories = set(CATEGORY_RANK)
+            if category:
+                categories &= {category}
+            if type_str:
+                if type_str == PropertyType.PLOT.value:
+                    categories &= {'plot'}
+                elif type_str in COMMERCIAL_TYPES:
+                    categories &= {'commercial'}
+                else:
+                    categories &= {'residential'}
+            if min_bedrooms:
+                categories &= {'residential'}
+
+            keys = set()
+            for c in categories:
+                keys |= self._by_category[c]
+            if type_str and type_str != PropertyType.PLOT.value:
+                keys &= self._by_type.get(type_str, set())
+            if status_str:
+                # Status applies to residential and plot only (as in the SQL filters)
+                keys = {k for k in keys if k[0] == 'commercial'} | (keys & self._by_status.get(status_str, set()))
+            keys = self._apply_common(keys, min_price, max_price, is_featured)
+            if min_area is not None or max_area is not None:
+                keys &= self._range(self._area, min_area, max_area)
+            if min_bedrooms is not None or max_bedrooms is not None:
+                keys = {
+                    k for k in keys
+                    if k[0] != 'residential' or (
+                        (min_bedrooms is None or self._docs[k]['bedrooms'] >= min_bedrooms)
+                        and (max_bedrooms is None or self._docs[k]['bedrooms'] <= max_bedrooms)
+                    )
+                }
+
+            for term in location_terms:
+                matched = set()
+                for token in self._prefix(self._location_vocab, term):
+                    matched |= self._location_postings[token]
+                keys &= matched
+
+            scores = {k: 0.0 for k in keys}
+            for term in terms:
+                term_scores = {}
+                for token in self._prefix(self._vocab, term):
+                    for key, weight in self._postings[token].items():
+                        if key in scores and weight > term_scores.get(key, 0.0):
+                            term_scores[key] = weight
+                scores = {k: scores[k] + w for k, w in term_scores.items()}
+
+            reverse = sort_order != 'asc'
+            if sort_by == 'relevance':
+                ordered = sorted(scores, key=lambda k: self._docs[k]['sort_key'])
+                ordered.sort(key=lambda k: scores[k], reverse=reverse)
+            elif sort_by == 'price':
+                ordered = sorted(scores, key=lambda k: self._docs[k]['sort_key'])
+                priced = [k for k in ordered if self._docs[k]['price'] is not None]
+                priced.sort(key=lambda k: self._docs[k]['price'], reverse=reverse)
+                ordered = priced + [k for k in ordered if self._docs[k]['price'] is None]
+            else:
+                ordered = sorted(scores, key=lambda k: self._docs[k]['sort_key'], reverse=not reverse)
+            return [(k, scores[k]) for k in ordered]
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update({
+                "enabled": self.enabled,
+                "properties": len(self._docs),
+                "tokens": len(self._postings),
+                "version": self._version,
+                "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+            })
+        return stats
+
+
+property_index = PropertySearchIndex()
+
+
+def keys_for_hydration(keys: Iterable[Key]) -> List[dict]:
+    """Index keys in the shape utils.property_queries.hydrate_listing_rows expects"""
+    return [{'id': property_id, 'category_rank': CATEGORY_RANK[category]} for category, property_id in keys]
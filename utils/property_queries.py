@@ -0,0 +1,455 @@
+"""
+Shared SQL builders for the unified property listing.
+Residential, plot and commercial properties live in separate tables with
+colliding AUTO_INCREMENT ids, so the listing is merged in SQL by
+(created_at, category, id) instead of concatenating full tables in Python.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from database import execute_query
+from models import PropertyType, PropertyStatus
+from utils.helpers import normalize_image_url
+from utils.image_variants import thumbnail_url
+from utils.schema_info import has_column
+
+
+PROPERTY_TABLES = {
+    'residential': 'residential_properties',
+    'plot': 'plot_properties',
+    'commercial': 'commercial_properties',
+}
+
+IMAGE_TABLES = {
+    'residential': 'residential_property_images',
+    'plot': 'plot_property_images',
+    'commercial': 'commercial_property_images',
+}
+
+# Tie-break order for rows with the same created_at (same order the tables used to be concatenated in)
+CATEGORY_RANK = {'residential': 0, 'plot': 1, 'commercial': 2}
+
+COMMERCIAL_TYPES = ("office_space", "warehouse", "showrooms")
+
+# Column projections used by GET /api/properties (one shared shape per category)
+LISTING_COLUMNS = {
+    'residential': """
+        id, city, locality, property_name as title, property_name,
+        unit_type, bedrooms, bathrooms, buildup_area as area, buildup_area, carpet_area,
+        super_built_up_area, price, price_text, price_negotiable,
+        type, status, property_status, description,
+        location_link, rera_number, rera_url, directions, length, breadth,
+        builder, configuration, total_flats, total_floors, total_acres,
+        is_featured, is_active, created_at, updated_at,
+        'residential' as property_category,
+        NULL as plot_area, NULL as plot_length, NULL as plot_breadth,
+        NULL as project_name,
+        type as property_type,
+        NULL as price_includes_registration
+    """,
+    'plot': """
+        id, city, locality, project_name as title, project_name as property_name,
+        NULL as unit_type, 0 as bedrooms, 0 as bathrooms, plot_area as area, NULL as buildup_area, NULL as carpet_area,
+        NULL as super_built_up_area, price, price_text, price_negotiable,
+        'plot' as type, status, property_status, description,
+        location_link, rera_number, rera_url, directions, NULL as length, NULL as breadth,
+        builder, NULL as configuration, NULL as total_flats, NULL as total_floors, total_acres,
+        is_featured, is_active, created_at, updated_at,
+        'plot' as property_category,
+        plot_area, plot_length, plot_breadth,
+        project_name,
+        NULL as price_includes_registration
+    """,
+    'commercial': """
+        id, city, locality, property_name as title, property_name,
+        NULL as unit_type, 0 as bedrooms, 0 as bathrooms,
+        COALESCE(super_built_up_area, 0) as area, NULL as buildup_area, carpet_area,
+        super_built_up_area, price, price_text, price_negotiable,
+        property_type as type, status, property_status, description,
+        location_link, rera_number, rera_url, directions, NULL as length, NULL as breadth,
+        NULL as builder, NULL as configuration, NULL as total_flats, total_floors, NULL as total_acres,
+        is_featured, is_active, created_at, updated_at,
+        'commercial' as property_category,
+        plot_area, NULL as plot_length, NULL as plot_breadth,
+        property_name as project_name,
+        property_type,
+        NULL as price_includes_registration,
+        floor_number, total_seats_workstations, number_of_cabins, number_of_parking_slots,
+        parking_options, frontage_width, frontage_unit, footfall_potential,
+        ground_floor_area, ceiling_height, mezzanine_area,
+        warehouse_type, clearance_height, clearance_height_unit, dock_levelers,
+        number_of_shutters, shutter_height, shutter_height_unit, floor_load_capacity
+    """,
+}
+
+
+def location_condition(table: str) -> str:
+    """city/locality substring match; uses the lowercase generated columns when
+    scripts/manage_indexes.py has added them (no per-row LOWER(), narrower index to scan)"""
+    if has_column(table, 'city_lc') and has_column(table, 'locality_lc'):
+        return "(city_lc LIKE %s OR locality_lc LIKE %s)"
+    return "(LOWER(city) LIKE %s OR LOWER(locality) LIKE %s)"
+
+
+def build_listing_filters(
+    type_str: Optional[str] = None,
+    status_str: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    location: Optional[str] = None,
+    is_featured: Optional[bool] = None,
+    is_active: bool = True
+) -> Dict[str, Tuple[str, list]]:
+    """
+    Build per-table WHERE clauses for the listing filters.
+    Returns {category: (where_clause, params)}. Plots are left out when a
+    residential type filter is set, since plot_properties has no type column.
+    """
+    is_active_int = 1 if is_active else 0
+    location_like = f"%{location.lower()}%" if location else None
+
+    # Residential and plot share the same filter columns (plot has no type column)
+    shared_conditions = ["is_active = %s"]
+    shared_params = [is_active_int]
+    type_condition = None
+    type_value = None
+
+    if type_str:
+        try:
+            type_value = PropertyType(type_str).value
+            type_condition = "type = %s"
+        except ValueError:
+            pass
+
+    if status_str:
+        try:
+            prop_status = PropertyStatus(status_str)
+            shared_conditions.append("status = %s")
+            shared_params.append(prop_status.value)
+        except ValueError:
+            pass
+
+    if min_price is not None:
+        shared_conditions.append("price >= %s")
+        shared_params.append(min_price)
+
+    if max_price is not None:
+        shared_conditions.append("price <= %s")
+        shared_params.append(max_price)
+
+    if is_featured is not None:
+        shared_conditions.append("is_featured = %s")
+        shared_params.append(1 if is_featured else 0)
+
+    filters = {}
+    if type_condition:
+        filters['residential'] = (
+            " AND ".join([shared_conditions[0], type_condition] + shared_conditions[1:]),
+            [shared_params[0], type_value] + shared_params[1:]
+        )
+    else:
+        filters['residential'] = (" AND ".join(shared_conditions), list(shared_params))
+        filters['plot'] = (" AND ".join(shared_conditions), list(shared_params))
+
+    # Commercial: no "type" column (use property_type if filter matches) and no status filter
+    conditions_com = ["is_active = %s"]
+    params_com = [is_active_int]
+    if type_str and type_str in COMMERCIAL_TYPES:
+        conditions_com.append("property_type = %s")
+        params_com.append(type_str)
+    if min_price is not None:
+        conditions_com.append("price >= %s")
+        params_com.append(min_price)
+    if max_price is not None:
+        conditions_com.append("price <= %s")
+        params_com.append(max_price)
+    if is_featured is not None:
+        conditions_com.append("is_featured = %s")
+        params_com.append(1 if is_featured else 0)
+    filters['commercial'] = (" AND ".join(conditions_com), params_com)
+
+    if location_like:
+        # Search in both city and locality fields
+        for category, (where, params) in filters.items():
+            filters[category] = (
+                f"{where} AND {location_condition(PROPERTY_TABLES[category])}",
+                params + [location_like, location_like]
+            )
+
+    return filters
+
+
+def build_count_query(filters: Dict[str, Tuple[str, list]]) -> Tuple[str, tuple]:
+    """Single round trip COUNT over all filtered tables"""
+    branches = []
+    params = []
+    for category, (where, where_params) in filters.items():
+        branches.append(f"SELECT COUNT(*) as total FROM {PROPERTY_TABLES[category]} WHERE {where}")
+        params.extend(where_params)
+    query = f"SELECT COALESCE(SUM(total), 0) as total FROM ({' UNION ALL '.join(branches)}) as counts"
+    return query, tuple(params)
+
+
+def build_page_keys_query(filters: Dict[str, Tuple[str, list]], limit: int, offset: int) -> Tuple[str, tuple]:
+    """
+    Select only (id, category) of one merged page.
+    Each table contributes at most offset + limit keys (per-table top-N),
+    and the outer ORDER BY/LIMIT merges them.
+    """
+    window = offset + limit
+    branches = []
+    params = []
+    for category, (where, where_params) in filters.items():
+        branches.append(
+            f"(SELECT id, created_at, {CATEGORY_RANK[category]} as category_rank "
+            f"FROM {PROPERTY_TABLES[category]} WHERE {where} "
+            f"ORDER BY created_at DESC, id DESC LIMIT %s)"
+        )
+        params.extend(where_params)
+        params.append(window)
+    query = (
+        " UNION ALL ".join(branches)
+        + " ORDER BY created_at DESC, category_rank ASC, id DESC LIMIT %s OFFSET %s"
+    )
+    params.extend([limit, offset])
+    return query, tuple(params)
+
+
+def encode_cursor(created_at, category: str, property_id: int) -> str:
+    """Opaque keyset cursor for the position right after (created_at, category, id)"""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    payload = json.dumps([created_at, category, int(property_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str, int]:
+    """Decode a cursor from encode_cursor(); raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, category, property_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = datetime.fromisoformat(created_at)
+        property_id = int(property_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if category not in CATEGORY_RANK:
+        raise ValueError("Invalid cursor")
+    return created_at, category, property_id
+
+
+def build_seek_keys_query(
+    filters: Dict[str, Tuple[str, list]],
+    limit: int,
+    cursor: Tuple[datetime, str, int]
+) -> Tuple[str, tuple]:
+    """
+    Keyset variant of build_page_keys_query: every table seeks past the cursor
+    with a range condition on created_at, so deep pages cost the same as page 1.
+    """
+    cursor_created_at, cursor_category, cursor_id = cursor
+    cursor_rank = CATEGORY_RANK[cursor_category]
+    branches = []
+    params = []
+    for category, (where, where_params) in filters.items():
+        rank = CATEGORY_RANK[category]
+        if rank > cursor_rank:
+            # Same created_at sorts after the cursor for this table
+            seek = "created_at <= %s"
+            seek_params = [cursor_created_at]
+        elif rank == cursor_rank:
+            seek = "(created_at < %s OR (created_at = %s AND id < %s))"
+            seek_params = [cursor_created_at, cursor_created_at, cursor_id]
+        else:
+            seek = "created_at < %s"
+            seek_params = [cursor_created_at]
+        branches.append(
+            f"(SELECT id, created_at, {rank} as category_rank "
+            f"FROM {PROPERTY_TABLES[category]} WHERE {where} AND {seek} "
+            f"ORDER BY created_at DESC, id DESC LIMIT %s)"
+        )
+        params.extend(where_params)
+        params.extend(seek_params)
+        params.append(limit)
+    query = (
+        " UNION ALL ".join(branches)
+        + " ORDER BY created_at DESC, category_rank ASC, id DESC LIMIT %s"
+    )
+    params.append(limit)
+    return query, tuple(params)
+
+
+def build_rows_by_ids_query(category: str, ids: List[int]) -> Tuple[str, tuple]:
+    """Fetch full listing rows of one category by primary key"""
+    placeholders = ", ".join(["%s"] * len(ids))
+    query = f"SELECT {LISTING_COLUMNS[category]} FROM {PROPERTY_TABLES[category]} WHERE id IN ({placeholders})"
+    return query, tuple(ids)
+
+
+def category_for_rank(rank) -> str:
+    for category, value in CATEGORY_RANK.items():
+        if value == int(rank):
+            return category
+    raise ValueError(f"Unknown category rank: {rank}")
+
+
+def group_keys_by_category(keys: List[dict]) -> Dict[str, List[int]]:
+    ids_by_category = {}
+    for key in keys:
+        ids_by_category.setdefault(category_for_rank(key['category_rank']), []).append(key['id'])
+    return ids_by_category
+
+
+def order_hydrated_rows(keys: List[dict], rows_by_key: Dict[Tuple[str, int], dict]) -> List[dict]:
+    """Rows in page-key order; keys whose row disappeared meanwhile are skipped"""
+    rows = []
+    for key in keys:
+        row = rows_by_key.get((category_for_rank(key['category_rank']), key['id']))
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def hydrate_listing_rows(keys: List[dict]) -> List[dict]:
+    """Load full rows for page keys, one query per category, preserving key order"""
+    rows_by_key = {}
+    for category, ids in group_keys_by_category(keys).items():
+        query, params = build_rows_by_ids_query(category, ids)
+        for row in execute_query(query, params):
+            rows_by_key[(category, row['id'])] = row
+    return order_hydrated_rows(keys, rows_by_key)
+
+
+def count_listing(filters: Dict[str, Tuple[str, list]]) -> int:
+    query, params = build_count_query(filters)
+    result = execute_query(query, params)
+    return int(result[0]['total'] or 0) if result else 0
+
+
+def fetch_listing_page(
+    filters: Dict[str, Tuple[str, list]],
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[Tuple[datetime, str, int]] = None
+) -> List[dict]:
+    """Return one page of the merged listing ordered by created_at DESC (offset or keyset cursor)"""
+    if cursor is not None:
+        query, params = build_seek_keys_query(filters, limit, cursor)
+    else:
+        query, params = build_page_keys_query(filters, limit, offset)
+    keys = execute_query(query, params)
+    if not keys:
+        return []
+    return hydrate_listing_rows(keys)
+
+
+def next_page_cursor(rows: List[dict], limit: int) -> Optional[str]:
+    """Cursor after the last row of a full page, None when there are no more rows"""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    if last.get('created_at') is None:
+        return None
+    return encode_cursor(last['created_at'], last['property_category'], last['id'])
+
+
+def build_primary_images_query(category: str, ids: List[int]) -> Tuple[str, tuple]:
+    """First image (oldest, then lowest image_order) of every property id in one query"""
+    placeholders = ", ".join(["%s"] * len(ids))
+    query = f"""
+        SELECT property_id, image_url
+        FROM (
+            SELECT property_id, image_url,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY property_id
+                       ORDER BY created_at ASC, image_order ASC, id ASC
+                   ) as image_rank
+            FROM {IMAGE_TABLES[category]}
+            WHERE property_id IN ({placeholders})
+        ) as ranked
+        WHERE image_rank = 1
+    """
+    return query, tuple(ids)
+
+
+def group_rows_by_category(rows: List[dict]) -> Dict[str, List[int]]:
+    ids_by_category = {}
+    for row in rows:
+        if row.get('id'):
+            ids_by_category.setdefault(row.get('property_category', 'residential'), []).append(row['id'])
+    return ids_by_category
+
+
+def fetch_primary_images(rows: List[dict]) -> Dict[Tuple[str, int], str]:
+    """Resolve primary image URLs for listing rows, keyed by (property_category, id)"""
+    images = {}
+    for category, ids in group_rows_by_category(rows).items():
+        try:
+            query, params = build_primary_images_query(category, ids)
+            for image in execute_query(query, params):
+                if image.get('image_url'):
+                    images[(category, image['property_id'])] = image['image_url']
+        except Exception as e:
+            # If image fetch fails, continue without images
+            print(f"Warning: Could not fetch images for {category} properties {ids}: {str(e)}")
+    return images
+
+
+def normalize_listing_item(prop: dict, primary_image_url: Optional[str] = None) -> dict:
+    """Shape one listing row for the API response"""
+    prop_dict = dict(prop)
+
+    if primary_image_url:
+        normalized_first_image = normalize_image_url(primary_image_url)
+        prop_dict['primary_image'] = normalized_first_image
+        # Populate images array with the first image for frontend display
+        prop_dict['images'] = [{'image_url': normalized_first_image}]
+        # Small resized variant for listing cards (database-served images only)
+        thumbnail = thumbnail_url(normalized_first_image)
+        if thumbnail:
+            prop_dict['thumbnail_url'] = thumbnail
+
+    # Normalize existing primary_image if it exists (fallback - in case property table has primary_image field)
+    if 'primary_image' in prop_dict and prop_dict['primary_image']:
+        prop_dict['primary_image'] = normalize_image_url(prop_dict['primary_image'])
+        # If images array is empty but primary_image exists, populate it
+        if 'images' not in prop_dict or not prop_dict.get('images'):
+            prop_dict['images'] = [{'image_url': prop_dict['primary_image']}]
+
+    # Ensure images array exists
+    if 'images' not in prop_dict:
+        prop_dict['images'] = []
+
+    # Construct location from city and locality if not already present
+    if 'location' not in prop_dict or not prop_dict.get('location'):
+        city = prop_dict.get('city', '')
+        locality = prop_dict.get('locality', '')
+        if city and locality:
+            prop_dict['location'] = f"{city}, {locality}"
+        elif city:
+            prop_dict['location'] = city
+        elif locality:
+            prop_dict['location'] = locality
+        else:
+            prop_dict['location'] = 'Location not specified'
+
+    # Convert TINYINT(1) to boolean for price_negotiable and price_includes_registration
+    if 'price_negotiable' in prop_dict:
+        prop_dict['price_negotiable'] = bool(prop_dict['price_negotiable'])
+    if 'price_includes_registration' in prop_dict:
+        prop_dict['price_includes_registration'] = bool(prop_dict['price_includes_registration'])
+
+    # Convert numeric fields to proper types
+    if 'bathrooms' in prop_dict and prop_dict['bathrooms'] is not None:
+        prop_dict['bathrooms'] = float(prop_dict['bathrooms'])
+    if 'area' in prop_dict and prop_dict['area'] is not None:
+        prop_dict['area'] = int(float(prop_dict['area']))
+
+    # Serialize created_at and updated_at from database for API response
+    if 'created_at' in prop_dict and isinstance(prop_dict['created_at'], datetime):
+        prop_dict['created_at'] = prop_dict['created_at'].isoformat()
+    if 'updated_at' in prop_dict and isinstance(prop_dict['updated_at'], datetime):
+        prop_dict['updated_at'] = prop_dict['updated_at'].isoformat()
+
+    return prop_dict
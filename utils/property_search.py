@@ -0,0 +1,263 @@
+"""
+Ranked free-text search over the three property tables (GET /api/search).
+Each table has two FULLTEXT indexes (created by scripts/manage_indexes.py, see
+SEARCH_FULLTEXT_INDEXES in utils/db_indexes.py):
+    ft_search   - name, city, locality, builder (no builder column on commercial), description
+    ft_location - city, locality (replaces the LIKE '%x%' location filter)
+Search text is turned into a BOOLEAN MODE expression where every word is
+required and prefix-matched, so lookups go through the inverted index instead
+of scanning every row. Tables without the index (older databases) fall back to
+LIKE for that table only.
+"""
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from database import execute_query
+from models import PropertyType
+from utils.property_queries import (
+    PROPERTY_TABLES, CATEGORY_RANK, COMMERCIAL_TYPES, build_listing_filters, hydrate_listing_rows
+)
+from utils.schema_info import has_table, has_fulltext_index
+from utils.property_index import property_index, keys_for_hydration
+
+
+SEARCH_COLUMNS = {
+    'residential': ('property_name', 'city', 'locality', 'builder', 'description'),
+    'plot': ('project_name', 'city', 'locality', 'builder', 'description'),
+    'commercial': ('property_name', 'city', 'locality', 'description'),
+}
+LOCATION_COLUMNS = ('city', 'locality')
+
+# Columns compared by min_area/max_area (same column the listing reports as "area")
+AREA_COLUMNS = {
+    'residential': 'buildup_area',
+    'plot': 'plot_area',
+    'commercial': 'super_built_up_area',
+}
+
+SORT_FIELDS = ('relevance', 'price', 'created_at')
+
+# Words shorter than innodb_ft_min_token_size are not in the index
+SEARCH_MIN_TOKEN_LENGTH = int(os.getenv("SEARCH_MIN_TOKEN_LENGTH", "3"))
+
+# InnoDB's default stopword list; a required (+) stopword would match nothing
+STOPWORDS = frozenset((
+    "a", "about", "an", "are", "as", "at", "be", "by", "com", "de", "en", "for", "from",
+    "how", "i", "in", "is", "it", "la", "of", "on", "or", "that", "the", "this", "to",
+    "was", "what", "when", "where", "who", "will", "with", "und", "www",
+))
+
+
+def search_terms(text: Optional[str]) -> List[str]:
+    """Indexable words of the search text (lowercased, deduplicated, in order)"""
+    terms = []
+    for word in re.findall(r"\w+", (text or "").lower()):
+        if len(word) < SEARCH_MIN_TOKEN_LENGTH or word in STOPWORDS or word in terms:
+            continue
+        terms.append(word)
+    return terms
+
+
+def boolean_expression(terms: List[str]) -> str:
+    """Every term required, prefix-matched: 'green vill' -> '+green* +vill*'"""
+    return " ".join(f"+{term}*" for term in terms)
+
+
+def _text_condition(table: str, columns: Tuple[str, ...], terms: List[str]) -> Tuple[str, list, str, list]:
+    """(where, params, relevance_expr, relevance_params) matching all terms against columns"""
+    column_list = ", ".join(columns)
+    if has_fulltext_index(table, columns):
+        expression = boolean_expression(terms)
+        match = f"MATCH({column_list}) AGAINST (%s IN BOOLEAN MODE)"
+        return match, [expression], match, [expression]
+    # No FULLTEXT index on this table yet: same semantics via LIKE, unranked
+    conditions = []
+    params = []
+    for term in terms:
+        conditions.append("(" + " OR ".join(f"LOWER({column}) LIKE %s" for column in columns) + ")")
+        params.extend([f"%{term}%"] * len(columns))
+    return " AND ".join(conditions), params, "0", []
+
+
+def build_search_filters(
+    type_str: Optional[str] = None,
+    category: Optional[str] = None,
+    status_str: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_bedrooms: Optional[int] = None,
+    max_bedrooms: Optional[int] = None,
+    min_area: Optional[int] = None,
+    max_area: Optional[int] = None,
+    is_featured: Optional[bool] = None,
+    is_active: bool = True
+) -> Dict[str, Tuple[str, list]]:
+    """
+    Per-table WHERE clauses for the search filters (text conditions are added by
+    build_search_query). Categories that cannot match a filter are left out.
+    """
+    filters = build_listing_filters(
+        status_str=status_str,
+        min_price=min_price,
+        max_price=max_price,
+        is_featured=is_featured,
+        is_active=is_active
+    )
+    filters = {
+        c: (where, list(params)) for c, (where, params) in filters.items()
+        if has_table(PROPERTY_TABLES[c])
+    }
+
+    if category:
+        filters = {c: f for c, f in filters.items() if c == category}
+
+    if type_str:
+        if type_str == PropertyType.PLOT.value:
+            filters = {c: f for c, f in filters.items() if c == 'plot'}
+        elif type_str in COMMERCIAL_TYPES:
+            filters = {c: f for c, f in filters.items() if c == 'commercial'}
+            if 'commercial' in filters:
+                where, params = filters['commercial']
+                filters['commercial'] = (f"{where} AND property_type = %s", params + [type_str])
+        else:
+            filters = {c: f for c, f in filters.items() if c == 'residential'}
+            if 'residential' in filters:
+                where, params = filters['residential']
+                filters['residential'] = (f"{where} AND type = %s", params + [type_str])
+
+    # Only residential properties have bedrooms (the listing reports 0 for the others)
+    if min_bedrooms:
+        filters = {c: f for c, f in filters.items() if c == 'residential'}
+    if 'residential' in filters:
+        where, params = filters['residential']
+        if min_bedrooms is not None:
+            where += " AND bedrooms >= %s"
+            params.append(min_bedrooms)
+        if max_bedrooms is not None:
+            where += " AND bedrooms <= %s"
+            params.append(max_bedrooms)
+        filters['residential'] = (where, params)
+
+    for c, (where, params) in list(filters.items()):
+        if min_area is not None:
+            where += f" AND {AREA_COLUMNS[c]} >= %s"
+            params.append(min_area)
+        if max_area is not None:
+            where += f" AND {AREA_COLUMNS[c]} <= %s"
+            params.append(max_area)
+        filters[c] = (where, params)
+    return filters
+
+
+def _order_by(sort_by: str, sort_order: str) -> str:
+    direction = "ASC" if sort_order == "asc" else "DESC"
+    if sort_by == 'relevance':
+        return f"relevance {direction}, created_at DESC, category_rank ASC, id DESC"
+    if sort_by == 'price':
+        return f"price IS NULL, price {direction}, created_at DESC, category_rank ASC, id DESC"
+    return f"created_at {direction}, category_rank ASC, id {direction}"
+
+
+def build_search_query(
+    filters: Dict[str, Tuple[str, list]],
+    terms: List[str],
+    location_terms: List[str],
+    sort_by: str,
+    sort_order: str,
+    limit: int,
+    offset: int
+) -> Tuple[str, tuple]:
+    """
+    One page of (id, category_rank, relevance) keys across the tables, with the
+    total match count attached to every row via COUNT(*) OVER ().
+    """
+    branches = []
+    params = []
+    for category, (where, where_params) in filters.items():
+        table = PROPERTY_TABLES[category]
+        conditions = [where]
+        branch_params = list(where_params)
+        relevance = "0"
+        relevance_params = []
+        if terms:
+            condition, condition_params, relevance, relevance_params = _text_condition(
+                table, SEARCH_COLUMNS[category], terms
+            )
+            conditions.append(condition)
+            branch_params.extend(condition_params)
+        if location_terms:
+            condition, condition_params, _, _ = _text_condition(table, LOCATION_COLUMNS, location_terms)
+            conditions.append(condition)
+            branch_params.extend(condition_params)
+        branches.append(
+            f"SELECT id, created_at, price, {CATEGORY_RANK[category]} as category_rank, "
+            f"{relevance} as relevance FROM {table} WHERE {' AND '.join(conditions)}"
+        )
+        # Relevance is selected before the WHERE clause, so its parameters come first
+        params.extend(relevance_params)
+        params.extend(branch_params)
+
+    query = f"""
+        SELECT id, category_rank, relevance, COUNT(*) OVER () as total_count
+        FROM ({" UNION ALL ".join(branches)}) as matches
+        ORDER BY {_order_by(sort_by, sort_order)}
+        LIMIT %s OFFSET %s
+    """
+    params.extend([limit, offset])
+    return query, tuple(params)
+
+
+def search_properties(
+    filters: Dict[str, Tuple[str, list]],
+    terms: List[str],
+    location_terms: List[str],
+    sort_by: str,
+    sort_order: str,
+    limit: int,
+    offset: int
+) -> Tuple[int, List[dict]]:
+    """(total, rows) for one page of search results; rows carry a relevance score"""
+    if not filters:
+        return 0, []
+    query, params = build_search_query(filters, terms, location_terms, sort_by, sort_order, limit, offset)
+    keys = execute_query(query, params)
+    if not keys:
+        if offset == 0:
+            return 0, []
+        # Past the last page: the window count is not available, count separately
+        count_query, count_params = build_search_query(
+            filters, terms, location_terms, sort_by, sort_order, 1, 0
+        )
+        first = execute_query(count_query, count_params)
+        return (int(first[0]['total_count']) if first else 0), []
+
+    total = int(keys[0]['total_count'])
+    relevance = {
+        (key['category_rank'], key['id']): float(key['relevance'] or 0)
+        for key in keys
+    }
+    rows = hydrate_listing_rows(keys)
+    for row in rows:
+        row['relevance'] = round(relevance.get((CATEGORY_RANK[row['property_category']], row['id']), 0.0), 4)
+    return total, rows
+
+
+def search_property_index(
+    terms: List[str],
+    location_terms: List[str],
+    sort_by: str,
+    sort_order: str,
+    limit: int,
+    offset: int,
+    **filters
+) -> Tuple[int, List[dict]]:
+    """Same as search_properties, answered by the in-memory index (utils/property_index.py);
+    filters are the keyword arguments of build_search_filters except is_active"""
+    matches = property_index.search(terms, location_terms, sort_by=sort_by, sort_order=sort_order, **filters)
+    page = matches[offset:offset + limit]
+    rows = hydrate_listing_rows(keys_for_hydration(key for key, _ in page))
+    relevance = {key: score for key, score in page}
+    for row in rows:
+        row['relevance'] = round(relevance.get((row['property_category'], row['id']), 0.0), 4)
+    return len(matches), rows
@@ -0,0 +1,40 @@
+"""
+In-process token buckets for rate limiting (per worker process).
+Each key (client IP, email, ...) gets `capacity` tokens that refill at
+`rate_per_minute`; a request spends one token or is told how long to wait.
+"""
+import threading
+import time
+from typing import Dict, Tuple
+
+
+class TokenBucketLimiter:
+    def __init__(self, rate_per_minute: float, capacity: float = None, max_keys: int = 10000):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # key -> (tokens, last refill)
+        self._lock = threading.Lock()
+
+    def take(self, key: str) -> float:
+        """Spend a token for key: 0.0 if allowed, else seconds until the next token"""
+        if self.rate <= 0 or not key:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+            if tokens >= 1.0:
+                self._buckets[key] = (tokens - 1.0, now)
+                allowed = True
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed = False
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+        return 0.0 if allowed else (1.0 - tokens) / self.rate
+
+    def _prune(self, now: float):
+        # Buckets that have refilled completely carry no state; drop them
+        full_after = self.capacity / self.rate
+        self._buckets = {k: v for k, v in self._buckets.items() if now - v[1] < full_after}
@@ -0,0 +1,281 @@
+"""
+In-process response cache and conditional GET for public read endpoints.
+Entries are keyed by path + normalized query args, bounded in size (LRU) and
+expire after a TTL. Every entry carries tags (e.g. "properties", "blogs");
+admin write paths invalidate those tags so edits show up on the next read.
+ETags are derived from the tags' content versions (utils/content_versions.py),
+so If-None-Match / If-Modified-Since are answered with 304 before the view runs.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Iterable
+
+from flask import current_app, g, request
+
+from utils.content_versions import get_versions, bump_versions
+
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "500"))
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60"))
+
+# Cached response bodies larger than this are not stored (keeps memory per worker bounded)
+MAX_CACHED_BODY_BYTES = 1024 * 1024
+
+
+class ResponseCache:
+    """Thread-safe LRU + TTL store of (status, headers, body) with tag-based invalidation"""
+
+    def __init__(self, max_entries: int = 500, default_ttl: int = 60):
+        self.max_entries = max(1, max_entries)
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # key -> (expires_at, status, headers, body, tags, versions)
+        self._tag_index = {}  # tag -> set(keys)
+        self._lock = threading.Lock()
+        # Bumped on every invalidation; a response rendered before an invalidation is not stored
+        self._generation = 0
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key: str, versions: dict = None):
+        """Cached (status, headers, body), or None if missing, expired or rendered for other versions"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            if entry[0] <= time.monotonic() or (versions is not None and entry[5] != versions):
+                self._remove(key)
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry[1:4]
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def set(self, key: str, status: int, headers: list, body: bytes, tags: Iterable[str],
+            ttl: int = None, generation: int = None, versions: dict = None):
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.default_ttl)
+        tags = tuple(tags)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, status, headers, body, tags, versions)
+            for tag in tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._counters["evictions"] += 1
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """Drop every entry carrying any of the tags; returns how many were removed"""
+        removed = 0
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in list(self._tag_index.get(tag, ())):
+                    if key in self._entries:
+                        self._remove(key)
+                        removed += 1
+                self._tag_index.pop(tag, None)
+            self._counters["invalidations"] += removed
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tag_index.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        stats["max_entries"] = self.max_entries
+        stats["ttl_seconds"] = self.default_ttl
+        return stats
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[4]:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    self._tag_index.pop(tag, None)
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS)
+
+
+def cache_key() -> str:
+    """Route path plus query args sorted by name (order-insensitive, repeated args kept)"""
+    args = sorted((k, v) for k, values in request.args.lists() for v in values)
+    query = "&".join(f"{k}={v}" for k, v in args)
+    return f"{request.path}?{query}" if query else request.path
+
+
+def make_etag(key: str, versions: dict) -> str:
+    """Strong validator from the cache key and the (version, updated_at) of every tag"""
+    parts = [key] + [f"{tag}:{versions[tag][0]}" for tag in sorted(versions)]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:32]
+
+
+def last_modified_for(versions: dict):
+    timestamps = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+    return max(timestamps) if timestamps else None
+
+
+def is_not_modified(etag: str, last_modified) -> bool:
+    """If-None-Match wins over If-Modified-Since when both are sent"""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+
+def add_validators(response, etag: str, last_modified):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    if 'Cache-Control' not in response.headers:
+        # Let browsers keep the body but revalidate with the ETag on every use
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def mark_uncacheable():
+    """
+    Flag the current response as a degraded fallback (e.g. zero counts after a DB error):
+    it is neither stored nor given the current-version validators.
+    """
+    g.response_uncacheable = True
+
+
+def _lookup_cached(tags):
+    """
+    Conditional GET / cache lookup before the view runs.
+    Returns (response or None, state); state is passed on to _store_rendered.
+    """
+    key = cache_key()
+    try:
+        versions = get_versions(tags)
+    except Exception as e:
+        # Versions unavailable (DB down): skip validators and fall back to TTL-only caching
+        print(f"Warning: Could not load content versions: {str(e)}")
+        versions = None
+
+    etag = last_modified = None
+    if versions is not None:
+        etag = make_etag(key, versions)
+        last_modified = last_modified_for(versions)
+        if is_not_modified(etag, last_modified):
+            response = add_validators(current_app.response_class(status=304), etag, last_modified)
+            response.headers['Access-Control-Allow-Origin'] = '*'
+            return response, None
+
+    if RESPONSE_CACHE_ENABLED:
+        cached = response_cache.get(key, versions)
+        if cached is not None:
+            status, headers, body = cached
+            response = current_app.response_class(body, status=status, headers=headers)
+            response.headers['X-Cache'] = 'HIT'
+            return response, None
+
+    return None, (key, versions, etag, last_modified, response_cache.generation)
+
+
+def _store_rendered(response, state, tags, ttl):
+    """Add validators to a fresh 200 response and store it"""
+    key, versions, etag, last_modified, generation = state
+    if response.status_code != 200:
+        return response
+    if g.get("response_uncacheable"):
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    if etag is not None:
+        add_validators(response, etag, last_modified)
+    if RESPONSE_CACHE_ENABLED and not response.direct_passthrough:
+        body = response.get_data()
+        if len(body) <= MAX_CACHED_BODY_BYTES:
+            headers = [(k, v) for k, v in response.headers.items() if k.lower() != 'content-length']
+            response_cache.set(key, response.status_code, headers, body, tags, ttl, generation, versions)
+        response.headers['X-Cache'] = 'MISS'
+    return response
+
+
+def cached_response(*tags: str, ttl: int = None):
+    """
+    Conditional GET + response cache for a view whose data is covered by the given tags.
+    Only 200 responses are stored; errors, aborts and fallbacks flagged with
+    mark_uncacheable() always go to the view.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method != "GET":
+                return f(*args, **kwargs)
+
+            response, state = _lookup_cached(tags)
+            if response is not None:
+                return response
+            response = current_app.make_response(f(*args, **kwargs))
+            return _store_rendered(response, state, tags, ttl)
+        return decorated_function
+    return decorator
+
+
+def async_cached_response(*tags: str, ttl: int = None):
+    """cached_response for the coroutine views of the async serving mode (asgi.py).
+    The version lookup may query MySQL, so it runs on a thread."""
+    def decorator(f):
+        @wraps(f)
+        async def decorated_function(*args, **kwargs):
+            if request.method != "GET":
+                return await f(*args, **kwargs)
+
+            response, state = await asyncio.to_thread(_lookup_cached, tags)
+            if response is not None:
+                return response
+            response = current_app.make_response(await f(*args, **kwargs))
+            return _store_rendered(response, state, tags, ttl)
+        return decorated_function
+    return decorator
+
+
+def invalidate_tags(*tags: str) -> int:
+    """Drop cached responses for the given tags and bump their versions for every worker"""
+    bump_versions(*tags)
+    removed = response_cache.invalidate_tags(*tags)
+    if removed:
+        print(f"Response cache: invalidated {removed} entries for tags {', '.join(tags)}")
+    return removed
+
+
+def invalidates(*tags: str):
+    """Invalidate the given tags after a write request to the view returns a non-error response"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            response = current_app.make_response(f(*args, **kwargs))
+            if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+                invalidate_tags(*tags)
+            return response
+        return decorated_function
+    return decorator
+
+
+def get_cache_stats() -> dict:
+    return response_cache.stats()
@@ -0,0 +1,115 @@
+"""
+Cached view of which tables and columns exist in the current database.
+Older deployments (e.g. cPanel databases created before a migration) can lack
+optional tables and columns such as commercial_properties or
+<category>_property_images.image_title. Routes check this cache to pick the
+right query up front instead of running a query, catching MySQL error 1054/1146
+and retrying without the missing part.
+
+information_schema is read once per process (after startup migrations) and
+again every SCHEMA_INFO_TTL_SECONDS, so migrations run out of band are picked
+up without a restart; refresh_schema_info() forces a reload.
+"""
+import os
+import threading
+import time
+import traceback
+from typing import Dict, FrozenSet, Iterable, Optional, Set
+
+from database import execute_query
+
+
+SCHEMA_INFO_TTL_SECONDS = float(os.getenv("SCHEMA_INFO_TTL_SECONDS", "600"))
+
+_lock = threading.Lock()
+_tables: Optional[Dict[str, Set[str]]] = None
+_fulltext: Optional[Dict[str, Set[FrozenSet[str]]]] = None
+_loaded_at: Optional[float] = None
+
+
+def _load_fulltext_indexes() -> Dict[str, Set[FrozenSet[str]]]:
+    rows = execute_query(
+        "SELECT TABLE_NAME as table_name, INDEX_NAME as index_name, COLUMN_NAME as column_name "
+        "FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND INDEX_TYPE = 'FULLTEXT'"
+    )
+    columns_by_index = {}
+    for row in rows:
+        key = (row['table_name'].lower(), row['index_name'])
+        columns_by_index.setdefault(key, set()).add(row['column_name'].lower())
+    indexes = {}
+    for (table, _), columns in columns_by_index.items():
+        indexes.setdefault(table, set()).add(frozenset(columns))
+    return indexes
+
+
+def refresh_schema_info() -> bool:
+    """Reload tables/columns from information_schema; keeps the previous snapshot on failure"""
+    global _tables, _fulltext, _loaded_at
+    try:
+        rows = execute_query(
+            "SELECT TABLE_NAME as table_name, COLUMN_NAME as column_name "
+            "FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE()"
+        )
+        fulltext = _load_fulltext_indexes()
+    except Exception:
+        print("Warning: Could not read information_schema; assuming the current schema")
+        traceback.print_exc()
+        with _lock:
+            _loaded_at = time.monotonic()
+        return False
+    tables = {}
+    for row in rows:
+        tables.setdefault(row['table_name'].lower(), set()).add(row['column_name'].lower())
+    with _lock:
+        _tables = tables
+        _fulltext = fulltext
+        _loaded_at = time.monotonic()
+    return True
+
+
+def _snapshot() -> Optional[Dict[str, Set[str]]]:
+    if _loaded_at is None or time.monotonic() - _loaded_at > SCHEMA_INFO_TTL_SECONDS:
+        refresh_schema_info()
+    with _lock:
+        return _tables
+
+
+def has_table(table: str) -> bool:
+    tables = _snapshot()
+    if tables is None:
+        # Schema unknown: assume the current schema rather than disabling features
+        return True
+    return table.lower() in tables
+
+
+def has_column(table: str, column: str) -> bool:
+    tables = _snapshot()
+    if tables is None:
+        return True
+    return column.lower() in tables.get(table.lower(), ())
+
+
+def has_fulltext_index(table: str, columns: Iterable[str]) -> bool:
+    """True if a FULLTEXT index covers exactly these columns (what MATCH() requires)"""
+    _snapshot()
+    with _lock:
+        fulltext = _fulltext
+    if fulltext is None:
+        # Schema unknown: MATCH() without an index fails, LIKE always works
+        return False
+    return frozenset(c.lower() for c in columns) in fulltext.get(table.lower(), ())
+
+
+def get_schema_summary() -> dict:
+    """Table -> sorted column list, for diagnostics"""
+    tables = _snapshot() or {}
+    return {
+        "loaded": _tables is not None,
+        "age_seconds": round(time.monotonic() - _loaded_at, 1) if _loaded_at is not None else None,
+        "tables": {table: sorted(columns) for table, columns in sorted(tables.items())},
+        "fulltext_indexes": {
+            table: sorted(sorted(columns) for columns in indexes)
+            for table, indexes in sorted((_fulltext or {}).items())
+        },
+    }
@@ -185,3 +185,85 @@ def add_image_title_column_if_missing():
                 pass  # Column already exists
             else:
                 print(f"Note: Could not add image_title to {table}: {e}")
+
+
+def _schema_state(table: str):
+    """({column: is_nullable}, {index names}) for one table, read from information_schema"""
+    columns = execute_query(
+        "SELECT COLUMN_NAME as column_name, IS_NULLABLE as is_nullable FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,),
+        primary=True
+    )
+    indexes = execute_query(
+        "SELECT DISTINCT INDEX_NAME as index_name FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,),
+        primary=True
+    )
+    return (
+        {row['column_name'].lower(): row['is_nullable'] == 'YES' for row in columns},
+        {row['index_name'].lower() for row in indexes},
+    )
+
+
+def _apply_missing_schema_changes(table: str, changes):
+    """
+    Run only the (kind, name, statement) changes the table still needs, so startup does
+    not rerun DDL (and rebuild or log duplicate errors) on every boot.
+    kind is "column" (add if missing), "index" (add if missing) or "nullable" (modify if NOT NULL).
+    """
+    try:
+        columns, indexes = _schema_state(table)
+    except Exception as e:
+        print(f"Note: Could not read the schema of {table}: {e}")
+        return
+    if not columns:
+        return  # Table does not exist (yet)
+    for kind, name, statement in changes:
+        if kind == "column" and name in columns:
+            continue
+        if kind == "index" and name in indexes:
+            continue
+        if kind == "nullable" and columns.get(name, True):
+            continue
+        try:
+            execute_update(statement)
+            print(f"  Updated {table}: {kind} {name}")
+            if kind == "column":
+                columns[name] = True
+        except Exception as e:
+            if "Duplicate" in str(e) or "1060" in str(e) or "1061" in str(e):
+                pass  # Added concurrently by another worker
+            else:
+                print(f"Note: Could not update {table} ({kind} {name}): {e}")
+
+
+def add_image_storage_columns_if_missing():
+    """Add blob store columns to images (bytes move out of the LONGBLOB, see utils/blob_store.py)."""
+    _apply_missing_schema_changes("images", (
+        ("column", "storage", "ALTER TABLE images ADD COLUMN storage VARCHAR(20) NOT NULL DEFAULT 'db' "
+         "COMMENT 'db = bytes in data column, otherwise blob store backend' AFTER content_type"),
+        ("column", "sha256",
+         "ALTER TABLE images ADD COLUMN sha256 CHAR(64) NULL COMMENT 'SHA-256 of the image bytes' AFTER storage"),
+        ("column", "size_bytes", "ALTER TABLE images ADD COLUMN size_bytes BIGINT NULL AFTER sha256"),
+        ("index", "idx_sha256", "ALTER TABLE images ADD INDEX idx_sha256 (sha256)"),
+        ("nullable", "data",
+         "ALTER TABLE images MODIFY data LONGBLOB NULL COMMENT 'Binary image data (storage = db only)'"),
+    ))
+
+
+def add_normalized_email_columns_if_missing():
+    """Indexed LOWER(TRIM(email)) columns for the admin auth lookups (require_admin_auth)."""
+    _apply_missing_schema_changes("users", (
+        ("column", "email_lc", "ALTER TABLE users ADD COLUMN email_lc VARCHAR(255) "
+         "GENERATED ALWAYS AS (LOWER(TRIM(email))) STORED COMMENT 'Normalized email for lookups' AFTER email"),
+        ("index", "idx_email_lc", "ALTER TABLE users ADD INDEX idx_email_lc (email_lc)"),
+    ))
+    _apply_missing_schema_changes("user_sessions", (
+        ("column", "user_email_lc", "ALTER TABLE user_sessions ADD COLUMN user_email_lc VARCHAR(255) "
+         "GENERATED ALWAYS AS (LOWER(TRIM(user_email))) STORED COMMENT 'Normalized email for lookups' "
+         "AFTER user_email"),
+        ("index", "idx_user_email_lc_active",
+         "ALTER TABLE user_sessions ADD INDEX idx_user_email_lc_active (user_email_lc, is_active, expires_at)"),
+    ))
@@ -0,0 +1,217 @@
+"""
+Application-wide executor for fire-and-forget work (login audit rows, ...), so
+request handlers never start their own threads. Tasks may be dropped, so only
+lossy bookkeeping belongs here: notification emails are written to the email
+outbox (utils/email_outbox.py) on the request path.
+
+- a fixed number of worker threads and one bounded queue: submit() never blocks,
+  and when the queue is full the task is dropped and counted
+- per task type concurrency limits, so one kind of work (e.g. a burst of audit
+  rows) cannot occupy every worker or DB connection
+- queued tasks are drained on interpreter exit, up to BACKGROUND_TASK_DRAIN_SECONDS
+- queue depth, running tasks and queue-wait / run-time percentiles per type are
+  reported by stats() (admin metrics endpoint)
+
+Request-path parallelism that waits for its results (property detail fetches,
+password hashing) keeps its own small pools.
+"""
+import atexit
+import os
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from utils.latency_histogram import latency_bin, percentiles
+
+
+BACKGROUND_TASK_WORKERS = int(os.getenv("BACKGROUND_TASK_WORKERS", "4"))
+BACKGROUND_TASK_QUEUE_SIZE = int(os.getenv("BACKGROUND_TASK_QUEUE_SIZE", "1000"))
+BACKGROUND_TASK_DRAIN_SECONDS = float(os.getenv("BACKGROUND_TASK_DRAIN_SECONDS", "10"))
+
+
+def _parse_limits(spec: str) -> Dict[str, int]:
+    """'audit=2,other=1' -> {'audit': 2, 'other': 1}"""
+    limits = {}
+    for item in (spec or "").split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip().isdigit():
+            limits[name.strip()] = max(1, int(value))
+    return limits
+
+
+# Default per-type limits; BACKGROUND_TASK_LIMITS (e.g. "audit=1") overrides them
+DEFAULT_TASK_LIMITS = {"audit": 2}
+TASK_LIMITS = {**DEFAULT_TASK_LIMITS, **_parse_limits(os.getenv("BACKGROUND_TASK_LIMITS", ""))}
+
+
+class _TaskTypeState:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.queue = deque()  # (enqueued_at, fn, args, kwargs)
+        self.running = 0
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "dropped": 0}
+        self.wait_bins = {}
+        self.run_bins = {}
+
+
+class BackgroundTaskExecutor:
+    def __init__(self, name: str, workers: int, max_queue_size: int, limits: Dict[str, int]):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queue_size = max(1, max_queue_size)
+        self.limits = dict(limits)
+        self._cond = threading.Condition()
+        self._types: Dict[str, _TaskTypeState] = {}
+        self._queued = 0
+        self._threads = []
+        self._pid = None
+        self._accepting = True
+        self._stopping = False
+        atexit.register(self.shutdown)
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def submit(self, task_type: str, fn: Callable, *args, **kwargs) -> bool:
+        """Queue fn(*args, **kwargs) under task_type; returns False if it was dropped"""
+        self._ensure_started()
+        with self._cond:
+            state = self._state(task_type)
+            if not self._accepting or self._queued >= self.max_queue_size:
+                state.counters["dropped"] += 1
+                print(f"Warning: {self.name} dropped a {task_type} task (queue full or shutting down)")
+                return False
+            state.queue.append((time.monotonic(), fn, args, kwargs))
+            state.counters["submitted"] += 1
+            self._queued += 1
+            self._cond.notify()
+        return True
+
+    def stats(self) -> dict:
+        with self._cond:
+            types = {}
+            for task_type, state in self._types.items():
+                types[task_type] = {
+                    **state.counters,
+                    "queued": len(state.queue),
+                    "running": state.running,
+                    "limit": state.limit,
+                    "queue_wait_ms": percentiles(state.wait_bins),
+                    "run_time_ms": percentiles(state.run_bins),
+                }
+            return {
+                "workers": self.workers,
+                "max_queue_size": self.max_queue_size,
+                "queued": self._queued,
+                "running": sum(state.running for state in self._types.values()),
+                "accepting": self._accepting,
+                "task_types": types,
+            }
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+    def _state(self, task_type: str) -> _TaskTypeState:
+        state = self._types.get(task_type)
+        if state is None:
+            state = _TaskTypeState(min(self.limits.get(task_type, self.workers), self.workers))
+            self._types[task_type] = state
+        return state
+
+    def _ensure_started(self):
+        # Passenger forks workers after import; start (or restart) the threads in the serving process
+        if self._pid == os.getpid():
+            return
+        with self._cond:
+            if self._pid == os.getpid():
+                return
+            # Anything queued in a parent process belongs to that process
+            self._types = {}
+            self._queued = 0
+            self._accepting = True
+            self._stopping = False
+            self._pid = os.getpid()
+            self._threads = [
+                threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def _next_task(self):
+        """Oldest queued task whose type is under its concurrency limit (caller holds the lock)"""
+        best = None
+        for task_type, state in self._types.items():
+            if state.queue and state.running < state.limit:
+                if best is None or state.queue[0][0] < best[1].queue[0][0]:
+                    best = (task_type, state)
+        if best is None:
+            return None
+        task_type, state = best
+        state.running += 1
+        self._queued -= 1
+        return (task_type, state) + state.queue.popleft()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                task = self._next_task()
+                while task is None:
+                    if self._stopping:
+                        return
+                    self._cond.wait()
+                    task = self._next_task()
+            task_type, state, enqueued_at, fn, args, kwargs = task
+            started = time.monotonic()
+            failed = False
+            try:
+                fn(*args, **kwargs)
+            except Exception:
+                failed = True
+                print(f"Warning: background {task_type} task failed")
+                traceback.print_exc()
+            finished = time.monotonic()
+            with self._cond:
+                state.running -= 1
+                state.counters["failed" if failed else "completed"] += 1
+                wait_bin = latency_bin((started - enqueued_at) * 1000)
+                run_bin = latency_bin((finished - started) * 1000)
+                state.wait_bins[wait_bin] = state.wait_bins.get(wait_bin, 0) + 1
+                state.run_bins[run_bin] = state.run_bins.get(run_bin, 0) + 1
+                # A slot of this type is free again: a waiting worker may now take its next task
+                self._cond.notify_all()
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """Stop accepting tasks and let the workers drain the queue (bounded by timeout)"""
+        if self._pid != os.getpid():
+            return
+        timeout = BACKGROUND_TASK_DRAIN_SECONDS if timeout is None else timeout
+        with self._cond:
+            self._accepting = False
+            self._stopping = True
+            self._cond.notify_all()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        with self._cond:
+            if self._queued:
+                print(f"Warning: {self.name} exited with {self._queued} queued task(s) not run")
+
+
+task_executor = BackgroundTaskExecutor(
+    "background-tasks",
+    workers=BACKGROUND_TASK_WORKERS,
+    max_queue_size=BACKGROUND_TASK_QUEUE_SIZE,
+    limits=TASK_LIMITS
+)
+
+
+def submit_task(task_type: str, fn: Callable, *args, **kwargs) -> bool:
+    """Run fn(*args, **kwargs) in the background; returns False if the task was dropped"""
+    return task_executor.submit(task_type, fn, *args, **kwargs)
+
+
+def get_task_stats() -> dict:
+    return task_executor.stats()